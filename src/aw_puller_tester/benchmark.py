@@ -0,0 +1,100 @@
+import json
+import math
+import statistics
+from pathlib import Path
+
+from aw_puller_tester.parquet_export import ParquetExportJob
+from aw_puller_tester.tools import ParquetExportMeta
+
+
+BENCHMARK_PARQUET_SECTION = 'Бенчмарк выгрузки в parquet'
+
+# метрики бенчмарка: название -> True, если большее значение лучше
+BENCHMARK_METRICS = {
+    'seconds': False,
+    'rows_per_sec': True,
+    'compressed_bytes_per_sec': True,
+    'uncompressed_bytes_per_sec': True,
+}
+
+
+def parquet_benchmark_row(
+    case: str, runs: list[tuple[ParquetExportJob, ParquetExportMeta]]
+) -> dict:
+    """
+    Возвращает строку результатов бенчмарка выгрузки в parquet. Если выгрузка выполнялась
+    несколько раз, то берутся медианы. Время выгрузки seconds включает ожидание опроса после
+    готовности выгрузки (overshoot), поэтому фактическое время лежит в [min_seconds, seconds]
+    """
+    seconds = statistics.median(job.elapsed for job, _ in runs)
+    _, meta = runs[-1]
+
+    return {
+        'case': case,
+        'runs': len(runs),
+        'seconds': seconds,
+        'min_seconds': statistics.median(job.min_elapsed for job, _ in runs),
+        'overshoot': statistics.median(job.overshoot or 0.0 for job, _ in runs),
+        'rows': meta.num_rows,
+        'compressed_bytes': meta.compressed_bytes,
+        'uncompressed_bytes': meta.uncompressed_bytes,
+        'rows_per_sec': meta.num_rows / seconds if seconds > 0 else None,
+        'compressed_bytes_per_sec': meta.compressed_bytes / seconds if seconds > 0 else None,
+        'uncompressed_bytes_per_sec': (
+            meta.uncompressed_bytes / seconds if seconds > 0 else None
+        ),
+    }
+
+
+def is_precise_benchmark_row(row: dict, max_overshoot_ratio: float) -> bool:
+    """
+    Проверяет, что ожидание опроса составляет малую долю времени выгрузки, и время
+    выгрузки можно сравнивать с другими замерами. Строки без overshoot (например, базовый
+    запуск старой версии тестера) неточные
+    """
+    overshoot = row.get('overshoot')
+    return overshoot is not None and overshoot <= max_overshoot_ratio * row['seconds']
+
+
+def load_benchmark_baseline(path: Path, section: str) -> dict[str, dict]:
+    """
+    Загружает строки базового запуска бенчмарка из JSON отчета предыдущего запуска
+    """
+    with open(path, 'r') as f:
+        report = json.load(f)
+
+    return {row['case']: row for row in report.get(section, []) if 'case' in row}
+
+
+def find_benchmark_regressions(
+    row: dict, baseline_row: dict, max_regression_percent: float
+) -> list[str]:
+    """
+    Сравнивает результаты бенчмарка с базовыми и возвращает описания метрик,
+    которые ухудшились больше чем на max_regression_percent процентов
+    """
+    regressions = []
+
+    for metric, higher_is_better in BENCHMARK_METRICS.items():
+        value = row.get(metric)
+        baseline_value = baseline_row.get(metric)
+        if value is None or not baseline_value:
+            continue
+
+        change_percent = (value - baseline_value) / baseline_value * 100
+        regression_percent = -change_percent if higher_is_better else change_percent
+
+        if regression_percent > max_regression_percent:
+            regressions.append(
+                f'{metric}: {baseline_value:.3f} -> {value:.3f} ({change_percent:+.1f}%)'
+            )
+
+    return regressions
+
+
+def projection_widths(columns_count: int) -> list[int]:
+    """
+    Возвращает количества столбцов для бенчмарка проекции: 1 столбец, 10%, 50% и все столбцы
+    """
+    widths = {1, math.ceil(columns_count * 0.1), math.ceil(columns_count * 0.5), columns_count}
+    return sorted(width for width in widths if width > 0)
@@ -0,0 +1,142 @@
+import statistics
+import time
+from dataclasses import dataclass
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from aw_puller_tester.dto import (
+    DATA_SOURCE_OBJECT_TREE,
+    DATA_SOURCE_OBJECTS,
+    TestObjectsCatalogSettings,
+    TestPerformanceSettings,
+)
+from aw_puller_tester.payload_profile import loglog_slope
+from aw_puller_tester.performance import report_performance_issue
+from aw_puller_tester.report import TestReportWriter
+
+
+OBJECTS_CATALOG_SECTION = 'Список объектов источника'
+
+# виды запросов списка объектов в отчете
+FULL_CATALOG = 'весь список'
+FULL_CATALOG_TREE = 'весь список (неплоский)'
+CATALOG_PAGE = 'страница'
+CATALOG_SEARCH = 'поиск query_string'
+CATALOG_SEARCH_NOT_FOUND = 'поиск query_string без результатов'
+
+
+@dataclass
+class ObjectsTiming:
+    """
+    Замер запроса data-source/objects: количество объектов в ответе, размер ответа,
+    медиана времени ответа по повторам и время валидации ответа тестером
+    """
+
+    request: str
+    limit: int | None
+    objects: int
+    bytes: int
+    seconds: float
+    validate: float
+
+
+def validate_objects(content: bytes, flat: bool = True) -> int:
+    """
+    Валидирует ответ data-source/objects целиком (TypeAdapter, без цикла по объектам
+    на Python) и возвращает количество объектов в ответе
+    """
+    try:
+        if flat:
+            return len(DATA_SOURCE_OBJECTS.validate_json(content))
+        return sum(len(names) for names in DATA_SOURCE_OBJECT_TREE.validate_json(content).values())
+    except ValidationError as e:
+        pytest.fail(f'Ошибка валидации списка объектов из ответа коннектора: {e.errors()}')
+
+
+def measure_objects(
+    client: httpx.Client, request: str, request_json: dict, repeat: int
+) -> ObjectsTiming:
+    """
+    Повторяет запрос data-source/objects repeat раз и замеряет время ответа и время
+    валидации ответа тестером (отдельно от получения)
+    """
+    seconds = []
+    for _ in range(max(repeat, 1)):
+        started_at = time.perf_counter()
+        r = client.post(url='data-source/objects', json=request_json)
+        seconds.append(time.perf_counter() - started_at)
+
+        assert r.status_code < 400, (
+            f'HTTP {r.status_code} при получении списка объектов ({request}): {r.text}'
+        )
+
+    validate_started_at = time.perf_counter()
+    objects = validate_objects(r.content, flat=request_json.get('flat', True))
+    validate = time.perf_counter() - validate_started_at
+
+    return ObjectsTiming(
+        request=request,
+        limit=request_json.get('limit'),
+        objects=objects,
+        bytes=len(r.content),
+        seconds=statistics.median(seconds),
+        validate=validate,
+    )
+
+
+def _per_object(value: float, timing: ObjectsTiming) -> float | None:
+    return value / timing.objects if timing.objects else None
+
+
+def check_objects_catalog(
+    subject: str,
+    timings: list[ObjectsTiming],
+    settings: TestObjectsCatalogSettings,
+    performance_settings: TestPerformanceSettings,
+    test_report: TestReportWriter,
+):
+    """
+    Добавляет замеры списка объектов в отчет: время ответа и размер ответа в зависимости от
+    количества объектов (наклон в логарифмическом масштабе по полному списку и страницам),
+    время поиска query_string в процентах от полного списка. Постраничное получение
+    считается поддерживаемым, если ответы с limit меньше размера каталога содержат не больше
+    limit объектов. Каталог больше objects_catalog.max_unpaged_objects без постраничного
+    получения отмечается как проблема производительности.
+    """
+    full = next(t for t in timings if t.request == FULL_CATALOG)
+    pages = [t for t in timings if t.request == CATALOG_PAGE and t.limit < full.objects]
+    paging = all(t.objects <= t.limit for t in pages) if pages else None
+
+    sized = [full] + pages
+    slope = loglog_slope([t.objects for t in sized], [t.seconds for t in sized])
+    bytes_slope = loglog_slope([t.objects for t in sized], [t.bytes for t in sized])
+
+    for timing in timings:
+        test_report.add(
+            OBJECTS_CATALOG_SECTION,
+            {
+                'data source': subject,
+                'request': timing.request,
+                'limit': timing.limit,
+                'objects': timing.objects,
+                'bytes': timing.bytes,
+                'bytes per object': _per_object(timing.bytes, timing),
+                'time, s': timing.seconds,
+                'time, %': timing.seconds / full.seconds * 100 if full.seconds else None,
+                'us per object': _per_object(timing.seconds * 1_000_000, timing),
+                'validate, s': timing.validate,
+                'slope': slope,
+                'bytes slope': bytes_slope,
+                'paging': {True: 'да', False: 'нет', None: '-'}[paging],
+            },
+        )
+
+    if full.objects > settings.max_unpaged_objects and paging is False:
+        report_performance_issue(
+            f'Коннектор возвращает весь список объектов источника {subject} ({full.objects} '
+            f'объектов, {full.bytes} байт) без постраничного получения: limit в запросе '
+            f'data-source/objects не ограничивает ответ',
+            performance_settings,
+        )
@@ -0,0 +1,256 @@
+import hashlib
+
+import pyarrow
+import pyarrow.compute as pc
+
+from aw_puller_tester.report import TestReportWriter
+
+
+CONSISTENCY_SECTION = 'Согласованность данных'
+
+def _fixed_width_bytes(array: pyarrow.Array) -> memoryview:
+    """
+    Возвращает байты значений массива фиксированной ширины без учета смещения среза
+    """
+    width = array.type.bit_width // 8
+    data = memoryview(array.buffers()[1])
+    return data[array.offset * width:(array.offset + len(array)) * width]
+
+
+class ColumnChecksum:
+    """
+    Потоковая контрольная сумма столбца. Учитывает NULL и порядок значений, но не то,
+    как столбец разбит на пакеты (батчи): маска NULL, длины и байты значений хешируются
+    отдельными потоками. Вычисления выполняются над буферами Arrow, без циклов по строкам
+    (кроме вложенных типов).
+    """
+
+    def __init__(self, data_type: pyarrow.DataType):
+        self.data_type = data_type
+        self.validity = hashlib.sha256()
+        self.lengths = hashlib.sha256()
+        self.values = hashlib.sha256()
+
+    def update(self, array: pyarrow.Array | pyarrow.ChunkedArray):
+        if isinstance(array, pyarrow.ChunkedArray):
+            for chunk in array.chunks:
+                self.update(chunk)
+            return
+
+        if pyarrow.types.is_dictionary(array.type):
+            array = array.dictionary_decode()
+
+        data_type = array.type
+        if pyarrow.types.is_null(data_type):
+            self.validity.update(bytes(len(array)))
+            return
+
+        valid = pc.is_valid(array)
+        self.validity.update(_fixed_width_bytes(valid.cast(pyarrow.uint8())))
+
+        if array.null_count:
+            # NULL учтены в маске, значения хешируются только для заполненных строк
+            array = array.filter(valid)
+
+        if pyarrow.types.is_boolean(data_type):
+            self.values.update(_fixed_width_bytes(array.cast(pyarrow.uint8())))
+        elif (
+            pyarrow.types.is_string(data_type)
+            or pyarrow.types.is_large_string(data_type)
+            or pyarrow.types.is_binary(data_type)
+            or pyarrow.types.is_large_binary(data_type)
+        ):
+            self.lengths.update(
+                _fixed_width_bytes(pc.binary_length(array).cast(pyarrow.int64()))
+            )
+            large = pyarrow.types.is_large_string(data_type) or pyarrow.types.is_large_binary(
+                data_type
+            )
+            offsets = memoryview(array.buffers()[1]).cast('q' if large else 'i')
+            start, end = offsets[array.offset], offsets[array.offset + len(array)]
+            self.values.update(memoryview(array.buffers()[2])[start:end])
+        elif (
+            pyarrow.types.is_primitive(data_type)
+            or pyarrow.types.is_decimal(data_type)
+            or pyarrow.types.is_fixed_size_binary(data_type)
+        ):
+            self.values.update(_fixed_width_bytes(array))
+        else:
+            # вложенные типы хешируются поэлементно через текстовое представление, это медленнее
+            for value in array.to_pylist():
+                value_bytes = repr(value).encode()
+                self.lengths.update(len(value_bytes).to_bytes(8, 'little'))
+                self.values.update(value_bytes)
+
+    def hexdigest(self) -> str:
+        digest = hashlib.sha256()
+        for hasher in (self.validity, self.lengths, self.values):
+            digest.update(hasher.digest())
+        return digest.hexdigest()
+
+
+class TableChecksum:
+    """
+    Потоковые контрольные суммы всех столбцов таблицы
+    """
+
+    def __init__(self, schema: pyarrow.Schema):
+        self.columns = {field.name: ColumnChecksum(field.type) for field in schema}
+
+    def update(self, batch: pyarrow.RecordBatch | pyarrow.Table):
+        for name, checksum in self.columns.items():
+            checksum.update(batch.column(name))
+
+    def hexdigests(self) -> dict[str, str]:
+        return {name: checksum.hexdigest() for name, checksum in self.columns.items()}
+
+
+def combined_checksum(hexdigests: dict[str, str]) -> str:
+    """
+    Возвращает общую контрольную сумму таблицы по контрольным суммам столбцов (для отчета)
+    """
+    digest = hashlib.sha256()
+    for name in sorted(hexdigests):
+        digest.update(f'{name}={hexdigests[name]};'.encode())
+    return digest.hexdigest()[:16]
+
+
+def _sort_column(array: pyarrow.Array | pyarrow.ChunkedArray):
+    """
+    Упорядочивает значения столбца (NULL в конце). Значения вложенных типов заменяются
+    упорядоченным текстовым представлением
+    """
+    if pyarrow.types.is_dictionary(array.type):
+        array = array.cast(array.type.value_type)
+
+    if not pyarrow.types.is_nested(array.type):
+        return pc.take(array, pc.sort_indices(array, null_placement='at_end'))
+
+    values = sorted(repr(value) for value in array.to_pylist() if value is not None)
+    return pyarrow.array(values + [None] * array.null_count, type=pyarrow.string())
+
+
+def column_checksum(array: pyarrow.Array | pyarrow.ChunkedArray, ordered: bool = False) -> str:
+    """
+    Возвращает контрольную сумму столбца. Если ordered=False, то сумма не зависит от порядка
+    строк: значения предварительно упорядочиваются средствами pyarrow.compute
+    """
+    if not ordered:
+        array = _sort_column(array)
+
+    checksum = ColumnChecksum(array.type)
+    checksum.update(array)
+    return checksum.hexdigest()
+
+
+def table_checksums(table: pyarrow.Table, ordered: bool = False) -> dict[str, str]:
+    """
+    Возвращает контрольные суммы всех столбцов таблицы. Без ordered суммы каждого столбца
+    не зависят от порядка строк, поэтому совпадение сумм означает совпадение наборов значений
+    по столбцам (но не проверяет, что значения разных столбцов собраны в те же строки)
+    """
+    return {
+        name: column_checksum(table.column(name), ordered=ordered) for name in table.column_names
+    }
+
+
+def mismatched_columns(actual: dict[str, str], expected: dict[str, str]) -> list[str]:
+    """
+    Возвращает столбцы, контрольные суммы которых отличаются или которые есть только
+    в одном из наборов
+    """
+    columns = list(expected) + [name for name in actual if name not in expected]
+    return [name for name in columns if actual.get(name) != expected.get(name)]
+
+
+def align_table_types(table: pyarrow.Table, schema: pyarrow.Schema) -> pyarrow.Table:
+    """
+    Приводит столбцы таблицы (например, построенной из JSON ответа коннектора) к типам
+    столбцов schema. Столбцы, которые нельзя привести к типу, остаются как есть
+    """
+    columns = []
+    for name in table.column_names:
+        column = table.column(name)
+        if name in schema.names:
+            try:
+                column = column.cast(schema.field(name).type)
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowNotImplementedError):
+                pass
+        columns.append(column)
+    return pyarrow.table(columns, names=table.column_names)
+
+
+def _decoded(array: pyarrow.ChunkedArray) -> pyarrow.ChunkedArray:
+    if pyarrow.types.is_dictionary(array.type):
+        return array.cast(array.type.value_type)
+    return array
+
+
+def missing_values_columns(actual: pyarrow.Table, expected: pyarrow.Table) -> list[str]:
+    """
+    Возвращает столбцы, в которых есть значения (в том числе NULL), отсутствующие в том же
+    столбце expected, а также столбцы, которые есть только в одной из таблиц. Не зависит от
+    порядка строк и подходит для сравнения части строк (например, ответа с limit) со всеми
+    строками. Значения actual должны быть предварительно приведены к типам expected
+    (align_table_types)
+    """
+    columns = expected.column_names + [
+        name for name in actual.column_names if name not in expected.column_names
+    ]
+
+    mismatched = []
+    for name in columns:
+        if name not in actual.column_names or name not in expected.column_names:
+            mismatched.append(name)
+            continue
+
+        values = _decoded(actual.column(name))
+        value_set = _decoded(expected.column(name)).combine_chunks()
+        try:
+            found = pc.all(pc.is_in(values, value_set=value_set)).as_py()
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowNotImplementedError, pyarrow.ArrowTypeError):
+            # значения не удалось привести к типу столбца expected
+            found = False
+        if found is False:
+            mismatched.append(name)
+    return mismatched
+
+
+def check_data_matches_export(
+    subject: str,
+    endpoint: str,
+    data: pyarrow.Table,
+    export_table: pyarrow.Table,
+    test_report: TestReportWriter,
+):
+    """
+    Сравнивает ответ object-data (sql-object-data) с полной выгрузкой в parquet после
+    приведения JSON значений к типам столбцов выгрузки. Если ответ содержит все строки
+    выгрузки, то строки сравниваются по контрольным суммам столбцов. Иначе (без ORDER BY
+    источник может вернуть в ответе с ограничением количества строк любые строки)
+    проверяется, что каждое значение ответа есть в том же столбце выгрузки и в ответе
+    не больше строк, чем в выгрузке
+    """
+    actual = align_table_types(data, export_table.schema)
+    complete = actual.num_rows == export_table.num_rows
+    if complete:
+        mismatched = mismatched_columns(table_checksums(actual), table_checksums(export_table))
+    else:
+        mismatched = missing_values_columns(actual, export_table)
+
+    test_report.add(
+        CONSISTENCY_SECTION,
+        {
+            'export': subject,
+            'compared with': endpoint,
+            'rows': export_table.num_rows,
+            'other rows': actual.num_rows,
+            'compared': 'контрольные суммы' if complete else 'значения в выгрузке',
+            'mismatched columns': ', '.join(mismatched),
+        },
+    )
+
+    assert actual.num_rows <= export_table.num_rows and not mismatched, (
+        f'Данные {subject} из {endpoint} ({actual.num_rows} строк) не совпадают с выгрузкой '
+        f'в parquet ({export_table.num_rows} строк): отличаются столбцы {mismatched}'
+    )
@@ -0,0 +1,154 @@
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+
+import httpx
+import pytest
+
+from aw_puller_tester.dto import TestCompressionSettings
+from aw_puller_tester.http_client import supported_content_encodings
+from aw_puller_tester.report import TestReportWriter
+
+
+COMPRESSION_SECTION = 'Сжатие ответов коннектора'
+IDENTITY_ENCODING = 'identity'
+
+
+@dataclass
+class CompressedResponse:
+    """
+    Замер одного запроса с заданным заголовком Accept-Encoding
+    """
+
+    accept_encoding: str
+    content_encoding: str
+    wire_bytes: int
+    decoded_bytes: int
+    seconds: float
+    content: bytes = field(default=b'', repr=False, compare=False)
+
+
+def measure_response(
+    client: httpx.Client, url: str, request_json: dict, accept_encoding: str
+) -> CompressedResponse:
+    """
+    Выполняет POST запрос с заголовком Accept-Encoding и замеряет время получения ответа,
+    количество байт, полученных по сети (до распаковки), и размер распакованного ответа
+    """
+    started_at = time.perf_counter()
+    with client.stream(
+        'POST', url, json=request_json, headers={'Accept-Encoding': accept_encoding}
+    ) as r:
+        content = r.read()
+        seconds = time.perf_counter() - started_at
+        if r.status_code >= 400:
+            pytest.fail(
+                f'Ожидался успешный ответ коннектора. Получено HTTP {r.status_code}: {r.text}.'
+            )
+
+        return CompressedResponse(
+            accept_encoding=accept_encoding,
+            content_encoding=r.headers.get('Content-Encoding', IDENTITY_ENCODING),
+            wire_bytes=r.num_bytes_downloaded,
+            decoded_bytes=len(content),
+            seconds=seconds,
+            content=content,
+        )
+
+
+def measure_compression(
+    client: httpx.Client,
+    url: str,
+    request_json: dict,
+    settings: TestCompressionSettings,
+) -> dict[str, CompressedResponse]:
+    """
+    Запрашивает один и тот же ответ без сжатия и с каждой кодировкой из compression.encodings,
+    которую может распаковать тестер. Возвращает замеры с медианой времени по повторам
+    """
+    supported = supported_content_encodings()
+    encodings = [IDENTITY_ENCODING] + [e for e in settings.encodings if e in supported]
+
+    responses = {}
+    for encoding in encodings:
+        repeats = [
+            measure_response(client, url, request_json, encoding)
+            for _ in range(max(settings.repeat, 1))
+        ]
+        response = repeats[0]
+        response.seconds = statistics.median(r.seconds for r in repeats)
+        responses[encoding] = response
+    return responses
+
+
+def _same_content(actual: bytes, expected: bytes) -> bool:
+    if actual == expected:
+        return True
+    try:
+        return json.loads(actual) == json.loads(expected)
+    except ValueError:
+        return False
+
+
+def _ratio_percent(value: float, identity_value: float) -> float | None:
+    return value / identity_value * 100 if identity_value else None
+
+
+def check_compression(
+    subject: str,
+    responses: dict[str, CompressedResponse],
+    settings: TestCompressionSettings,
+    test_report: TestReportWriter,
+):
+    """
+    Добавляет в отчет размер ответа по сети и время ответа для каждой кодировки по сравнению
+    с несжатым ответом. Распакованный ответ должен совпадать с несжатым. Кодировки, которые
+    тестер не может распаковать (например, br без пакета brotli), отмечаются в отчете
+    и не запрашиваются; сжатие не обязательно для коннектора
+    """
+    identity = responses[IDENTITY_ENCODING]
+
+    errors = []
+    for encoding in [IDENTITY_ENCODING] + settings.encodings:
+        response = responses.get(encoding)
+        if response is None:
+            test_report.add(
+                COMPRESSION_SECTION,
+                {
+                    'request': subject,
+                    'accept encoding': encoding,
+                    'content encoding': 'не поддерживается тестером',
+                },
+            )
+            continue
+
+        same = _same_content(response.content, identity.content)
+        if encoding == IDENTITY_ENCODING and response.content_encoding != IDENTITY_ENCODING:
+            errors.append(
+                f'ответ сжат {response.content_encoding}, хотя сжатие не запрашивалось'
+            )
+        elif not same:
+            errors.append(
+                f'{encoding} (Content-Encoding: {response.content_encoding}): '
+                f'{response.decoded_bytes} байт вместо {identity.decoded_bytes}'
+            )
+
+        test_report.add(
+            COMPRESSION_SECTION,
+            {
+                'request': subject,
+                'accept encoding': encoding,
+                'content encoding': response.content_encoding,
+                'wire bytes': response.wire_bytes,
+                'decoded bytes': response.decoded_bytes,
+                'wire bytes, %': _ratio_percent(response.wire_bytes, identity.wire_bytes),
+                'time, s': response.seconds,
+                'time, %': _ratio_percent(response.seconds, identity.seconds),
+                'same content': 'да' if same else 'нет',
+            },
+        )
+
+    assert not errors, (
+        f'Ошибки сжатия ответов {subject}: ' + '; '.join(errors)
+    )
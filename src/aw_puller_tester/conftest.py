@@ -1,5 +1,7 @@
 from typing import Generator
+import os
 import uuid
+from functools import partial
 from pathlib import Path
 from urllib.parse import urlparse
 
@@ -9,31 +11,386 @@ import httpx
 from pydantic import ValidationError
 from moto.server import ThreadedMotoServer
 import boto3
+from botocore.config import Config
 
-from aw_puller_tester.dto import TestConfig
-from aw_puller_tester.tools import delete_s3_folder
+from aw_puller_tester.benchmark import BENCHMARK_PARQUET_SECTION, load_benchmark_baseline
+from aw_puller_tester.dto import (
+    TestBenchmarkSettings,
+    TestCompressionSettings,
+    TestConfig,
+    TestContentNegotiationSettings,
+    TestObjectsCatalogSettings,
+    TestPayloadProfileSettings,
+    TestPerformanceSettings,
+    TestStreamingSettings,
+)
+from aw_puller_tester.export_cache import ExportCache
+from aw_puller_tester.http_client import (
+    CONNECTION_POOL_SECTION,
+    ConnectionPoolStats,
+    connector_client_options,
+)
+from aw_puller_tester.reference_connector import (
+    DEMO_DB,
+    ReferenceConnector,
+    ReferenceConnectorServer,
+    ReferenceConnectorSettings,
+    create_demo_data,
+)
+from aw_puller_tester.report import (
+    MEMORY_SECTION,
+    REPORT_PROPERTY,
+    TestReport,
+    TestReportWriter,
+    memory_report_row,
+)
+from aw_puller_tester.tools import (
+    DEFAULT_S3_DOWNLOAD_WORKERS,
+    delete_s3_folder,
+    parquet_object_request,
+    parquet_sql_request,
+)
+from aw_puller_tester.parquet_export import (
+    DEFAULT_MAX_CONCURRENCY,
+    PARQUET_POLLING_SECTION,
+    PARQUET_RETRY_AFTER_SECTION,
+    ParquetExportJob,
+    PollingPolicy,
+    find_retry_after_overestimates,
+    polling_report_row,
+    run_parquet_exports,
+)
 
 
-@pytest.fixture(scope='session')
-def test_config():
+TEST_CONFIG_KEY = pytest.StashKey[TestConfig]()
+MOTO_SERVER_KEY = pytest.StashKey[ThreadedMotoServer]()
+REFERENCE_CONNECTOR_KEY = pytest.StashKey[ReferenceConnectorServer]()
+
+# ключ pytest кэша, в котором хранятся длительности тестов предыдущего запуска
+DURATIONS_CACHE_KEY = 'aw_puller_tester/durations'
+
+# длительности тестов текущего запуска
+_durations: dict[str, float] = {}
+
+# отчет запуска, который выводится после выполнения тестов
+_report = TestReport()
+
+
+def find_test_config_file() -> Path | None:
     """
-    Фикступа с объектом конфигурации тестовых случаев
+    Возвращает путь к ближайшему файлу test_config.yml
     """
-    test_config: TestConfig | None = None
-
     for folder in Path(__file__).parents:
         test_config_file = folder / 'test_config.yml'
         if test_config_file.exists():
-            with open(test_config_file, 'r') as f:
-                try:
-                    return TestConfig.model_validate(yaml.safe_load(f))
-                except ValidationError as e:
-                    pytest.exit(f'Конфигурация тестов из {test_config_file} некорректна: {e}')
-        
-    if test_config is None:
-        pytest.exit('Файл с конфигурацией тестов test_config.yml не найден')
+            return test_config_file
+    return None
+
+
+def resolve_config_path(path: str) -> Path:
+    """
+    Возвращает путь из конфигурации. Относительные пути отсчитываются от папки test_config.yml
+    """
+    test_config_file = find_test_config_file()
+    if test_config_file is None or Path(path).is_absolute():
+        return Path(path)
+    return test_config_file.parent / path
+
+
+def load_test_config() -> TestConfig:
+    """
+    Загружает конфигурацию тестовых случаев из ближайшего файла test_config.yml
+    """
+    test_config_file = find_test_config_file()
+    if test_config_file is None:
+        pytest.exit('Файл с конфигурацией тестов test_config.yml не найден')
+
+    with open(test_config_file, 'r') as f:
+        try:
+            return TestConfig.model_validate(yaml.safe_load(f))
+        except ValidationError as e:
+            pytest.exit(f'Конфигурация тестов из {test_config_file} некорректна: {e}')
+
+
+def get_test_config(config: pytest.Config) -> TestConfig:
+    """
+    Возвращает конфигурацию тестовых случаев, загружая ее один раз за запуск
+    """
+    if TEST_CONFIG_KEY not in config.stash:
+        config.stash[TEST_CONFIG_KEY] = load_test_config()
+    return config.stash[TEST_CONFIG_KEY]
+
+
+def is_xdist_worker(config: pytest.Config) -> bool:
+    """
+    Возвращает True, если тесты выполняются в рабочем процессе pytest-xdist
+    """
+    return hasattr(config, 'workerinput')
+
+
+def add_session_report_row(config: pytest.Config, section: str, row: dict):
+    """
+    Добавляет в отчет строку, которая относится ко всему запуску, а не к отдельному тесту.
+    В рабочем процессе pytest-xdist строка передается в основной процесс при его завершении
+    """
+    if is_xdist_worker(config):
+        config.workeroutput.setdefault(REPORT_PROPERTY, []).append((section, row))
+    else:
+        _report.add(section, row)
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc):
+    """
+    Формирует матрицу тестовых случаев по конфигурации: отдельный тест на каждый источник,
+    объект, SQL запрос или фильтр. Такие тесты можно выполнять параллельно (pytest -n).
+    """
+    fixturenames = metafunc.fixturenames
+
+    if 'unavailable_data_source' in fixturenames:
+        data_sources = get_test_config(metafunc.config).data_sources
+        _parametrize(
+            metafunc,
+            ['unavailable_data_source'],
+            [(ds,) for ds in data_sources.unavailable_data_sources()],
+            [f'ds{ds.id}' for ds in data_sources.unavailable_data_sources()],
+            'Нет недоступных источников для тестирования',
+        )
+
+    if 'available_data_source' not in fixturenames:
+        return
+
+    available_data_sources = get_test_config(
+        metafunc.config
+    ).data_sources.available_data_sources()
+
+    if 'object_name' in fixturenames:
+        cases = [
+            (ds, object_name)
+            for ds in available_data_sources
+            for object_name in ds.get_objects()
+        ]
+        _parametrize(
+            metafunc,
+            ['available_data_source', 'object_name'],
+            cases,
+            [f'ds{ds.id}-{object_name}' for ds, object_name in cases],
+            'Нет доступных объектов для тестирования',
+        )
+    elif 'sql_text' in fixturenames:
+        cases = [(ds, sql_text) for ds in available_data_sources for sql_text in ds.get_sql()]
+        _parametrize(
+            metafunc,
+            ['available_data_source', 'sql_text'],
+            cases,
+            [f'ds{ds.id}-sql{i}' for i, (ds, _) in enumerate(cases)],
+            'Нет доступных SQL запросов для тестирования',
+        )
+    elif 'object_filter' in fixturenames:
+        cases = [
+            (ds, object_filter)
+            for ds in available_data_sources
+            for object_filter in ds.get_filters()
+        ]
+        _parametrize(
+            metafunc,
+            ['available_data_source', 'object_filter'],
+            cases,
+            [f'ds{ds.id}-{f.object_name}-filter{i}' for i, (ds, f) in enumerate(cases)],
+            'Нет доступных фильтров для тестирования',
+        )
+    else:
+        _parametrize(
+            metafunc,
+            ['available_data_source'],
+            [(ds,) for ds in available_data_sources],
+            [f'ds{ds.id}' for ds in available_data_sources],
+            'Нет доступных источников для тестирования',
+        )
+
+
+def _parametrize(
+    metafunc: pytest.Metafunc,
+    argnames: list[str],
+    cases: list[tuple],
+    ids: list[str],
+    skip_reason: str,
+):
+    """
+    Параметризует тест списком случаев. Если случаев нет, то тест пропускается
+    с понятной причиной
+    """
+    if not cases:
+        cases = [pytest.param(*[None] * len(argnames), marks=pytest.mark.skip(reason=skip_reason))]
+        ids = ['empty']
+
+    metafunc.parametrize(argnames, cases, ids=ids)
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]):
+    """
+    Упорядочивает тесты по убыванию их длительности в предыдущем запуске, чтобы при
+    параллельном запуске долгие выгрузки больших объектов начинались первыми
+    """
+    cache = getattr(config, 'cache', None)
+    if cache is None:
+        return
+
+    durations = cache.get(DURATIONS_CACHE_KEY, {})
+    items.sort(key=lambda item: -durations.get(item.nodeid, 0.0))
+
+
+def pytest_runtest_logreport(report: pytest.TestReport):
+    """
+    Запоминает длительность выполнения тестов для упорядочивания следующего запуска
+    и собирает строки отчета, добавленные тестами
+    """
+    if report.when == 'call':
+        _durations[report.nodeid] = report.duration
+
+    if report.when == 'teardown':
+        for name, value in report.user_properties:
+            if name == REPORT_PROPERTY:
+                section, row = value
+                _report.add(section, row)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """
+    Собирает строки отчета, которые рабочий процесс pytest-xdist добавил вне тестов
+    """
+    for section, row in getattr(node, 'workeroutput', {}).get(REPORT_PROPERTY, []):
+        _report.add(section, row)
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config):
+    """
+    Выводит отчет запуска (замеры производительности коннектора)
+    """
+    if is_xdist_worker(config) or not _report.sections:
+        return
+
+    terminalreporter.section('Отчет тестирования коннектора')
+    for line in _report.format():
+        terminalreporter.write_line(line)
+
+
+def pytest_sessionstart(session: pytest.Session):
+    """
+    Поднимает временный S3 сервер (s3.mock: true) и эталонный коннектор (connector.reference).
+    При параллельном запуске серверы поднимаются один раз в основном процессе и используются
+    всеми рабочими процессами
+    """
+    config = session.config
+    if is_xdist_worker(config):
+        return
+
+    test_config = get_test_config(config)
+
+    if test_config.s3.mock:
+        start_moto_server(config, test_config)
+
+    if test_config.connector.reference is not None:
+        start_reference_connector(config, test_config)
+
+
+def start_moto_server(config: pytest.Config, test_config: TestConfig):
+    parsed_url = urlparse(test_config.s3.endpoint_url)
+
+    moto_server = ThreadedMotoServer(ip_address=parsed_url.hostname, port=parsed_url.port)
+    moto_server.start()
+    config.stash[MOTO_SERVER_KEY] = moto_server
+
+    s3_client = boto3.client(
+        's3',
+        endpoint_url=test_config.s3.endpoint_url,
+        aws_access_key_id=test_config.s3.username,
+        aws_secret_access_key=test_config.s3.password,
+    )
+    s3_client.create_bucket(Bucket=test_config.s3.bucket)
+    s3_client.close()
+
+
+def start_reference_connector(config: pytest.Config, test_config: TestConfig):
+    reference = test_config.connector.reference
+    data_dir = resolve_config_path(reference.data_dir)
+
+    if reference.demo_rows is not None and not (data_dir / DEMO_DB).exists():
+        create_demo_data(data_dir, reference.demo_rows)
+
+    connector = ReferenceConnector(
+        ReferenceConnectorSettings(
+            data_dir=data_dir,
+            s3_endpoint_url=test_config.s3.endpoint_url,
+            s3_username=test_config.s3.username,
+            s3_password=test_config.s3.password,
+            s3_bucket=test_config.s3.bucket,
+            retry_after=reference.retry_after,
+            export_workers=reference.export_workers,
+            rows_per_file=reference.rows_per_file,
+        )
+    )
+
+    parsed_url = urlparse(test_config.connector.url)
+    server = ReferenceConnectorServer(connector, parsed_url.hostname, parsed_url.port or 80)
+    server.start()
+    config.stash[REFERENCE_CONNECTOR_KEY] = server
+
+
+def pytest_sessionfinish(session: pytest.Session):
+    config = session.config
+    if is_xdist_worker(config):
+        add_session_report_row(
+            config, MEMORY_SECTION, memory_report_row(config.workerinput['workerid'])
+        )
+        return
+
+    add_session_report_row(config, MEMORY_SECTION, memory_report_row('main'))
+
+    cache = getattr(config, 'cache', None)
+    if cache is not None and _durations:
+        durations = cache.get(DURATIONS_CACHE_KEY, {})
+        durations.update(_durations)
+        cache.set(DURATIONS_CACHE_KEY, durations)
+
+    benchmark_settings = get_test_config(config).benchmark
+    if benchmark_settings is not None and benchmark_settings.output and _report.sections:
+        _report.write_json(resolve_config_path(benchmark_settings.output))
+
+    reference_connector = config.stash.get(REFERENCE_CONNECTOR_KEY, None)
+    if reference_connector is not None:
+        reference_connector.stop()
+
+    moto_server = config.stash.get(MOTO_SERVER_KEY, None)
+    if moto_server is not None:
+        # чистим за собой mock сервер
+        parsed_url = urlparse(get_test_config(config).s3.endpoint_url)
+        httpx.post(f'http://{parsed_url.netloc}/moto-api/reset')
+        moto_server.stop()
+
+
+@pytest.fixture(scope='session')
+def test_config(request) -> TestConfig:
+    """
+    Фикступа с объектом конфигурации тестовых случаев
+    """
+    return get_test_config(request.config)
+
+
+@pytest.fixture(scope='session')
+def performance_settings(test_config) -> TestPerformanceSettings:
+    """
+    Возвращает пороги проверок производительности коннектора
+    """
+    return test_config.performance
+
 
-    return test_config
+@pytest.fixture(scope='function')
+def test_report(request) -> TestReportWriter:
+    """
+    Возвращает объект для добавления строк в отчет запуска
+    """
+    return TestReportWriter(request.node.user_properties)
 
 
 @pytest.fixture(scope='session')
@@ -52,44 +409,143 @@ def connector_timeout(test_config) -> int:
     return test_config.connector.timeout or 10
 
 
-@pytest.fixture(scope='function')
+@pytest.fixture(scope='session')
 def connector_client(
-    connector_url: str, connector_timeout: int
+    request, test_config, connector_url: str, connector_timeout: int
 ) -> Generator[httpx.Client, None, None]:
-    with httpx.Client(base_url=connector_url, timeout=connector_timeout) as client:
+    """
+    Возвращает HTTP клиент к коннектору, общий для всех тестов запуска. Соединения
+    из пула (keep-alive) переиспользуются между тестами. После завершения тестов
+    в отчет добавляется статистика переиспользования соединений
+    """
+    stats = ConnectionPoolStats()
+
+    with httpx.Client(
+        base_url=connector_url,
+        timeout=connector_timeout,
+        event_hooks=stats.event_hooks(),
+        **connector_client_options(test_config.connector),
+    ) as client:
         yield client
 
+    if stats.requests:
+        add_session_report_row(
+            request.config,
+            CONNECTION_POOL_SECTION,
+            {'worker': os.environ.get('PYTEST_XDIST_WORKER', 'main'), **stats.to_report_row()},
+        )
+
+
+@pytest.fixture(scope='session')
+def parquet_polling(test_config) -> PollingPolicy:
+    """
+    Возвращает стратегию опроса заданий на выгрузку в parquet
+    """
+    polling = test_config.connector.polling
+    return PollingPolicy(
+        initial_delay=polling.initial_delay,
+        multiplier=polling.multiplier,
+        max_delay=polling.max_delay,
+        jitter=polling.jitter,
+    )
+
+
+@pytest.fixture(scope='session')
+def parquet_exporter(
+    request, test_config, connector_url: str, connector_timeout: int, parquet_polling
+):
+    """
+    Возвращает функцию, которая конкурентно выполняет набор выгрузок в parquet
+    (параметры run_parquet_exports, например max_concurrency, можно переопределить).
+    После завершения тестов в отчет добавляется статистика опроса заданий и выгрузки,
+    для которых коннектор сильно завысил Retry-After
+    """
+    jobs: list[ParquetExportJob] = []
+
+    export = partial(
+        run_parquet_exports,
+        base_url=connector_url,
+        timeout=connector_timeout,
+        max_concurrency=test_config.connector.max_concurrent_exports or DEFAULT_MAX_CONCURRENCY,
+        client_options=connector_client_options(test_config.connector),
+        polling=parquet_polling,
+    )
+
+    def run(request_jsons: list[dict], **kwargs) -> list[ParquetExportJob]:
+        completed = export(request_jsons, **kwargs)
+        jobs.extend(completed)
+        return completed
+
+    yield run
+
+    if not jobs:
+        return
+
+    worker = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+    add_session_report_row(
+        request.config, PARQUET_POLLING_SECTION, {'worker': worker, **polling_report_row(jobs)}
+    )
+    for row in find_retry_after_overestimates(
+        jobs, test_config.connector.polling.max_retry_after_overestimate
+    ):
+        add_session_report_row(
+            request.config, PARQUET_RETRY_AFTER_SECTION, {'worker': worker, **row}
+        )
+
+
+@pytest.fixture(scope='function')
+def timed_parquet_export(parquet_exporter, performance_settings, etl_temp_run_folder):
+    """
+    Возвращает функцию для замера времени выгрузки в parquet: выгрузка выполняется отдельно
+    от других выгрузок (не через кэш выгрузок) в новую папку временной etl папки теста,
+    задание опрашивается с постоянной короткой паузой performance.poll_interval
+    """
+    polling = PollingPolicy.fixed(performance_settings.poll_interval)
+    runs = 0
+
+    def run(request_json: dict) -> ParquetExportJob:
+        nonlocal runs
+        export_path_key = os.path.join(etl_temp_run_folder, f'timed{runs}', 'data.parquet')
+        runs += 1
+
+        [job] = parquet_exporter(
+            [{**request_json, 'folder': f's3://{export_path_key}'}], polling=polling
+        )
+        return job
+
+    return run
+
 
 @pytest.fixture(scope='session')
 def etl_s3_client(test_config):
     """ 
     Возвращает клиент к S3 серверу для ETL процессов
     """
-    parsed_url = urlparse(test_config.s3.endpoint_url)
-
-    if test_config.s3.mock:
-        moto_server = ThreadedMotoServer(ip_address=parsed_url.hostname, port=parsed_url.port)
-        moto_server.start()
-
     s3_client = boto3.client(
         's3',
         endpoint_url=test_config.s3.endpoint_url,
         aws_access_key_id=test_config.s3.username,
         aws_secret_access_key=test_config.s3.password,
+        # пул соединений соответствует количеству потоков, которые параллельно скачивают части parquet
+        config=Config(
+            max_pool_connections=test_config.s3.download_workers
+            or DEFAULT_S3_DOWNLOAD_WORKERS
+        ),
     )
 
-    if test_config.s3.mock:
-        s3_client.create_bucket(Bucket='aw-etl')
-
     try:
         yield s3_client
     finally:
         s3_client.close()
 
-        if test_config.s3.mock:
-            # чистим за собой mock сервер
-            httpx.post(f'http://{parsed_url.netloc}/moto-api/reset')
-            moto_server.stop()
+
+@pytest.fixture(scope='session')
+def etl_run_folder_prefix() -> str:
+    """
+    Возвращает префикс папок в runs/, свой для каждого рабочего процесса при параллельном запуске
+    """
+    worker_id = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+    return f'runs/{worker_id}-{uuid.uuid4().hex}'
 
 
 @pytest.fixture(scope='session')
@@ -98,11 +554,11 @@ def etl_s3_bucket(test_config):
 
 
 @pytest.fixture(scope='function')
-def etl_temp_run_folder(etl_s3_client, etl_s3_bucket):
+def etl_temp_run_folder(etl_s3_client, etl_s3_bucket, etl_run_folder_prefix):
     """ 
     Возвращает временную etl папку в runs/. После выполнения теста содержимое папки очищается 
     """
-    folder_key = f'runs/{uuid.uuid4().hex}'
+    folder_key = f'{etl_run_folder_prefix}/{uuid.uuid4().hex}'
 
     try:
         yield folder_key
@@ -111,4 +567,146 @@ def etl_temp_run_folder(etl_s3_client, etl_s3_bucket):
             s3_client=etl_s3_client,
             bucket=etl_s3_bucket,
             folder_key=folder_key
-        )
\ No newline at end of file
+        )
+
+
+@pytest.fixture(scope='session')
+def session_export_cache(
+    test_config, parquet_exporter, etl_s3_client, etl_s3_bucket, etl_run_folder_prefix
+):
+    """
+    Возвращает кэш выгрузок в parquet, общий для всех тестов запуска. После завершения
+    тестов все выгрузки кэша удаляются из S3
+    """
+    export_cache = ExportCache(
+        exporter=parquet_exporter,
+        s3_client=etl_s3_client,
+        bucket=etl_s3_bucket,
+        folder_key=f'{etl_run_folder_prefix}/cache',
+        max_size_bytes=test_config.export_cache.max_size_mb * 1024 * 1024,
+    )
+
+    try:
+        yield export_cache
+    finally:
+        export_cache.clear()
+
+
+@pytest.fixture(scope='session')
+def warm_export_cache(request, test_config, session_export_cache):
+    """
+    Выполняет полные выгрузки всех объектов и SQL запросов из конфигурации одним конкурентным
+    набором, чтобы при последовательном запуске тесты не выгружали данные по одной выгрузке.
+    В параллельном режиме (pytest -n) выгрузки не выполняются заранее: тесты и так выгружают
+    данные одновременно, а кэш у каждого процесса свой
+    """
+    if is_xdist_worker(request.config):
+        return
+
+    request_jsons = []
+    for ds in test_config.data_sources.available_data_sources():
+        data_source = ds.to_data_source()
+        request_jsons += [parquet_object_request(data_source, name) for name in ds.get_objects()]
+        request_jsons += [parquet_sql_request(data_source, sql) for sql in ds.get_sql()]
+
+    if request_jsons:
+        session_export_cache.export_many(request_jsons)
+        session_export_cache.release()
+
+
+@pytest.fixture(scope='function')
+def parquet_export_cache(session_export_cache, warm_export_cache) -> ExportCache:
+    """
+    Возвращает общий кэш выгрузок в parquet. Выгрузки, полученные тестом, не удаляются
+    из кэша до завершения теста
+    """
+    try:
+        yield session_export_cache
+    finally:
+        session_export_cache.release()
+
+
+@pytest.fixture(scope='session')
+def benchmark_settings(test_config) -> TestBenchmarkSettings:
+    """
+    Возвращает настройки бенчмарков. Если бенчмарки не настроены, то зависящие от них
+    тесты пропускаются
+    """
+    if test_config.benchmark is None:
+        pytest.skip('Бенчмарки не настроены (раздел benchmark в конфигурации)')
+    return test_config.benchmark
+
+
+@pytest.fixture(scope='session')
+def streaming_settings(test_config) -> TestStreamingSettings:
+    """
+    Возвращает настройки потоковой проверки выгрузок. Если они не заданы, то потоковая
+    проверка пропускается
+    """
+    if test_config.streaming is None:
+        pytest.skip('Потоковая проверка выгрузок не настроена (раздел streaming в конфигурации)')
+    return test_config.streaming
+
+
+@pytest.fixture(scope='session')
+def payload_profile_settings(test_config) -> TestPayloadProfileSettings:
+    """
+    Возвращает настройки профиля object-data по размеру ответа. Если они не заданы,
+    то профиль не строится
+    """
+    if test_config.payload_profile is None:
+        pytest.skip(
+            'Профиль object-data по размеру ответа не настроен (раздел payload_profile в конфигурации)'
+        )
+    return test_config.payload_profile
+
+
+@pytest.fixture(scope='session')
+def content_negotiation_settings(test_config) -> TestContentNegotiationSettings:
+    """
+    Возвращает настройки сравнения форматов ответа object-data. Если они не заданы,
+    то форматы не сравниваются
+    """
+    if test_config.content_negotiation is None:
+        pytest.skip(
+            'Сравнение форматов ответа object-data не настроено '
+            '(раздел content_negotiation в конфигурации)'
+        )
+    return test_config.content_negotiation
+
+
+@pytest.fixture(scope='session')
+def compression_settings(test_config) -> TestCompressionSettings:
+    """
+    Возвращает настройки сравнения сжатых и несжатых ответов коннектора. Если они не
+    заданы, то сжатие не проверяется
+    """
+    if test_config.compression is None:
+        pytest.skip('Сжатие ответов не проверяется (раздел compression в конфигурации)')
+    return test_config.compression
+
+
+@pytest.fixture(scope='session')
+def objects_catalog_settings(test_config) -> TestObjectsCatalogSettings:
+    """
+    Возвращает настройки замеров списка объектов источника. Если они не заданы,
+    то замеры не выполняются
+    """
+    if test_config.objects_catalog is None:
+        pytest.skip('Замеры списка объектов не настроены (раздел objects_catalog в конфигурации)')
+    return test_config.objects_catalog
+
+
+@pytest.fixture(scope='session')
+def benchmark_baseline(benchmark_settings) -> dict[str, dict]:
+    """
+    Возвращает результаты базового запуска бенчмарка выгрузки в parquet по названиям случаев
+    """
+    if not benchmark_settings.baseline:
+        return {}
+
+    baseline_file = resolve_config_path(benchmark_settings.baseline)
+    if not baseline_file.exists():
+        pytest.exit(f'Файл с базовыми результатами бенчмарка {baseline_file} не найден')
+
+    return load_benchmark_baseline(baseline_file, BENCHMARK_PARQUET_SECTION)
@@ -0,0 +1,112 @@
+import httpx
+
+from aw_puller_tester.checksum import (
+    align_table_types,
+    mismatched_columns,
+    missing_values_columns,
+    table_checksums,
+)
+from aw_puller_tester.dto import TestContentNegotiationSettings
+from aw_puller_tester.object_data import JSON_MEDIA_TYPE, OBJECT_DATA_MEDIA_TYPES
+from aw_puller_tester.payload_profile import ObjectDataTiming, measure_object_data, median_timing
+from aw_puller_tester.report import TestReportWriter
+
+
+CONTENT_NEGOTIATION_SECTION = 'Форматы ответа object-data'
+
+
+def measure_object_data_formats(
+    client: httpx.Client,
+    url: str,
+    request_json: dict,
+    settings: TestContentNegotiationSettings,
+) -> dict[str, ObjectDataTiming]:
+    """
+    Запрашивает одни и те же данные в каждом формате из OBJECT_DATA_MEDIA_TYPES (заголовок
+    Accept) и возвращает медианы замеров по запрошенным форматам
+    """
+    if settings.limit is not None:
+        request_json = {**request_json, 'limit': settings.limit}
+
+    return {
+        media_type: median_timing(
+            [
+                measure_object_data(client, url, request_json, accept=media_type)
+                for _ in range(max(settings.repeat, 1))
+            ]
+        )
+        for media_type in OBJECT_DATA_MEDIA_TYPES
+    }
+
+
+def _ratio_percent(value: float, json_value: float) -> float | None:
+    return value / json_value * 100 if json_value else None
+
+
+def check_content_negotiation(
+    subject: str,
+    timings: dict[str, ObjectDataTiming],
+    test_report: TestReportWriter,
+    limit: int | None = None,
+):
+    """
+    Сравнивает ответы в альтернативных форматах с JSON ответом: размер, время ответа и время
+    разбора тестером добавляются в отчет. Данные форматов, которые коннектор поддерживает
+    (Content-Type ответа совпадает с Accept), сравниваются с JSON ответом по контрольным
+    суммам столбцов, если все форматы запрошены одним и тем же запросом с limit и в JSON
+    ответе не больше limit строк. Иначе (без limit источник может вернуть в отдельных
+    запросах разные строки) проверяется, что каждое значение ответа есть в том же столбце
+    JSON ответа, и сравнивается количество строк. Если коннектор не поддерживает формат,
+    то это не ошибка.
+    """
+    json_timing = timings[JSON_MEDIA_TYPE]
+    complete = (
+        limit is not None
+        and all(timing.limit == limit for timing in timings.values())
+        and json_timing.rows <= limit
+    )
+
+    errors = []
+    for media_type, timing in timings.items():
+        supported = timing.media_type == media_type
+
+        mismatched = []
+        if supported and media_type != JSON_MEDIA_TYPE:
+            # значения JSON приводятся к типам формата (например, строки с датами к date32)
+            expected = align_table_types(json_timing.table, timing.table.schema)
+            if complete:
+                mismatched = mismatched_columns(
+                    table_checksums(timing.table), table_checksums(expected)
+                )
+            else:
+                mismatched = missing_values_columns(timing.table, expected)
+            if timing.rows != json_timing.rows or mismatched:
+                errors.append(
+                    f'{media_type}: {timing.rows} строк вместо {json_timing.rows}, '
+                    f'отличаются столбцы {mismatched}'
+                )
+
+        test_report.add(
+            CONTENT_NEGOTIATION_SECTION,
+            {
+                'request': subject,
+                'accept': media_type,
+                'content type': timing.media_type,
+                'supported': 'да' if supported else 'нет',
+                'rows': timing.rows,
+                'bytes': timing.bytes,
+                'bytes, %': _ratio_percent(timing.bytes, json_timing.bytes),
+                'ttfb, s': timing.ttfb,
+                'total, s': timing.total,
+                'total, %': _ratio_percent(timing.total, json_timing.total),
+                'parse, s': timing.parse,
+                'parse, %': _ratio_percent(timing.parse, json_timing.parse),
+                'compared': 'контрольные суммы' if complete else 'значения в JSON ответе',
+                'mismatched columns': ', '.join(mismatched),
+            },
+        )
+
+    assert not errors, (
+        f'Данные {subject} в альтернативных форматах не совпадают с JSON ответом: '
+        + '; '.join(errors)
+    )
@@ -1,7 +1,7 @@
 from typing import Any
 from enum import Enum
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class DataSource(BaseModel):
@@ -23,6 +23,12 @@ class DataSourceObject(BaseModel):
     type: str
 
 
+# валидация списка объектов одним вызовом, без цикла по объектам на Python
+DATA_SOURCE_OBJECTS = TypeAdapter(list[DataSourceObject])
+# неплоский список объектов: схема -> названия объектов
+DATA_SOURCE_OBJECT_TREE = TypeAdapter(dict[str, list[str]], config={'strict': True})
+
+
 class SimpleType(str, Enum):
     """
     Типы полей, которые исползуются в AW
@@ -86,6 +92,18 @@ class TestCaseDataSourceObjectFilter(BaseModel):
     operator: str | None = None
     value: Any
 
+    def to_parquet_filter(self) -> dict:
+        return {
+            'field_name': self.field_name,
+            'operator': self.operator,
+            'value': self.value,
+        }
+
+    def describe(self) -> str:
+        if self.field_name is None:
+            return str(self.value)
+        return f'{self.field_name} {self.operator} {self.value}'
+
 
 class TestCaseDataSource(BaseModel):
     """
@@ -143,12 +161,165 @@ class TestCaseDataSources(BaseModel):
         )
     
 
+class TestConnectionPoolSettings(BaseModel):
+    """
+    Настройки пула соединений HTTP клиента к коннектору. None - без ограничения
+    """
+    max_connections: int | None = 100
+    max_keepalive_connections: int | None = 20
+    keepalive_expiry: float | None = 5.0
+
+
+class TestPollingSettings(BaseModel):
+    """
+    Настройки опроса заданий на выгрузку в parquet
+    """
+    initial_delay: float = 0.1
+    multiplier: float = 2.0
+    max_delay: float = 5.0
+    jitter: float = 0.1
+    max_retry_after_overestimate: float = 1.0
+
+
+class TestReferenceConnectorSettings(BaseModel):
+    """
+    Настройки эталонного коннектора, который тестер запускает вместо внешнего коннектора
+    """
+    data_dir: str = 'reference_data'
+    demo_rows: int | None = 10_000
+    retry_after: float = 1.0
+    export_workers: int = 4
+    rows_per_file: int = 1_000_000
+
+
 class TestConnector(BaseModel):
     """ 
     Описание коннектора
     """
     url: str
     timeout: int | None = None
+    max_concurrent_exports: int | None = None
+    http2: bool = False
+    accept_encoding: list[str] | None = None
+    pool: TestConnectionPoolSettings = TestConnectionPoolSettings()
+    polling: TestPollingSettings = TestPollingSettings()
+    reference: TestReferenceConnectorSettings | None = None
+
+
+class TestExportCacheSettings(BaseModel):
+    """
+    Настройки кэша выгрузок в parquet, общего для всех тестов запуска
+    """
+    max_size_mb: int = 1024
+
+
+class TestLoadSettings(BaseModel):
+    """
+    Настройки нагрузочного тестирования коннектора
+    """
+    clients: int = 10
+    duration: float | None = None
+    requests: int | None = None
+    endpoints: list[str] | None = None
+    max_error_rate: float | None = None
+
+
+class TestBenchmarkSettings(BaseModel):
+    """
+    Настройки бенчмарка выгрузки в parquet
+    """
+    output: str | None = None
+    baseline: str | None = None
+    max_regression_percent: float = 10.0
+    repeat: int = 1
+    poll_interval: float = 0.05
+    max_overshoot_ratio: float = 0.1
+
+
+class TestScalingSettings(BaseModel):
+    """
+    Настройки проверки масштабирования одновременных выгрузок в parquet
+    """
+    max_concurrency: int = 8
+    saturation_gain: float = 0.1
+    poll_interval: float = 0.05
+
+
+class TestLayoutSettings(BaseModel):
+    """
+    Пороги проверки структуры выгруженных parquet файлов
+    """
+    min_row_group_rows: int = 10_000
+    allow_uncompressed: bool = False
+    require_statistics: bool = True
+    low_cardinality_ratio: float = 0.1
+    sample_rows: int = 100_000
+
+
+class TestPerformanceSettings(BaseModel):
+    """
+    Пороги проверок производительности коннектора. Если strict: true, то найденные
+    проблемы приводят к ошибке теста, иначе выводятся предупреждения
+    """
+    strict: bool = False
+    max_limit_time_ratio: float = 0.5
+    max_limit_bytes_ratio: float = 0.5
+    min_full_export_seconds: float = 1.0
+    min_full_export_rows: int = 1000
+    projection_tolerance: float = 0.25
+    selective_filter_max_selectivity: float = 0.1
+    max_filter_time_ratio: float = 0.5
+    poll_interval: float = 0.05
+    layout: TestLayoutSettings = TestLayoutSettings()
+
+
+class TestStreamingSettings(BaseModel):
+    """
+    Настройки потоковой проверки выгрузок: размер пакета в строках и ограничение
+    памяти pyarrow на чтение одной выгрузки (None - без ограничения)
+    """
+    batch_size: int = 65536
+    max_memory_mb: int | None = 512
+
+
+class TestPayloadProfileSettings(BaseModel):
+    """
+    Настройки профиля object-data и sql-object-data по размеру ответа: значения limit,
+    количество повторов каждого запроса и допустимый наклон роста времени ответа
+    """
+    limits: list[int] = [100, 1_000, 10_000, 100_000]
+    repeat: int = 1
+    max_slope: float = 1.2
+    min_seconds: float = 0.5
+
+
+class TestContentNegotiationSettings(BaseModel):
+    """
+    Настройки сравнения форматов ответа object-data и sql-object-data (JSON, NDJSON,
+    Arrow IPC): limit запросов (None - без limit) и количество повторов каждого запроса
+    """
+    limit: int | None = 10_000
+    repeat: int = 3
+
+
+class TestObjectsCatalogSettings(BaseModel):
+    """
+    Настройки замеров списка объектов источника: значения limit для постраничных запросов,
+    количество повторов каждого запроса и размер каталога, начиная с которого коннектор
+    должен поддерживать постраничное получение списка
+    """
+    limits: list[int] = [100, 1_000, 10_000, 100_000]
+    repeat: int = 3
+    max_unpaged_objects: int = 10_000
+
+
+class TestCompressionSettings(BaseModel):
+    """
+    Настройки сравнения сжатых и несжатых ответов коннектора: запрашиваемые кодировки
+    сжатия (Accept-Encoding) и количество повторов каждого запроса
+    """
+    encodings: list[str] = ['gzip', 'zstd']
+    repeat: int = 3
 
 
 class TestS3Settings(BaseModel):
@@ -160,6 +331,7 @@ class TestS3Settings(BaseModel):
     username: str
     password: str
     bucket: str
+    download_workers: int | None = None
 
 
 
@@ -173,3 +345,13 @@ class TestConfig(BaseModel):
     connector: TestConnector
     s3: TestS3Settings
     data_sources: TestCaseDataSources
+    export_cache: TestExportCacheSettings = TestExportCacheSettings()
+    load: TestLoadSettings | None = None
+    benchmark: TestBenchmarkSettings | None = None
+    scaling: TestScalingSettings | None = None
+    performance: TestPerformanceSettings = TestPerformanceSettings()
+    streaming: TestStreamingSettings | None = None
+    payload_profile: TestPayloadProfileSettings | None = None
+    content_negotiation: TestContentNegotiationSettings | None = None
+    compression: TestCompressionSettings | None = None
+    objects_catalog: TestObjectsCatalogSettings | None = None
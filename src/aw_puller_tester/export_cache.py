@@ -0,0 +1,203 @@
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+import pyarrow
+from botocore.client import BaseClient
+
+from aw_puller_tester.parquet_export import ParquetExportJob
+from aw_puller_tester.tools import (
+    ParquetExportMeta,
+    delete_s3_folder,
+    read_parquet_metadata,
+    read_parquet_table,
+)
+
+
+@dataclass
+class CachedExport:
+    """
+    Выполненная выгрузка в parquet, сохраненная в кэше
+    """
+
+    request_json: dict
+    export_path_key: str
+    job: ParquetExportJob
+    meta: ParquetExportMeta | None = None
+    table: pyarrow.Table | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        """
+        Коннектор успешно завершил выгрузку
+        """
+        return (
+            self.job.error is None
+            and self.job.response is not None
+            and self.job.response.status_code < 400
+        )
+
+    @property
+    def size(self) -> int:
+        """
+        Размер, который выгрузка занимает в кэше: данные в S3 и считанная в память таблица
+        """
+        return (self.meta.compressed_bytes if self.meta is not None else 0) + (
+            self.table.nbytes if self.table is not None else 0
+        )
+
+
+class ExportCache:
+    """
+    Кэш выгрузок в parquet на время запуска тестов.
+
+    Одинаковые запросы на выгрузку (источник, объект или SQL запрос, поля, фильтры, limit)
+    выполняются у коннектора один раз. Выгруженная папка в S3, метаданные и считанная таблица
+    переиспользуются между тестами. Если суммарный размер выгрузок превышает max_size_bytes,
+    то давно не использованные выгрузки удаляются из кэша вместе с их папками в S3. Выгрузки,
+    полученные текущим тестом, закреплены и не удаляются до вызова release() после теста.
+    Неуспешные выгрузки не кэшируются: следующий тест повторит такой запрос.
+    """
+
+    def __init__(
+        self,
+        exporter: Callable[[list[dict]], list[ParquetExportJob]],
+        s3_client: BaseClient,
+        bucket: str,
+        folder_key: str,
+        max_size_bytes: int,
+    ):
+        self.exporter = exporter
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.folder_key = folder_key
+        self.max_size_bytes = max_size_bytes
+
+        self.exports: OrderedDict[str, CachedExport] = OrderedDict()
+        # ключи выгрузок, которые использует текущий тест
+        self.pinned: set[str] = set()
+        self.exports_count = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(request_json: dict) -> str:
+        return json.dumps(request_json, sort_keys=True, ensure_ascii=False, default=str)
+
+    def export(self, request_json: dict) -> CachedExport:
+        """
+        Возвращает выгрузку для тела запроса (без папки выгрузки), выполняя ее при необходимости
+        """
+        return self.export_many([request_json])[0]
+
+    def export_many(self, request_jsons: list[dict]) -> list[CachedExport]:
+        """
+        Возвращает выгрузки для набора запросов. Отсутствующие в кэше выгрузки выполняются
+        коннектором конкурентно. Возвращенные выгрузки закрепляются до вызова release().
+        """
+        missing: dict[str, dict] = {}
+        failed: dict[str, CachedExport] = {}
+        for request_json in request_jsons:
+            key = self.cache_key(request_json)
+            if key in self.exports:
+                self.hits += 1
+            elif key not in missing:
+                self.misses += 1
+                missing[key] = request_json
+
+        if missing:
+            export_path_keys = []
+            for _ in missing:
+                self.exports_count += 1
+                export_path_keys.append(
+                    os.path.join(self.folder_key, str(self.exports_count), 'data.parquet')
+                )
+
+            jobs = self.exporter(
+                [
+                    {**request_json, 'folder': f's3://{export_path_key}'}
+                    for request_json, export_path_key in zip(missing.values(), export_path_keys)
+                ]
+            )
+
+            for (key, request_json), export_path_key, job in zip(
+                missing.items(), export_path_keys, jobs
+            ):
+                export = CachedExport(
+                    request_json=request_json, export_path_key=export_path_key, job=job
+                )
+                if export.succeeded:
+                    self.exports[key] = export
+                else:
+                    failed[key] = export
+                    delete_s3_folder(self.s3_client, self.bucket, export_path_key)
+
+        exports = []
+        for request_json in request_jsons:
+            key = self.cache_key(request_json)
+            if key in self.exports:
+                self.exports.move_to_end(key)
+                self.pinned.add(key)
+                exports.append(self.exports[key])
+            else:
+                exports.append(failed[key])
+
+        return exports
+
+    def read_meta(self, export: CachedExport) -> ParquetExportMeta:
+        """
+        Возвращает метаданные (футеры) выгрузки
+        """
+        if export.meta is None:
+            export.meta = read_parquet_metadata(
+                self.s3_client, self.bucket, export.export_path_key.rstrip('/') + '/'
+            )
+            self._evict()
+        return export.meta
+
+    def read_table(self, export: CachedExport) -> pyarrow.Table:
+        """
+        Возвращает данные выгрузки в виде pyarrow таблицы
+        """
+        if export.table is None:
+            self.read_meta(export)
+            export.table = read_parquet_table(
+                self.s3_client, self.bucket, export.export_path_key.rstrip('/') + '/'
+            )
+            self._evict()
+        return export.table
+
+    def release(self):
+        """
+        Снимает закрепление выгрузок после завершения теста и сокращает кэш до ограничения
+        """
+        self.pinned.clear()
+        self._evict()
+
+    def _evict(self):
+        """
+        Удаляет давно не использованные выгрузки, пока размер кэша превышает ограничение.
+        Закрепленные выгрузки не удаляются
+        """
+        size = sum(export.size for export in self.exports.values())
+
+        for key in list(self.exports):
+            if size <= self.max_size_bytes:
+                break
+
+            if key in self.pinned:
+                continue
+
+            export = self.exports.pop(key)
+            size -= export.size
+            delete_s3_folder(self.s3_client, self.bucket, export.export_path_key)
+
+    def clear(self):
+        """
+        Очищает кэш и удаляет все выгрузки из S3
+        """
+        self.exports.clear()
+        self.pinned.clear()
+        delete_s3_folder(self.s3_client, self.bucket, self.folder_key)
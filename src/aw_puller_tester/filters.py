@@ -0,0 +1,114 @@
+import re
+
+import pyarrow
+import pyarrow.compute as pc
+
+from aw_puller_tester.dto import TestCaseDataSourceObjectFilter
+
+
+# строковый литерал SQL в одинарных кавычках ('' внутри - экранированная кавычка) или
+# любое значение без кавычек до запятой
+_SQL_LITERAL = re.compile(r"\s*(?:'((?:[^']|'')*)'|([^,]+?))\s*(?:,|$)")
+
+
+class UnsupportedFilterError(ValueError):
+    """
+    Фильтр нельзя проверить локально (например, произвольное SQL условие)
+    """
+
+
+def parse_sql_literal(value):
+    """
+    Возвращает значение SQL литерала: строку без кавычек или значение как есть
+    """
+    if not isinstance(value, str):
+        return value
+
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1].replace("''", "'")
+    if value.upper() == 'NULL':
+        return None
+    return value
+
+
+def parse_sql_list(value) -> list:
+    """
+    Разбирает список значений для оператора IN: SQL литерал "('a', 'b')", список или одно значение
+    """
+    if isinstance(value, list):
+        return [parse_sql_literal(v) for v in value]
+    if not isinstance(value, str):
+        return [value]
+
+    text = value.strip()
+    if text.startswith('(') and text.endswith(')'):
+        text = text[1:-1]
+
+    values = []
+    position = 0
+    while position < len(text):
+        match = _SQL_LITERAL.match(text, position)
+        if match is None or match.end() == position:
+            raise UnsupportedFilterError(f'Не удалось разобрать список значений {value}')
+        quoted, raw = match.groups()
+        values.append(quoted.replace("''", "'") if quoted is not None else parse_sql_literal(raw))
+        position = match.end()
+    return values
+
+
+def _cast_values(values: list, field: pyarrow.Field) -> pyarrow.Array:
+    try:
+        return pyarrow.array(values).cast(field.type)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowNotImplementedError, pyarrow.ArrowTypeError) as e:
+        raise UnsupportedFilterError(
+            f'Значения {values} нельзя привести к типу {field.type} столбца {field.name}: {e}'
+        )
+
+
+def filter_expression(
+    object_filter: TestCaseDataSourceObjectFilter, schema: pyarrow.Schema
+) -> pc.Expression:
+    """
+    Возвращает выражение pyarrow.compute, эквивалентное фильтру выгрузки. Сравнения с NULL
+    отбрасывают строки так же, как в SQL.
+    """
+    if object_filter.field_name is None:
+        raise UnsupportedFilterError(
+            f'Фильтр "{object_filter.value}" задан SQL условием и локально не проверяется'
+        )
+
+    if object_filter.field_name not in schema.names:
+        raise UnsupportedFilterError(f'Столбец {object_filter.field_name} не найден в выгрузке')
+
+    field = schema.field(object_filter.field_name)
+    column = pc.field(object_filter.field_name)
+    operator = (object_filter.operator or '=').strip().upper()
+
+    if operator in ('IN', 'NOT IN'):
+        values = _cast_values(parse_sql_list(object_filter.value), field)
+        expression = column.isin(values)
+        return column.is_valid() & ~expression if operator == 'NOT IN' else expression
+
+    value = parse_sql_literal(object_filter.value)
+
+    if operator in ('LIKE', 'NOT LIKE'):
+        expression = pc.match_like(column, str(value))
+        return ~expression if operator == 'NOT LIKE' else expression
+
+    scalar = _cast_values([value], field)[0]
+
+    if operator == '=':
+        return column == scalar
+    if operator in ('!=', '<>'):
+        return column != scalar
+    if operator == '>':
+        return column > scalar
+    if operator == '>=':
+        return column >= scalar
+    if operator == '<':
+        return column < scalar
+    if operator == '<=':
+        return column <= scalar
+
+    raise UnsupportedFilterError(f'Оператор {object_filter.operator} локально не проверяется')
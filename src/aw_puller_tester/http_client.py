@@ -0,0 +1,104 @@
+import importlib.util
+
+import httpx
+
+from aw_puller_tester.dto import TestConnector
+
+
+CONNECTION_POOL_SECTION = 'Пул соединений к коннектору'
+
+# кодировки сжатия, которые httpx распаковывает только при установленных пакетах
+OPTIONAL_CONTENT_ENCODINGS = {
+    'br': ('brotli', 'brotlicffi'),
+    'zstd': ('zstandard',),
+}
+
+
+def supported_content_encodings() -> list[str]:
+    """
+    Возвращает кодировки сжатия ответов, которые может распаковать HTTP клиент
+    """
+    encodings = ['gzip', 'deflate']
+    for encoding, packages in OPTIONAL_CONTENT_ENCODINGS.items():
+        if any(importlib.util.find_spec(package) is not None for package in packages):
+            encodings.append(encoding)
+    return encodings
+
+
+def accept_encoding_header(encodings: list[str]) -> str:
+    """
+    Возвращает значение заголовка Accept-Encoding из поддерживаемых клиентом кодировок
+    (identity, если ни одна из них не поддерживается)
+    """
+    supported = supported_content_encodings()
+    return ', '.join(e for e in encodings if e in supported) or 'identity'
+
+
+def connector_client_options(connector: TestConnector) -> dict:
+    """
+    Возвращает параметры пула соединений HTTP клиента к коннектору (httpx.Client и httpx.AsyncClient)
+    """
+    pool = connector.pool
+    options = {
+        'limits': httpx.Limits(
+            max_connections=pool.max_connections,
+            max_keepalive_connections=pool.max_keepalive_connections,
+            keepalive_expiry=pool.keepalive_expiry,
+        ),
+        'http2': connector.http2,
+    }
+    if connector.accept_encoding is not None:
+        options['headers'] = {'Accept-Encoding': accept_encoding_header(connector.accept_encoding)}
+    return options
+
+
+class ConnectionPoolStats:
+    """
+    Статистика использования пула соединений синхронного HTTP клиента.
+
+    Новые соединения считаются через расширение trace транспорта httpcore: каждое
+    событие connect_tcp означает, что запрос не смог переиспользовать открытое соединение.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+        self.http_versions: dict[str, int] = {}
+
+    def event_hooks(self) -> dict:
+        return {'request': [self.on_request], 'response': [self.on_response]}
+
+    def on_request(self, request: httpx.Request):
+        self.requests += 1
+        request.extensions['trace'] = self.trace
+
+    def on_response(self, response: httpx.Response):
+        self.http_versions[response.http_version] = (
+            self.http_versions.get(response.http_version, 0) + 1
+        )
+
+    def trace(self, event_name: str, info: dict):
+        if event_name == 'connection.connect_tcp.complete':
+            self.connections += 1
+        elif event_name == 'connection.start_tls.complete':
+            self.tls_handshakes += 1
+
+    @property
+    def reused_requests(self) -> int:
+        """
+        Количество запросов, выполненных через уже открытое соединение
+        """
+        return max(self.requests - self.connections, 0)
+
+    def to_report_row(self) -> dict:
+        return {
+            'requests': self.requests,
+            'connections': self.connections,
+            'tls handshakes': self.tls_handshakes,
+            'reused': self.reused_requests,
+            'reused, %': self.reused_requests / self.requests * 100 if self.requests else None,
+            'http': ', '.join(
+                f'{version}: {count}' for version, count in sorted(self.http_versions.items())
+            ),
+        }
@@ -0,0 +1,141 @@
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+from aw_puller_tester.dto import TestCaseDataSource
+from aw_puller_tester.report import percentile
+
+
+LOAD_ENDPOINTS = [
+    'data-source/ping',
+    'data-source/objects',
+    'data-source/object-meta',
+    'data-source/object-data',
+    'data-source/sql-object-data',
+]
+
+
+def _ms(seconds: float | None) -> float | None:
+    return seconds * 1000 if seconds is not None else None
+
+
+@dataclass
+class EndpointLoadStats:
+    """
+    Результаты нагрузки на один метод коннектора
+    """
+
+    endpoint: str
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def to_report_row(self, elapsed: float) -> dict:
+        return {
+            'endpoint': self.endpoint,
+            'requests': self.requests,
+            'rps': self.requests / elapsed if elapsed > 0 else None,
+            'p50, ms': _ms(percentile(self.latencies, 50)),
+            'p95, ms': _ms(percentile(self.latencies, 95)),
+            'p99, ms': _ms(percentile(self.latencies, 99)),
+            'max, ms': _ms(max(self.latencies, default=None)),
+            'errors, %': self.error_rate * 100,
+        }
+
+
+def build_load_requests(
+    data_sources: list[TestCaseDataSource], endpoints: list[str] | None = None
+) -> list[tuple[str, dict]]:
+    """
+    Возвращает список запросов (метод коннектора, тело запроса), которые используются при нагрузке.
+    Тела запросов совпадают с теми, что отправляют функциональные тесты.
+    """
+    endpoints = endpoints or LOAD_ENDPOINTS
+    requests = []
+
+    for available_data_source in data_sources:
+        data_source = available_data_source.to_data_source().model_dump()
+
+        if 'data-source/ping' in endpoints:
+            requests.append(('data-source/ping', data_source))
+
+        if 'data-source/objects' in endpoints:
+            requests.append(('data-source/objects', {'data_source': data_source}))
+
+        for object_name in available_data_source.get_objects():
+            for endpoint in ('data-source/object-meta', 'data-source/object-data'):
+                if endpoint in endpoints:
+                    requests.append(
+                        (endpoint, {'data_source': data_source, 'object_name': object_name})
+                    )
+
+        if 'data-source/sql-object-data' in endpoints:
+            for sql_text in available_data_source.get_sql():
+                requests.append(
+                    (
+                        'data-source/sql-object-data',
+                        {'data_source': data_source, 'sql_text': sql_text},
+                    )
+                )
+
+    return requests
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    requests: list[tuple[str, dict]],
+    clients: int,
+    duration: float | None = None,
+    total_requests: int | None = None,
+) -> tuple[dict[str, EndpointLoadStats], float]:
+    """
+    Нагружает коннектор clients виртуальными клиентами. Каждый клиент отправляет запросы
+    по кругу, пока не истечет duration секунд или не будет отправлено total_requests запросов.
+    Возвращает статистику по методам и фактическую длительность нагрузки.
+    """
+    stats = {endpoint: EndpointLoadStats(endpoint) for endpoint, _ in requests}
+    request_cycle = itertools.cycle(requests)
+    sent = 0
+
+    started_at = time.monotonic()
+    deadline = started_at + duration if duration is not None else None
+
+    def has_budget() -> bool:
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        if total_requests is not None and sent >= total_requests:
+            return False
+        return True
+
+    async def virtual_client():
+        nonlocal sent
+        while has_budget():
+            sent += 1
+            endpoint, request_json = next(request_cycle)
+            endpoint_stats = stats[endpoint]
+
+            request_started_at = time.monotonic()
+            try:
+                r = await client.post(url=endpoint, json=request_json)
+                await r.aread()
+                failed = r.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+
+            endpoint_stats.latencies.append(time.monotonic() - request_started_at)
+            if failed:
+                endpoint_stats.errors += 1
+
+    await asyncio.gather(*[virtual_client() for _ in range(max(clients, 1))])
+
+    return stats, time.monotonic() - started_at
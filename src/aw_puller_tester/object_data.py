@@ -0,0 +1,447 @@
+import codecs
+import io
+import itertools
+import json
+from typing import Iterable, Iterator
+
+import pyarrow
+import pyarrow.ipc
+
+
+JSON_MEDIA_TYPE = 'application/json'
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+ARROW_STREAM_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+# форматы ответа object-data и sql-object-data, которые тестер умеет разбирать (заголовок Accept)
+OBJECT_DATA_MEDIA_TYPES = [JSON_MEDIA_TYPE, NDJSON_MEDIA_TYPE, ARROW_STREAM_MEDIA_TYPE]
+
+DEFAULT_OBJECT_DATA_BATCH_SIZE = 10_000
+# максимальный размер незавершенного JSON значения в буфере (одна строка данных)
+MAX_PENDING_CHARS = 64 * 1024 * 1024
+# максимальный размер текста, который разбирается одним вызовом json.loads
+BULK_DECODE_CHARS = 1024 * 1024
+
+_VALUE_TYPES = (str, int, float, bool, type(None))
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',:]}'
+
+
+class ObjectDataParseError(ValueError):
+    """
+    Ответ object-data или sql-object-data не соответствует формату {"data": [{...}, ...]}
+    """
+
+
+def object_data_batch(rows: list, first_row: int = 0) -> pyarrow.RecordBatch:
+    """
+    Проверяет строки ответа object-data или sql-object-data (JSON объекты со значениями
+    str, int, float, bool или null) и преобразует их в pyarrow.RecordBatch. Столбцы со
+    значениями разных типов преобразуются в строки. first_row - номер первой строки в data
+    для сообщений об ошибках
+    """
+    try:
+        # вывод типов и преобразование выполняются в pyarrow без цикла по строкам в python
+        array = pyarrow.array(rows)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, OverflowError):
+        array = None
+
+    if (
+        array is not None
+        and pyarrow.types.is_struct(array.type)
+        and array.null_count == 0
+        and not any(pyarrow.types.is_nested(field.type) for field in array.type)
+    ):
+        # pyarrow упорядочивает поля структуры по названию, а столбцы должны идти в порядке
+        # ключей строк (как в ветке ниже)
+        names = list(dict.fromkeys(itertools.chain.from_iterable(rows)))
+        return pyarrow.RecordBatch.from_struct_array(array).select(names)
+
+    for i, row in enumerate(rows):
+        if type(row) is not dict:
+            raise ObjectDataParseError(
+                f'Строка data[{first_row + i}] должна быть JSON объектом, получено: {row!r}'
+            )
+
+    names = list(dict.fromkeys(itertools.chain.from_iterable(rows)))
+    arrays = []
+    for name in names:
+        values = [row.get(name) for row in rows]
+        try:
+            array = pyarrow.array(values)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, OverflowError):
+            array = None
+
+        if array is None or pyarrow.types.is_nested(array.type):
+            for i, value in enumerate(values):
+                if not isinstance(value, _VALUE_TYPES):
+                    raise ObjectDataParseError(
+                        f'Значение data[{first_row + i}].{name} должно быть строкой, числом, '
+                        f'bool или null, получено: {value!r}'
+                    )
+            array = pyarrow.array(
+                [str(v) if v is not None else None for v in values], pyarrow.string()
+            )
+        arrays.append(array)
+
+    return pyarrow.RecordBatch.from_arrays(arrays, names=names)
+
+
+class ObjectDataStreamParser:
+    """
+    Потоковый разбор ответа object-data и sql-object-data.
+
+    Текст ответа подается частями (feed). Все полностью полученные строки массива data
+    разбираются одним вызовом json.loads (до последней "}" в буфере), при неудаче - по одной
+    через json.JSONDecoder.raw_decode. Каждые batch_size строк проверяются и превращаются в
+    pyarrow.RecordBatch (object_data_batch), поэтому в памяти одновременно находится не больше
+    одного пакета строк в виде python объектов.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_OBJECT_DATA_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        # start -> first_key -> colon -> value -> next_key -> key ... -> end,
+        # значение data разбирается по строкам: first_row -> next_row -> row ... -> next_key.
+        # В отличие от first_key и first_row, после запятой (key, row) конец объекта или
+        # массива не допускается
+        self.state = 'start'
+        self.key: str | None = None
+        self.closed = False
+        self.has_data = False
+        # позиция "}", до которой строки разбираются по одной после неудачного json.loads
+        self.bulk_failed_at = -1
+
+        self.rows = 0
+        self.pending_rows: list = []
+        self.batches: list[pyarrow.RecordBatch] = []
+
+    def feed(self, text: str) -> list[pyarrow.RecordBatch]:
+        """
+        Разбирает очередную часть текста ответа и возвращает завершенные пакеты строк
+        """
+        self.buffer = self.buffer[self.pos:] + text
+        self.bulk_failed_at -= self.pos
+        self.pos = 0
+        self._parse()
+
+        if len(self.buffer) - self.pos > MAX_PENDING_CHARS:
+            raise ObjectDataParseError(
+                f'Незавершенное JSON значение длиннее {MAX_PENDING_CHARS} символов '
+                f'(позиция {self.rows} строки data)'
+            )
+
+        batches, self.batches = self.batches, []
+        return batches
+
+    def close(self) -> list[pyarrow.RecordBatch]:
+        """
+        Завершает разбор и возвращает последний пакет строк
+        """
+        self.closed = True
+        self._parse()
+        self._skip_whitespace()
+
+        if self.state != 'end':
+            raise ObjectDataParseError('Ответ коннектора оборвался до конца JSON объекта')
+        if self.pos < len(self.buffer):
+            raise ObjectDataParseError(
+                f'Лишние символы после JSON объекта: {self.buffer[self.pos:self.pos + 50]!r}'
+            )
+        if not self.has_data:
+            raise ObjectDataParseError('В ответе коннектора нет поля data')
+
+        self._flush()
+        batches, self.batches = self.batches, []
+        return batches
+
+    def _skip_whitespace(self):
+        while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+            self.pos += 1
+
+    def _expect(self, chars: str) -> str | None:
+        """
+        Возвращает следующий значимый символ, если он есть в буфере. Символ должен
+        быть одним из chars
+        """
+        self._skip_whitespace()
+        if self.pos >= len(self.buffer):
+            return None
+
+        char = self.buffer[self.pos]
+        if char not in chars:
+            raise ObjectDataParseError(
+                f'Ожидался один из символов {chars!r}, получено: '
+                f'{self.buffer[self.pos:self.pos + 50]!r}'
+            )
+        self.pos += 1
+        return char
+
+    def _decode(self):
+        """
+        Разбирает следующее JSON значение. Возвращает (True, значение) или (False, None),
+        если значение еще не получено целиком
+        """
+        self._skip_whitespace()
+        try:
+            value, end = self.decoder.raw_decode(self.buffer, self.pos)
+        except json.JSONDecodeError as e:
+            if self.closed:
+                raise ObjectDataParseError(f'Ошибка разбора JSON: {e}')
+            return False, None
+
+        # число может продолжиться в следующей части ответа ("3" из "3.25"), поэтому значение
+        # принимается, только если за ним уже получен разделитель
+        if not self.closed and (end == len(self.buffer) or self.buffer[end] not in _DELIMITERS):
+            return False, None
+
+        self.pos = end
+        return True, value
+
+    def _peek(self) -> str | None:
+        self._skip_whitespace()
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else None
+
+    def _parse(self):
+        while True:
+            if self.state == 'start':
+                if self._expect('{') is None:
+                    return
+                self.state = 'first_key'
+
+            elif self.state in ('first_key', 'key'):
+                char = self._peek()
+                if char is None:
+                    return
+                if char == '}':
+                    if self.state == 'key':
+                        raise ObjectDataParseError(f'Лишняя запятая после поля {self.key}')
+                    self.pos += 1
+                    self.state = 'end'
+                    continue
+                if char != '"':
+                    self._expect('"}')
+
+                ok, self.key = self._decode()
+                if not ok:
+                    return
+                self.state = 'colon'
+
+            elif self.state == 'colon':
+                if self._expect(':') is None:
+                    return
+                self.state = 'value'
+
+            elif self.state == 'value':
+                if self.key == 'data':
+                    if self.has_data:
+                        raise ObjectDataParseError('Поле data повторяется в ответе коннектора')
+                    if self._expect('[') is None:
+                        return
+                    self.has_data = True
+                    self.state = 'first_row'
+                else:
+                    ok, _ = self._decode()
+                    if not ok:
+                        return
+                    self.state = 'next_key'
+
+            elif self.state == 'next_key':
+                char = self._expect(',}')
+                if char is None:
+                    return
+                self.state = 'key' if char == ',' else 'end'
+
+            elif self.state in ('first_row', 'row'):
+                char = self._peek()
+                if char is None:
+                    return
+                if char == ']':
+                    if self.state == 'row':
+                        raise ObjectDataParseError(
+                            f'Лишняя запятая после строки data[{self.rows - 1}]'
+                        )
+                    self.pos += 1
+                    self.state = 'next_key'
+                    continue
+
+                rows = self._decode_rows()
+                if rows is None:
+                    return
+                self._add_rows(rows)
+                self.state = 'next_row'
+
+            elif self.state == 'next_row':
+                char = self._expect(',]')
+                if char is None:
+                    return
+                self.state = 'row' if char == ',' else 'next_key'
+
+            else:
+                return
+
+    def _decode_rows(self) -> list | None:
+        """
+        Разбирает все полностью полученные строки data, начиная с текущей позиции
+        """
+        if self.pos > self.bulk_failed_at:
+            end = self.buffer.rfind('}', self.pos, self.pos + BULK_DECODE_CHARS)
+            if end > self.pos:
+                # "}" может оказаться концом объекта ответа или быть внутри строкового значения,
+                # тогда строки до нее разбираются по одной
+                try:
+                    rows = json.loads('[' + self.buffer[self.pos:end + 1] + ']')
+                except json.JSONDecodeError:
+                    self.bulk_failed_at = end
+                else:
+                    self.pos = end + 1
+                    return rows
+
+        ok, row = self._decode()
+        return [row] if ok else None
+
+    def _add_rows(self, rows: list):
+        self.pending_rows.extend(rows)
+        self.rows += len(rows)
+
+        while len(self.pending_rows) >= self.batch_size:
+            self._flush(self.batch_size)
+
+    def _flush(self, size: int | None = None):
+        rows = self.pending_rows[:size] if size is not None else self.pending_rows
+        if not rows:
+            return
+
+        self.pending_rows = self.pending_rows[len(rows):]
+        first_row = self.rows - len(self.pending_rows) - len(rows)
+        self.batches.append(object_data_batch(rows, first_row))
+
+
+def iter_object_data_batches(
+    chunks: Iterable[bytes], batch_size: int = DEFAULT_OBJECT_DATA_BATCH_SIZE
+) -> Iterator[pyarrow.RecordBatch]:
+    """
+    Разбирает ответ object-data или sql-object-data по мере получения байт (например,
+    httpx.Response.iter_bytes()) и возвращает пакеты строк
+    """
+    parser = ObjectDataStreamParser(batch_size)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+
+    for chunk in chunks:
+        yield from parser.feed(decoder.decode(chunk))
+
+    parser.feed(decoder.decode(b'', final=True))
+    yield from parser.close()
+
+
+def iter_ndjson_object_data_batches(
+    chunks: Iterable[bytes], batch_size: int = DEFAULT_OBJECT_DATA_BATCH_SIZE
+) -> Iterator[pyarrow.RecordBatch]:
+    """
+    Разбирает ответ object-data в формате NDJSON (одна строка данных на строку текста)
+    по мере получения байт и возвращает пакеты строк
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    tail = ''
+    rows = []
+    first_row = 0
+
+    for chunk in itertools.chain(chunks, [None]):
+        if chunk is None:
+            lines = [tail + decoder.decode(b'', final=True)]
+        else:
+            lines = (tail + decoder.decode(chunk)).split('\n')
+            tail = lines.pop()
+
+        lines = [line for line in lines if line.strip()]
+        if lines:
+            try:
+                rows.extend(json.loads('[' + ','.join(lines) + ']'))
+            except json.JSONDecodeError as e:
+                raise ObjectDataParseError(
+                    f'Ошибка разбора NDJSON после строки {first_row + len(rows)}: {e}'
+                )
+
+        while len(rows) >= batch_size or (chunk is None and rows):
+            batch, rows = rows[:batch_size], rows[batch_size:]
+            yield object_data_batch(batch, first_row)
+            first_row += len(batch)
+
+
+class _ChunksReader(io.RawIOBase):
+    """
+    Файловый объект для чтения потока байт, который поступает частями
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.pending = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.pending:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return 0
+            self.pending = chunk
+
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+def iter_arrow_object_data_batches(chunks: Iterable[bytes]) -> Iterator[pyarrow.RecordBatch]:
+    """
+    Разбирает ответ object-data в формате Arrow IPC stream по мере получения байт. Как и
+    в JSON ответе, значения столбцов должны быть скалярными
+    """
+    try:
+        reader = pyarrow.ipc.open_stream(io.BufferedReader(_ChunksReader(chunks)))
+        nested = [f.name for f in reader.schema if pyarrow.types.is_nested(f.type)]
+        if nested:
+            raise ObjectDataParseError(
+                f'Значения столбцов {", ".join(nested)} должны быть строкой, числом, bool, '
+                'датой или null'
+            )
+        yield from reader
+    except (pyarrow.ArrowInvalid, OSError) as e:
+        raise ObjectDataParseError(f'Ошибка разбора Arrow IPC stream: {e}')
+
+
+def read_object_data(
+    chunks: Iterable[bytes],
+    batch_size: int = DEFAULT_OBJECT_DATA_BATCH_SIZE,
+    media_type: str = JSON_MEDIA_TYPE,
+) -> pyarrow.Table:
+    """
+    Разбирает ответ object-data или sql-object-data (JSON, NDJSON или Arrow IPC stream)
+    в pyarrow таблицу. Типы столбцов разных пакетов приводятся к общему типу
+    """
+    if media_type == NDJSON_MEDIA_TYPE:
+        batches = list(iter_ndjson_object_data_batches(chunks, batch_size))
+    elif media_type == ARROW_STREAM_MEDIA_TYPE:
+        batches = list(iter_arrow_object_data_batches(chunks))
+    elif media_type == JSON_MEDIA_TYPE:
+        batches = list(iter_object_data_batches(chunks, batch_size))
+    else:
+        raise ObjectDataParseError(f'Неизвестный формат ответа {media_type}')
+
+    if not batches:
+        return pyarrow.table({})
+
+    return pyarrow.concat_tables(
+        [pyarrow.Table.from_batches([batch]) for batch in batches], promote_options='permissive'
+    )
+
+
+def response_media_type(content_type: str | None) -> str:
+    """
+    Возвращает формат ответа по заголовку Content-Type (без параметров). Если заголовка
+    нет, то ответ считается JSON
+    """
+    if not content_type:
+        return JSON_MEDIA_TYPE
+    return content_type.split(';')[0].strip().lower()
@@ -0,0 +1,293 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+import httpx
+
+from aw_puller_tester.report import percentile
+
+
+DEFAULT_RETRY_AFTER = 5  # максимальная пауза между опросами, если коннектор не указал Retry-After
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_RETRY_AFTER_OVERESTIMATE = 1.0
+
+PARQUET_POLLING_SECTION = 'Опрос выгрузок в parquet'
+PARQUET_RETRY_AFTER_SECTION = 'Неточные подсказки Retry-After'
+
+
+@dataclass
+class PollingPolicy:
+    """
+    Стратегия опроса задания на выгрузку: экспоненциально растущая пауза с ограничением
+    max_delay и случайным разбросом jitter (доля паузы). Пауза не превышает Retry-After,
+    поэтому быстрые выгрузки забираются сразу после готовности, а не через Retry-After секунд.
+    """
+
+    initial_delay: float = 0.1
+    multiplier: float = 2.0
+    max_delay: float = DEFAULT_RETRY_AFTER
+    jitter: float = 0.1
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """
+        Возвращает паузу перед опросом с номером attempt (с нуля)
+        """
+        delay = min(self.initial_delay * self.multiplier**attempt, self.max_delay)
+        delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        if retry_after is not None:
+            delay = min(delay, retry_after)
+        return max(delay, 0.0)
+
+    @classmethod
+    def fixed(cls, interval: float) -> 'PollingPolicy':
+        """
+        Возвращает стратегию опроса с постоянной паузой interval без разброса. Используется
+        для замеров времени выгрузки: при экспоненциальной паузе время получения выгрузки
+        округляется до моментов опроса (0.1, 0.3, 0.7 ... с)
+        """
+        return cls(initial_delay=interval, multiplier=1.0, max_delay=interval, jitter=0.0)
+
+
+@dataclass
+class ParquetExportJob:
+    """
+    Задание на выгрузку данных в parquet и результат его выполнения
+    """
+
+    request_json: dict
+    response: httpx.Response | None = None
+    error: str | None = None
+    submitted_at: float | None = None
+    finished_at: float | None = None
+    polls: int = 0
+    sleep_time: float = 0.0
+    last_pending_at: float | None = None
+    last_polled_at: float | None = None
+    # подсказки Retry-After: (время получения ответа, значение в секундах)
+    retry_after_hints: list[tuple[float, float]] = field(default_factory=list)
+
+    @property
+    def elapsed(self) -> float | None:
+        """
+        Время от отправки запроса на выгрузку до получения конечного ответа (в секундах)
+        """
+        if self.submitted_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.submitted_at
+
+    @property
+    def overshoot(self) -> float | None:
+        """
+        Верхняя оценка времени, которое прошло между готовностью выгрузки и ее получением:
+        пауза между последним ответом 202 и последним опросом
+        """
+        if self.last_pending_at is None or self.last_polled_at is None:
+            return None
+        return max(self.last_polled_at - self.last_pending_at, 0.0)
+
+    @property
+    def min_elapsed(self) -> float | None:
+        """
+        Нижняя оценка времени выполнения выгрузки: elapsed без паузы между последним ответом
+        202 и последним опросом. Фактическое время выгрузки лежит в [min_elapsed, elapsed]
+        """
+        if self.elapsed is None:
+            return None
+        return self.elapsed - (self.overshoot or 0.0)
+
+    @property
+    def ready_at(self) -> float | None:
+        """
+        Нижняя оценка момента получения выгрузки без ожидания следующего опроса
+        """
+        if self.finished_at is None:
+            return None
+        return self.finished_at - (self.overshoot or 0.0)
+
+    @property
+    def retry_after_overestimate(self) -> float | None:
+        """
+        На сколько секунд подсказка Retry-After превысила фактическое время до завершения
+        выгрузки (наибольшее значение по всем подсказкам). Столько времени потерял бы клиент,
+        который ждет ровно Retry-After секунд.
+        """
+        if not self.retry_after_hints or self.finished_at is None:
+            return None
+        return max(
+            retry_after - (self.finished_at - received_at)
+            for received_at, retry_after in self.retry_after_hints
+        )
+
+
+def describe_export_request(request_json: dict) -> str:
+    """
+    Возвращает короткое описание выгружаемых данных для отчета
+    """
+    export_object = request_json.get('object') or {}
+    if export_object.get('type') == 'sql':
+        return f'sql: {export_object.get("query_text")}'
+    return str(export_object.get('name'))
+
+
+def _parse_retry_after(r: httpx.Response, default: float | None) -> float | None:
+    """
+    Возвращает значение заголовка Retry-After в секундах
+    """
+    if 'Retry-After' not in r.headers:
+        return default
+
+    try:
+        retry_after = float(r.headers['Retry-After'])
+    except ValueError:
+        raise ValueError('В заголовоке Retry-After нужно указать число')
+
+    if retry_after <= 0:
+        raise ValueError('В заголовоке Retry-After нужно указать положительное число')
+
+    return retry_after
+
+
+async def run_parquet_export(
+    client: httpx.AsyncClient, job: ParquetExportJob, polling: PollingPolicy | None = None
+) -> ParquetExportJob:
+    """
+    Запрашивает выгрузку в parquet и опрашивает Location до получения конечного ответа.
+    Паузы между опросами выбираются стратегией polling (не больше Retry-After) и не
+    блокируют остальные задания.
+    """
+    polling = polling or PollingPolicy()
+    check_location = None
+    check_retry_after = None
+
+    job.submitted_at = time.monotonic()
+
+    try:
+        while True:
+            if check_location is None:
+                # первый запрос
+                r = await client.post(url='data-source/parquet', json=job.request_json)
+            else:
+                delay = polling.delay(job.polls, check_retry_after)
+                await asyncio.sleep(delay)  # ждем перед следующим запросом
+                job.sleep_time += delay
+                job.last_polled_at = time.monotonic()
+                r = await client.get(url=check_location)
+                job.polls += 1
+
+            job.response = r
+
+            if r.status_code != 202:
+                # если ответ не 202, то это конечный ответ
+                break
+
+            # сервер ответил, что надо продолжать ждать
+            job.last_pending_at = time.monotonic()
+
+            if 'Location' not in r.headers:
+                job.error = 'В ответе должен быть заголовок Location'
+                break
+
+            check_location = r.headers['Location']
+            check_retry_after = _parse_retry_after(r, None)
+            if check_retry_after is not None:
+                job.retry_after_hints.append((job.last_pending_at, check_retry_after))
+    except ValueError as e:
+        job.error = str(e)
+    except httpx.HTTPError as e:
+        job.error = f'Ошибка HTTP запроса к коннектору: {e!r}'
+    finally:
+        job.finished_at = time.monotonic()
+
+    return job
+
+
+async def iter_parquet_exports(
+    client: httpx.AsyncClient,
+    jobs: list[ParquetExportJob],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    polling: PollingPolicy | None = None,
+) -> AsyncIterator[ParquetExportJob]:
+    """
+    Выполняет задания на выгрузку конкурентно (не более max_concurrency одновременно)
+    и возвращает их по мере завершения
+    """
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+    async def run(job: ParquetExportJob) -> ParquetExportJob:
+        async with semaphore:
+            return await run_parquet_export(client, job, polling)
+
+    for completed in asyncio.as_completed([run(job) for job in jobs]):
+        yield await completed
+
+
+def run_parquet_exports(
+    request_jsons: list[dict],
+    base_url: str,
+    timeout: float,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    client_options: dict | None = None,
+    polling: PollingPolicy | None = None,
+) -> list[ParquetExportJob]:
+    """
+    Выполняет набор выгрузок в parquet конкурентно и возвращает задания в порядке запросов.
+    client_options - дополнительные параметры httpx.AsyncClient (пул соединений, HTTP/2)
+    """
+    jobs = [ParquetExportJob(request_json=request_json) for request_json in request_jsons]
+
+    async def run_all():
+        async with httpx.AsyncClient(
+            base_url=base_url, timeout=timeout, **(client_options or {})
+        ) as client:
+            async for _ in iter_parquet_exports(client, jobs, max_concurrency, polling):
+                pass
+
+    asyncio.run(run_all())
+
+    return jobs
+
+
+def polling_report_row(jobs: list[ParquetExportJob]) -> dict:
+    """
+    Возвращает сводную строку отчета об опросе заданий на выгрузку
+    """
+    elapsed = [job.elapsed for job in jobs if job.elapsed is not None]
+    overshoots = [job.overshoot for job in jobs if job.overshoot is not None]
+    polls = sum(job.polls for job in jobs)
+
+    return {
+        'jobs': len(jobs),
+        'polls': polls,
+        'polls per job': polls / len(jobs) if jobs else None,
+        'p50, s': percentile(elapsed, 50),
+        'p95, s': percentile(elapsed, 95),
+        'sleep, s': sum(job.sleep_time for job in jobs),
+        'overshoot p95, s': percentile(overshoots, 95),
+        'overshoot max, s': max(overshoots, default=None),
+    }
+
+
+def find_retry_after_overestimates(
+    jobs: list[ParquetExportJob], max_overestimate: float
+) -> list[dict]:
+    """
+    Возвращает строки отчета о заданиях, в которых подсказка Retry-After превысила
+    фактическое время до завершения выгрузки больше чем на max_overestimate секунд
+    """
+    rows = []
+    for job in jobs:
+        overestimate = job.retry_after_overestimate
+        if overestimate is None or overestimate <= max_overestimate:
+            continue
+
+        rows.append(
+            {
+                'export': describe_export_request(job.request_json),
+                'retry-after, s': max(hint for _, hint in job.retry_after_hints),
+                'elapsed, s': job.elapsed,
+                'overestimate, s': overestimate,
+            }
+        )
+    return rows
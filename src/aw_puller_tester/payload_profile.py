@@ -0,0 +1,169 @@
+import math
+import statistics
+import time
+from dataclasses import dataclass, field
+
+import httpx
+import pyarrow
+import pytest
+
+from aw_puller_tester.dto import TestPayloadProfileSettings, TestPerformanceSettings
+from aw_puller_tester.object_data import (
+    ObjectDataParseError,
+    read_object_data,
+    response_media_type,
+)
+from aw_puller_tester.performance import report_performance_issue
+from aw_puller_tester.report import TestReportWriter
+
+
+PAYLOAD_PROFILE_SECTION = 'Зависимость object-data от размера ответа'
+
+
+@dataclass
+class ObjectDataTiming:
+    """
+    Замер одного запроса object-data или sql-object-data
+    """
+
+    limit: int | None
+    rows: int
+    bytes: int
+    ttfb: float
+    total: float
+    parse: float
+    media_type: str = ''
+    table: pyarrow.Table | None = field(default=None, repr=False, compare=False)
+
+
+def measure_object_data(
+    client: httpx.Client, url: str, request_json: dict, accept: str | None = None
+) -> ObjectDataTiming:
+    """
+    Выполняет запрос object-data или sql-object-data и замеряет время до первого байта ответа,
+    полное время получения ответа и время разбора ответа тестером (отдельно от получения).
+    Формат ответа запрашивается заголовком Accept и определяется по Content-Type ответа
+    """
+    headers = {'Accept': accept} if accept is not None else None
+    started_at = time.perf_counter()
+    ttfb = None
+    chunks = []
+
+    with client.stream('POST', url, json=request_json, headers=headers) as r:
+        if r.status_code >= 400:
+            r.read()
+            pytest.fail(
+                f'Ожидался успешный ответ коннектора. Получено HTTP {r.status_code}: {r.text}.'
+            )
+
+        media_type = response_media_type(r.headers.get('Content-Type'))
+        for chunk in r.iter_bytes():
+            if ttfb is None:
+                ttfb = time.perf_counter() - started_at
+            chunks.append(chunk)
+
+    total = time.perf_counter() - started_at
+
+    parse_started_at = time.perf_counter()
+    try:
+        table = read_object_data(chunks, media_type=media_type)
+    except ObjectDataParseError as e:
+        pytest.fail(f'Ошибка валидации ответа коннектора ({media_type}): {e}')
+    parse = time.perf_counter() - parse_started_at
+
+    return ObjectDataTiming(
+        limit=request_json.get('limit'),
+        rows=table.num_rows,
+        bytes=sum(len(chunk) for chunk in chunks),
+        ttfb=ttfb if ttfb is not None else total,
+        total=total,
+        parse=parse,
+        media_type=media_type,
+        table=table,
+    )
+
+
+def median_timing(timings: list[ObjectDataTiming]) -> ObjectDataTiming:
+    """
+    Возвращает медианы замеров повторов одного запроса
+    """
+    return ObjectDataTiming(
+        limit=timings[0].limit,
+        rows=timings[0].rows,
+        bytes=timings[0].bytes,
+        ttfb=statistics.median(t.ttfb for t in timings),
+        total=statistics.median(t.total for t in timings),
+        parse=statistics.median(t.parse for t in timings),
+        media_type=timings[0].media_type,
+        table=timings[0].table,
+    )
+
+
+def loglog_slope(xs: list[float], ys: list[float]) -> float | None:
+    """
+    Возвращает наклон прямой, приближающей зависимость log(y) от log(x) методом наименьших
+    квадратов: 1 - линейный рост, больше 1 - сверхлинейный
+    """
+    points = [(math.log(x), math.log(y)) for x, y in zip(xs, ys) if x > 0 and y > 0]
+    if len({x for x, _ in points}) < 2:
+        return None
+
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / sum(
+        (x - mean_x) ** 2 for x, _ in points
+    )
+
+
+def check_payload_scaling(
+    subject: str,
+    timings: list[ObjectDataTiming],
+    settings: TestPayloadProfileSettings,
+    performance_settings: TestPerformanceSettings,
+    test_report: TestReportWriter,
+):
+    """
+    Добавляет замеры в отчет и оценивает рост полного времени ответа от размера ответа
+    по наклону в логарифмическом масштабе. Сверхлинейный рост (наклон больше
+    payload_profile.max_slope) характерен для коннекторов, которые собирают весь ответ
+    в памяти перед отправкой.
+    """
+    # время маленьких ответов определяется накладными расходами на запрос и занижает
+    # наклон, поэтому учитываются ответы хотя бы вдвое дольше самого быстрого
+    fastest = min(t.total for t in timings)
+    fitted = [t for t in timings if t.total >= 2 * fastest]
+    slope = loglog_slope([t.bytes for t in fitted], [t.total for t in fitted])
+    ttfb_slope = loglog_slope([t.bytes for t in fitted], [t.ttfb for t in fitted])
+    compare_time = max(t.total for t in timings) >= settings.min_seconds
+
+    for timing in timings:
+        test_report.add(
+            PAYLOAD_PROFILE_SECTION,
+            {
+                'request': subject,
+                'limit': timing.limit,
+                'rows': timing.rows,
+                'bytes': timing.bytes,
+                'ttfb, s': timing.ttfb,
+                'total, s': timing.total,
+                'parse, s': timing.parse,
+                'MB/s': timing.bytes / timing.total / 1024 / 1024 if timing.total else None,
+                'fitted': '*' if timing in fitted else '',
+                'slope': slope,
+                'ttfb slope': ttfb_slope,
+            },
+        )
+
+    if len({t.rows for t in timings}) < 2:
+        report_performance_issue(
+            f'Коннектор вернул одинаковое количество строк {subject} для всех limit '
+            f'({timings[0].rows}), зависимость от размера ответа не построена',
+            performance_settings,
+        )
+    elif compare_time and slope is not None and slope > settings.max_slope:
+        report_performance_issue(
+            f'Время ответа {subject} растет сверхлинейно от размера ответа: наклон '
+            f'{slope:.2f} (допустимо {settings.max_slope}), время до первого байта - '
+            f'{ttfb_slope:.2f}. Вероятно, коннектор собирает весь ответ в памяти перед отправкой',
+            performance_settings,
+        )
@@ -0,0 +1,481 @@
+import warnings
+
+import pytest
+import pyarrow
+import pyarrow.compute as pc
+
+from aw_puller_tester.dto import ObjectColumnMeta, SimpleType, TestPerformanceSettings
+from aw_puller_tester.parquet_export import ParquetExportJob
+from aw_puller_tester.report import TestReportWriter, percentile
+from aw_puller_tester.tools import ParquetExportMeta, footer_column_sizes
+
+
+LIMIT_PUSHDOWN_SECTION = 'Применение LIMIT на стороне источника'
+PROJECTION_PUSHDOWN_SECTION = 'Выгрузка части столбцов (fields)'
+FILTER_PUSHDOWN_SECTION = 'Применение фильтров на стороне источника'
+LAYOUT_SECTION = 'Структура parquet выгрузок'
+NATIVE_TYPES_SECTION = 'Типы столбцов выгрузки'
+
+# допустимые arrow типы столбцов выгрузки для типов полей AW
+NATIVE_ARROW_TYPES = {
+    SimpleType.string: (pyarrow.types.is_string, pyarrow.types.is_large_string),
+    SimpleType.number: (pyarrow.types.is_integer, pyarrow.types.is_decimal),
+    SimpleType.float: (pyarrow.types.is_floating, pyarrow.types.is_decimal),
+    SimpleType.date: (pyarrow.types.is_date, pyarrow.types.is_timestamp),
+    SimpleType.bool: (pyarrow.types.is_boolean,),
+}
+
+# размер значения в байтах при выгрузке в типе по умолчанию (bool - битовая маска)
+NATIVE_VALUE_BYTES = {
+    SimpleType.number: 8,
+    SimpleType.float: 8,
+    SimpleType.date: 4,
+    SimpleType.bool: 1 / 8,
+}
+
+
+class ConnectorPerformanceWarning(UserWarning):
+    """
+    Предупреждение о проблеме производительности коннектора, которая не нарушает
+    корректность ответов
+    """
+
+
+def report_performance_issue(message: str, settings: TestPerformanceSettings):
+    """
+    Сообщает о проблеме производительности коннектора: в строгом режиме (performance.strict)
+    тест завершается с ошибкой, иначе выводится предупреждение
+    """
+    if settings.strict:
+        pytest.fail(message)
+    warnings.warn(message, ConnectorPerformanceWarning, stacklevel=2)
+
+
+def _ratio(value: float | None, full_value: float | None) -> float | None:
+    if value is None or not full_value:
+        return None
+    return value / full_value
+
+
+def check_limit_pushdown(
+    subject: str,
+    full_job: ParquetExportJob,
+    full_meta: ParquetExportMeta,
+    limit_job: ParquetExportJob,
+    limit_meta: ParquetExportMeta,
+    settings: TestPerformanceSettings,
+    test_report: TestReportWriter,
+):
+    """
+    Сравнивает выгрузку с limit с полной выгрузкой по времени выполнения и размеру данных
+    (несжатому, по метаданным parquet). Сравнение не выполняется для маленьких выгрузок,
+    в которых время и размер определяются накладными расходами. Время выгрузок учитывается
+    диапазоном [min_elapsed, elapsed], так как включает ожидание опроса заданий.
+    Если выгрузка с limit стоит большую долю полной выгрузки, то коннектор, скорее всего,
+    читает из источника все данные и отбрасывает лишние строки сам. Результат сравнения
+    добавляется в отчет.
+    """
+    # время выгрузок известно с точностью до ожидания опроса (overshoot): о проблеме
+    # сообщается, только если даже наименьшее возможное отношение времени превышает порог
+    time_ratio = _ratio(limit_job.min_elapsed, full_job.elapsed)
+    max_time_ratio = _ratio(limit_job.elapsed, full_job.min_elapsed)
+    bytes_ratio = _ratio(limit_meta.uncompressed_bytes, full_meta.uncompressed_bytes)
+
+    issues = []
+    if (
+        time_ratio is not None
+        and full_job.min_elapsed >= settings.min_full_export_seconds
+        and time_ratio > settings.max_limit_time_ratio
+    ):
+        issues.append(
+            f'выгрузка с limit заняла {limit_job.min_elapsed:.3f}-{limit_job.elapsed:.3f} с, '
+            f'полная - {full_job.min_elapsed:.3f}-{full_job.elapsed:.3f} с '
+            f'(не меньше {time_ratio:.0%})'
+        )
+    if (
+        bytes_ratio is not None
+        and full_meta.num_rows >= settings.min_full_export_rows
+        and bytes_ratio > settings.max_limit_bytes_ratio
+    ):
+        issues.append(
+            f'выгрузка с limit заняла {limit_meta.uncompressed_bytes} байт, '
+            f'полная - {full_meta.uncompressed_bytes} байт ({bytes_ratio:.0%})'
+        )
+
+    test_report.add(
+        LIMIT_PUSHDOWN_SECTION,
+        {
+            'export': subject,
+            'full rows': full_meta.num_rows,
+            'full min, s': full_job.min_elapsed,
+            'full, s': full_job.elapsed,
+            'limit min, s': limit_job.min_elapsed,
+            'limit, s': limit_job.elapsed,
+            'time min, %': time_ratio * 100 if time_ratio is not None else None,
+            'time max, %': max_time_ratio * 100 if max_time_ratio is not None else None,
+            'full bytes': full_meta.uncompressed_bytes,
+            'limit bytes': limit_meta.uncompressed_bytes,
+            'bytes, %': bytes_ratio * 100 if bytes_ratio is not None else None,
+            'pushdown': 'нет' if issues else 'да',
+        },
+    )
+
+    if issues:
+        report_performance_issue(
+            f'LIMIT при выгрузке {subject}, вероятно, не передается в источник: '
+            + '; '.join(issues),
+            settings,
+        )
+
+
+def check_projection_pushdown(
+    subject: str,
+    runs: list[tuple[int, dict]],
+    total_columns: int,
+    settings: TestPerformanceSettings,
+    test_report: TestReportWriter,
+):
+    """
+    Сравнивает выгрузки части столбцов (количество столбцов, строка бенчмарка) с выгрузкой
+    всех столбцов. Время выгрузки должно следовать за долей столбцов: доля времени не должна
+    превышать долю столбцов больше чем на performance.projection_tolerance. Время выгрузок
+    учитывается диапазоном [min_seconds, seconds], о проблеме сообщается, только если даже
+    наименьшая возможная доля времени превышает порог. Результаты добавляются в отчет.
+    """
+    full_row = next(row for width, row in runs if width == total_columns)
+    compare_time = full_row['min_seconds'] >= settings.min_full_export_seconds
+
+    issues = []
+    for width, row in runs:
+        width_ratio = width / total_columns
+        # наименьшее и наибольшее отношение времени с учетом ожидания опроса заданий
+        time_ratio = _ratio(row['min_seconds'], full_row['seconds'])
+        max_time_ratio = _ratio(row['seconds'], full_row['min_seconds'])
+        bytes_ratio = _ratio(row['uncompressed_bytes'], full_row['uncompressed_bytes'])
+
+        tracks = None
+        if compare_time and time_ratio is not None and width < total_columns:
+            tracks = time_ratio <= width_ratio + settings.projection_tolerance
+            if not tracks:
+                issues.append(
+                    f'{width} из {total_columns} столбцов выгружаются за {time_ratio:.0%} '
+                    'времени полной выгрузки'
+                )
+
+        test_report.add(
+            PROJECTION_PUSHDOWN_SECTION,
+            {
+                'export': subject,
+                'columns': f'{width}/{total_columns}',
+                'width, %': width_ratio * 100,
+                'min seconds': row['min_seconds'],
+                'seconds': row['seconds'],
+                'time min, %': time_ratio * 100 if time_ratio is not None else None,
+                'time max, %': max_time_ratio * 100 if max_time_ratio is not None else None,
+                'bytes, %': bytes_ratio * 100 if bytes_ratio is not None else None,
+                'pushdown': {True: 'да', False: 'нет', None: '-'}[tracks],
+            },
+        )
+
+    if issues:
+        report_performance_issue(
+            f'Список полей при выгрузке {subject}, вероятно, не передается в источник: '
+            + '; '.join(issues),
+            settings,
+        )
+
+
+def check_filter_pushdown(
+    subject: str,
+    full_row: dict,
+    filtered_row: dict,
+    settings: TestPerformanceSettings,
+    test_report: TestReportWriter,
+):
+    """
+    Сравнивает выгрузку с фильтром (строка бенчмарка) с полной выгрузкой. Если фильтр
+    отбирает малую долю строк (selectivity), а выгрузка с ним стоит почти как полная, то
+    коннектор, скорее всего, фильтрует строки сам, а не передает условие в источник.
+    Время выгрузок учитывается диапазоном [min_seconds, seconds], о проблеме сообщается,
+    только если даже наименьшая возможная доля времени превышает порог. Результат сравнения
+    добавляется в отчет.
+    """
+    selectivity = _ratio(filtered_row['rows'], full_row['rows'])
+    # наименьшее и наибольшее отношение времени с учетом ожидания опроса заданий
+    time_ratio = _ratio(filtered_row['min_seconds'], full_row['seconds'])
+    max_time_ratio = _ratio(filtered_row['seconds'], full_row['min_seconds'])
+    bytes_ratio = _ratio(filtered_row['uncompressed_bytes'], full_row['uncompressed_bytes'])
+
+    pushdown = None
+    if (
+        selectivity is not None
+        and time_ratio is not None
+        and selectivity <= settings.selective_filter_max_selectivity
+        and full_row['min_seconds'] >= settings.min_full_export_seconds
+    ):
+        pushdown = time_ratio <= settings.max_filter_time_ratio
+
+    test_report.add(
+        FILTER_PUSHDOWN_SECTION,
+        {
+            'export': subject,
+            'rows': filtered_row['rows'],
+            'full rows': full_row['rows'],
+            'selectivity, %': selectivity * 100 if selectivity is not None else None,
+            'min seconds': filtered_row['min_seconds'],
+            'seconds': filtered_row['seconds'],
+            'full min, s': full_row['min_seconds'],
+            'full, s': full_row['seconds'],
+            'time min, %': time_ratio * 100 if time_ratio is not None else None,
+            'time max, %': max_time_ratio * 100 if max_time_ratio is not None else None,
+            'bytes, %': bytes_ratio * 100 if bytes_ratio is not None else None,
+            'pushdown': {True: 'да', False: 'нет', None: '-'}[pushdown],
+        },
+    )
+
+    if pushdown is False:
+        report_performance_issue(
+            f'Фильтр при выгрузке {subject}, вероятно, не передается в источник: отобрано '
+            f'{selectivity:.1%} строк, а выгрузка заняла не меньше {time_ratio:.0%} времени '
+            'полной выгрузки',
+            settings,
+        )
+
+
+def _is_string_type(data_type: pyarrow.DataType) -> bool:
+    return pyarrow.types.is_string(data_type) or pyarrow.types.is_large_string(data_type)
+
+
+def _footer_distinct_ratios(meta: ParquetExportMeta) -> dict[str, float | None]:
+    """
+    Возвращает долю различных значений в строковых столбцах без словарного кодирования
+    по статистике distinct_count футеров: сумма различных значений по группам строк к
+    количеству значений (словарь parquet тоже строится по группе строк). Если статистики
+    нет хотя бы в одной группе строк, то для столбца возвращается None
+    """
+    string_columns = [f.name for f in meta.schema if _is_string_type(f.type)]
+    distinct = {name: 0 for name in string_columns}
+    values = {name: 0 for name in string_columns}
+
+    for part in meta.parts:
+        metadata = part.metadata
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            for j in range(row_group.num_columns):
+                column = row_group.column(j)
+                name = column.path_in_schema
+                if name not in distinct:
+                    continue
+
+                if column.has_dictionary_page:
+                    # столбец уже кодируется словарем
+                    del distinct[name]
+                    continue
+
+                statistics = column.statistics
+                if (
+                    distinct[name] is None
+                    or statistics is None
+                    or not statistics.has_distinct_count
+                    or not statistics.has_null_count
+                ):
+                    distinct[name] = None
+                    continue
+                distinct[name] += statistics.distinct_count
+                values[name] += column.num_values - statistics.null_count
+
+    return {
+        name: (count / values[name] if values[name] else None) if count is not None else None
+        for name, count in distinct.items()
+    }
+
+
+def undetermined_cardinality_columns(
+    meta: ParquetExportMeta, settings: TestPerformanceSettings
+) -> list[str]:
+    """
+    Возвращает строковые столбцы без словарного кодирования, для которых в футерах нет
+    статистики distinct_count: долю различных значений в них нужно оценить по выборке
+    строк (read_parquet_sample). В маленьких выгрузках словарное кодирование не проверяется
+    """
+    if meta.num_rows < settings.min_full_export_rows:
+        return []
+    return [name for name, ratio in _footer_distinct_ratios(meta).items() if ratio is None]
+
+
+def _sample_distinct_ratio(sample: pyarrow.Table, name: str) -> float | None:
+    column = sample.column(name)
+    values = len(column) - column.null_count
+    return pc.count_distinct(column).as_py() / values if values else None
+
+
+def check_parquet_layout(
+    subject: str,
+    meta: ParquetExportMeta,
+    settings: TestPerformanceSettings,
+    test_report: TestReportWriter,
+    sample: pyarrow.Table | None = None,
+):
+    """
+    Проверяет по футерам выгрузки структуру parquet файлов, от которой зависит скорость
+    чтения выгрузки в BI: размер групп строк, сжатие, статистики min/max столбцов и
+    словарное кодирование строковых столбцов с малым количеством различных значений.
+    Доля различных значений берется из статистики distinct_count футеров, а для столбцов
+    без нее - из выборки строк sample (см. undetermined_cardinality_columns). Результат
+    добавляется в отчет.
+    """
+    layout = settings.layout
+
+    row_group_rows = []
+    row_group_bytes = []
+    small_row_groups = 0
+    codecs = set()
+    dictionary_columns = set()
+    no_statistics_columns = set()
+    uncompressed_columns = set()
+
+    for part in meta.parts:
+        metadata = part.metadata
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            row_group_rows.append(row_group.num_rows)
+            row_group_bytes.append(row_group.total_byte_size)
+
+            # последняя группа строк в части может быть неполной
+            if i < metadata.num_row_groups - 1 and row_group.num_rows < layout.min_row_group_rows:
+                small_row_groups += 1
+
+            for j in range(row_group.num_columns):
+                column = row_group.column(j)
+                name = column.path_in_schema
+
+                codecs.add(column.compression)
+                if column.compression == 'UNCOMPRESSED':
+                    uncompressed_columns.add(name)
+                if column.has_dictionary_page:
+                    dictionary_columns.add(name)
+
+                statistics = column.statistics
+                all_nulls = (
+                    statistics is not None
+                    and statistics.has_null_count
+                    and statistics.null_count == column.num_values
+                )
+                if not all_nulls and (statistics is None or not statistics.has_min_max):
+                    no_statistics_columns.add(name)
+
+    columns = meta.schema.names
+    not_dictionary = []
+    if meta.num_rows >= settings.min_full_export_rows:
+        # в маленьких выгрузках почти все значения различаются мало
+        for name, ratio in _footer_distinct_ratios(meta).items():
+            if ratio is None and sample is not None and name in sample.column_names:
+                ratio = _sample_distinct_ratio(sample, name)
+            if ratio is not None and ratio <= layout.low_cardinality_ratio:
+                not_dictionary.append(name)
+
+    issues = []
+    if small_row_groups:
+        issues.append(
+            f'{small_row_groups} из {len(row_group_rows)} групп строк меньше '
+            f'{layout.min_row_group_rows} строк'
+        )
+    if uncompressed_columns and not layout.allow_uncompressed:
+        issues.append(f'столбцы без сжатия: {", ".join(sorted(uncompressed_columns))}')
+    if no_statistics_columns and layout.require_statistics:
+        issues.append(f'столбцы без статистик min/max: {", ".join(sorted(no_statistics_columns))}')
+    if not_dictionary:
+        issues.append(
+            'строковые столбцы с малым количеством различных значений без словарного '
+            f'кодирования: {", ".join(not_dictionary)}'
+        )
+
+    test_report.add(
+        LAYOUT_SECTION,
+        {
+            'export': subject,
+            'parts': len(meta.parts),
+            'row groups': len(row_group_rows),
+            'rows min': min(row_group_rows, default=None),
+            'rows p50': percentile(row_group_rows, 50),
+            'rows max': max(row_group_rows, default=None),
+            'MB p50': (
+                percentile(row_group_bytes, 50) / 1024 / 1024 if row_group_bytes else None
+            ),
+            'codec': ', '.join(sorted(codecs)),
+            'dictionary': f'{len(dictionary_columns)}/{len(columns)}',
+            'statistics': f'{len(columns) - len(no_statistics_columns)}/{len(columns)}',
+            'issues': len(issues),
+        },
+    )
+
+    if issues:
+        report_performance_issue(
+            f'Структура parquet выгрузки {subject} замедляет чтение: ' + '; '.join(issues),
+            settings,
+        )
+
+
+def is_native_arrow_type(simple_type: SimpleType, data_type: pyarrow.DataType) -> bool:
+    """
+    Возвращает True, если arrow тип столбца выгрузки соответствует типу поля AW
+    """
+    if pyarrow.types.is_dictionary(data_type):
+        data_type = data_type.value_type
+    return any(check(data_type) for check in NATIVE_ARROW_TYPES[simple_type])
+
+
+def check_native_types(
+    subject: str,
+    columns: list[ObjectColumnMeta],
+    meta: ParquetExportMeta,
+    settings: TestPerformanceSettings,
+    test_report: TestReportWriter,
+):
+    """
+    Сравнивает типы полей AW из метаданных объекта (simple_type) с arrow типами столбцов
+    выгрузки по футерам. Даты и числа, выгруженные строками, приходится разбирать при каждом
+    запросе к выгрузке. Для каждого такого столбца в отчет добавляется его размер по футерам
+    (без сжатия и со сжатием) и оценка размера в типе по умолчанию (int64, float64, date32,
+    bool).
+    """
+    schema = meta.schema
+    sizes = footer_column_sizes(meta)
+
+    issues = []
+    for column in columns:
+        if column.name not in schema.names:
+            continue
+
+        data_type = schema.field(column.name).type
+        if is_native_arrow_type(column.simple_type, data_type):
+            continue
+
+        column_bytes, compressed_bytes = sizes.get(column.name, (None, None))
+        value_bytes = NATIVE_VALUE_BYTES.get(column.simple_type)
+        native_bytes = meta.num_rows * value_bytes if value_bytes is not None else None
+
+        test_report.add(
+            NATIVE_TYPES_SECTION,
+            {
+                'export': subject,
+                'column': column.name,
+                'simple type': column.simple_type.value,
+                'arrow type': str(data_type),
+                'bytes': column_bytes,
+                'compressed bytes': compressed_bytes,
+                'native bytes': native_bytes,
+                'overhead, %': (
+                    (column_bytes / native_bytes - 1) * 100
+                    if column_bytes is not None and native_bytes
+                    else None
+                ),
+            },
+        )
+        issues.append(f'{column.name} ({column.simple_type.value}) выгружен как {data_type}')
+
+    if issues:
+        report_performance_issue(
+            f'Типы столбцов выгрузки {subject} не соответствуют типам полей: ' + '; '.join(issues),
+            settings,
+        )
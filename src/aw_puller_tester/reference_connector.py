@@ -0,0 +1,831 @@
+"""
+Эталонный коннектор AW BI.
+
+Коннектор реализует все методы, которые проверяет тестер, поверх локальных баз SQLite
+и выгружает parquet в S3 сервер (в том числе во временный moto сервер тестера).
+Его можно использовать для разработки и замеров тестера без внешнего коннектора,
+а также как пример реализации коннектора для авторов новых коннекторов.
+
+Данные источника хранятся в папке <data_dir>/<params.db>. Каждый файл <schema>.sqlite
+в этой папке подключается к соединению (ATTACH) как схема <schema>.
+"""
+
+import argparse
+import datetime
+import gzip
+import io
+import json
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import boto3
+import pyarrow
+import pyarrow.ipc
+import pyarrow.parquet
+import zstandard
+from flask import Flask, Response, jsonify, request
+from flask_cors import CORS
+from pydantic import BaseModel, ValidationError
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from aw_puller_tester.dto import DataSource, SimpleType
+from aw_puller_tester.object_data import (
+    ARROW_STREAM_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    OBJECT_DATA_MEDIA_TYPES,
+)
+
+
+DEFAULT_RETRY_AFTER = 1.0
+DEFAULT_EXPORT_WORKERS = 4
+DEFAULT_ROWS_PER_FILE = 1_000_000
+DEFAULT_PREVIEW_LIMIT = 100
+# количество строк NDJSON ответа в одной части (chunk) HTTP ответа
+NDJSON_CHUNK_ROWS = 1000
+# ответы меньшего размера не сжимаются: выигрыш не окупает время на сжатие
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+# кодировки сжатия ответов в порядке предпочтения коннектора
+CONTENT_ENCODINGS = {
+    'zstd': lambda data: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data),
+    'gzip': lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL),
+}
+
+# объявленный тип столбца SQLite (первое слово в верхнем регистре) -> тип поля AW
+SQLITE_SIMPLE_TYPES = {
+    'INTEGER': SimpleType.number,
+    'INT': SimpleType.number,
+    'BIGINT': SimpleType.number,
+    'NUMERIC': SimpleType.number,
+    'REAL': SimpleType.float,
+    'FLOAT': SimpleType.float,
+    'DOUBLE': SimpleType.float,
+    'DATE': SimpleType.date,
+    'BOOLEAN': SimpleType.bool,
+    'BOOL': SimpleType.bool,
+}
+
+ARROW_TYPES = {
+    SimpleType.string: pyarrow.string(),
+    SimpleType.number: pyarrow.int64(),
+    SimpleType.float: pyarrow.float64(),
+    SimpleType.date: pyarrow.date32(),
+    SimpleType.bool: pyarrow.bool_(),
+}
+
+FILTER_OPERATORS = {'=', '!=', '<>', '>', '>=', '<', '<=', 'LIKE', 'NOT LIKE', 'IN', 'NOT IN'}
+
+
+class ConnectorError(Exception):
+    """
+    Ошибка, которая возвращается клиенту коннектора в виде {"detail": "..."}
+    """
+
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+# ---------------------------------------------------------------------
+# Тела запросов
+# ---------------------------------------------------------------------
+class DataSourceRequest(BaseModel):
+    data_source: DataSource
+
+
+class ObjectsRequest(DataSourceRequest):
+    flat: bool = True
+    query_string: str | None = None
+    limit: int | None = None
+    offset: int = 0
+
+
+class ObjectRequest(DataSourceRequest):
+    object_name: str
+    limit: int | None = None
+
+
+class SqlRequest(DataSourceRequest):
+    sql_text: str
+    limit: int | None = None
+
+
+class ParquetField(BaseModel):
+    name: str
+    type: SimpleType | None = None
+
+
+class ParquetFilter(BaseModel):
+    field_name: str | None = None
+    operator: str | None = None
+    value: str | int | float | bool | None = None
+
+
+class ParquetObject(BaseModel):
+    name: str
+    data_source: DataSource
+    type: str = 'table'
+    query_text: str | None = None
+    fields: list[ParquetField] | None = None
+
+
+class ParquetRequest(BaseModel):
+    object: ParquetObject
+    folder: str | None = None
+    filters: list[ParquetFilter] = []
+    limit: int | None = None
+
+
+# ---------------------------------------------------------------------
+# Доступ к данным
+# ---------------------------------------------------------------------
+@dataclass
+class ColumnMeta:
+    name: str
+    type: str
+    simple_type: SimpleType
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def connect_data_source(data_dir: Path, data_source: DataSource) -> sqlite3.Connection:
+    """
+    Открывает соединение к источнику: каждая база SQLite из папки источника подключается
+    как отдельная схема (только для чтения)
+    """
+    db = (data_source.params or {}).get('db')
+    if not db or not isinstance(db, str):
+        raise ConnectorError('В параметрах источника не указана база данных (params.db)')
+
+    folder = data_dir / db
+    schema_files = sorted(folder.glob('*.sqlite')) if folder.is_dir() else []
+    if not schema_files:
+        raise ConnectorError(f'Источник id={data_source.id} недоступен: база {db} не найдена', 404)
+
+    connection = sqlite3.connect(':memory:', check_same_thread=False)
+    for schema_file in schema_files:
+        connection.execute(
+            f'ATTACH DATABASE ? AS {quote_identifier(schema_file.stem)}',
+            (f'{schema_file.resolve().as_uri()}?mode=ro',),
+        )
+    return connection
+
+
+def list_objects(connection: sqlite3.Connection) -> list[dict]:
+    """
+    Возвращает список таблиц и представлений всех схем источника
+    """
+    objects = []
+    for _, schema, _ in connection.execute('PRAGMA database_list').fetchall():
+        if schema in ('main', 'temp'):
+            continue
+        rows = connection.execute(
+            f'SELECT name, type FROM {quote_identifier(schema)}.sqlite_master '
+            "WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        ).fetchall()
+        objects.extend({'schema': schema, 'name': name, 'type': type_} for name, type_ in rows)
+    return objects
+
+
+def split_object_name(object_name: str) -> tuple[str, str]:
+    if '.' not in object_name:
+        raise ConnectorError(f'Название объекта {object_name} нужно указать в формате schema.name', 404)
+    schema, name = object_name.split('.', 1)
+    return schema, name
+
+
+def object_columns(connection: sqlite3.Connection, object_name: str) -> list[ColumnMeta]:
+    """
+    Возвращает столбцы объекта источника
+    """
+    schema, name = split_object_name(object_name)
+    try:
+        rows = connection.execute(
+            f'PRAGMA {quote_identifier(schema)}.table_info({quote_identifier(name)})'
+        ).fetchall()
+    except sqlite3.Error:
+        rows = []
+
+    if not rows:
+        raise ConnectorError(f'Объект {object_name} не найден в источнике', 404)
+
+    return [
+        ColumnMeta(
+            name=column_name,
+            type=declared_type or '',
+            simple_type=SQLITE_SIMPLE_TYPES.get(
+                (declared_type or '').split('(')[0].strip().upper(), SimpleType.string
+            ),
+        )
+        for _, column_name, declared_type, *_ in rows
+    ]
+
+
+def infer_columns(cursor: sqlite3.Cursor, rows: list[tuple]) -> list[ColumnMeta]:
+    """
+    Определяет столбцы результата SQL запроса по значениям строк (SQLite не сообщает типы
+    столбцов произвольного запроса)
+    """
+    columns = []
+    for i, description in enumerate(cursor.description):
+        value = next((row[i] for row in rows if row[i] is not None), None)
+        if isinstance(value, int):
+            simple_type, type_ = SimpleType.number, 'INTEGER'
+        elif isinstance(value, float):
+            simple_type, type_ = SimpleType.float, 'REAL'
+        else:
+            simple_type, type_ = SimpleType.string, 'TEXT'
+        columns.append(ColumnMeta(name=description[0], type=type_, simple_type=simple_type))
+    return columns
+
+
+def column_meta_json(columns: list[ColumnMeta]) -> dict:
+    return {
+        'columns': [
+            {'name': c.name, 'type': c.type, 'simple_type': c.simple_type.value}
+            for c in columns
+        ],
+        'foreign_keys': [],
+    }
+
+
+def convert_value(value, simple_type: SimpleType):
+    """
+    Приводит значение SQLite к типу поля AW
+    """
+    if value is None:
+        return None
+    if simple_type == SimpleType.bool:
+        return bool(value)
+    if simple_type == SimpleType.date and isinstance(value, str):
+        return datetime.date.fromisoformat(value[:10])
+    return value
+
+
+def rows_to_json(columns: list[ColumnMeta], rows: list[tuple]) -> list[dict]:
+    data = []
+    for row in rows:
+        item = {}
+        for column, value in zip(columns, row):
+            value = convert_value(value, column.simple_type)
+            item[column.name] = value.isoformat() if isinstance(value, datetime.date) else value
+        data.append(item)
+    return data
+
+
+def build_filter_sql(filters: list[ParquetFilter]) -> tuple[str, list]:
+    """
+    Возвращает условие WHERE и его параметры. Фильтр без поля - это готовое SQL условие,
+    значение оператора IN передается SQL литералом (например, "('a', 'b')")
+    """
+    conditions = []
+    params = []
+    for f in filters:
+        if f.field_name is None:
+            if f.value is None or str(f.value).strip() == '':
+                raise ConnectorError('В фильтре без поля нужно указать SQL условие в value')
+            conditions.append(f'({f.value})')
+            continue
+
+        operator = (f.operator or '=').strip().upper()
+        if operator not in FILTER_OPERATORS:
+            raise ConnectorError(f'Неизвестный оператор фильтра: {f.operator}')
+
+        if operator in ('IN', 'NOT IN'):
+            conditions.append(f'{quote_identifier(f.field_name)} {operator} {f.value}')
+        else:
+            conditions.append(f'{quote_identifier(f.field_name)} {operator} ?')
+            params.append(f.value)
+
+    return (' WHERE ' + ' AND '.join(conditions) if conditions else ''), params
+
+
+def execute(connection: sqlite3.Connection, sql: str, params: list | None = None) -> sqlite3.Cursor:
+    try:
+        return connection.execute(sql, params or [])
+    except sqlite3.Error as e:
+        raise ConnectorError(f'Ошибка выполнения запроса к источнику: {e}')
+
+
+# ---------------------------------------------------------------------
+# Выгрузка в parquet
+# ---------------------------------------------------------------------
+@dataclass
+class ParquetJob:
+    """
+    Задание на выгрузку в parquet, которое выполняется в фоне
+    """
+
+    id: str
+    status: str = 'running'
+    error: ConnectorError | None = None
+    result: dict = field(default_factory=dict)
+
+
+@dataclass
+class ReferenceConnectorSettings:
+    """
+    Настройки эталонного коннектора
+    """
+
+    data_dir: Path
+    s3_endpoint_url: str
+    s3_username: str
+    s3_password: str
+    s3_bucket: str
+    retry_after: float = DEFAULT_RETRY_AFTER
+    export_workers: int = DEFAULT_EXPORT_WORKERS
+    rows_per_file: int = DEFAULT_ROWS_PER_FILE
+    preview_limit: int = DEFAULT_PREVIEW_LIMIT
+
+
+def build_export_query(
+    connection: sqlite3.Connection, parquet_request: ParquetRequest
+) -> tuple[str, list, list[ColumnMeta] | None]:
+    """
+    Возвращает SQL запрос выгрузки, его параметры и столбцы (для SQL запросов столбцы
+    определяются по результату)
+    """
+    parquet_object = parquet_request.object
+
+    if parquet_object.type == 'sql':
+        if not parquet_object.query_text:
+            raise ConnectorError('Для выгрузки SQL запроса нужно указать object.query_text')
+        source_sql = f'({parquet_object.query_text})'
+        columns = None
+        select = '*'
+    else:
+        schema, name = split_object_name(parquet_object.name)
+        columns = object_columns(connection, parquet_object.name)
+        source_sql = f'{quote_identifier(schema)}.{quote_identifier(name)}'
+
+        if parquet_object.fields:
+            by_name = {c.name: c for c in columns}
+            missing = [f.name for f in parquet_object.fields if f.name not in by_name]
+            if missing:
+                raise ConnectorError(
+                    f'Поля {", ".join(missing)} не найдены в объекте {parquet_object.name}'
+                )
+            columns = [by_name[f.name] for f in parquet_object.fields]
+        select = ', '.join(quote_identifier(c.name) for c in columns)
+
+    where, params = build_filter_sql(parquet_request.filters)
+    sql = f'SELECT {select} FROM {source_sql} AS t{where}'
+    if parquet_request.limit is not None:
+        sql += ' LIMIT ?'
+        params.append(parquet_request.limit)
+
+    return sql, params, columns
+
+
+def rows_to_arrow(columns: list[ColumnMeta], rows: list[tuple]) -> pyarrow.Table:
+    arrays = [
+        pyarrow.array(
+            [convert_value(row[i], column.simple_type) for row in rows],
+            type=ARROW_TYPES[column.simple_type],
+        )
+        for i, column in enumerate(columns)
+    ]
+    return pyarrow.Table.from_arrays(arrays, names=[c.name for c in columns])
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Сжимает ответ zstd или gzip (первой из CONTENT_ENCODINGS кодировкой, которую клиент явно
+    принимает в Accept-Encoding). Потоковые ответы (NDJSON) и небольшие ответы возвращаются
+    без сжатия
+    """
+    response.vary.add('Accept-Encoding')
+    accept_encoding = request.headers.get('Accept-Encoding', '')
+    encoding = next(
+        (
+            e for e in CONTENT_ENCODINGS
+            if e in accept_encoding and request.accept_encodings.quality(e) > 0
+        ),
+        None,
+    )
+    if (
+        response.is_streamed
+        or response.direct_passthrough
+        or 'Content-Encoding' in response.headers
+        or encoding is None
+    ):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    response.set_data(CONTENT_ENCODINGS[encoding](data))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def data_response(columns: list[ColumnMeta], rows: list[tuple]) -> Response:
+    """
+    Возвращает строки object-data или sql-object-data в формате из заголовка Accept:
+    JSON (по умолчанию), NDJSON (построчно, частями) или Arrow IPC stream
+    """
+    media_type = request.accept_mimetypes.best_match(
+        OBJECT_DATA_MEDIA_TYPES, default=JSON_MEDIA_TYPE
+    )
+
+    if media_type == ARROW_STREAM_MEDIA_TYPE:
+        table = rows_to_arrow(columns, rows)
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue().to_pybytes(), mimetype=ARROW_STREAM_MEDIA_TYPE)
+
+    if media_type == NDJSON_MEDIA_TYPE:
+        data = rows_to_json(columns, rows)
+        return Response(
+            (
+                ''.join(
+                    json.dumps(item, ensure_ascii=False) + '\n'
+                    for item in data[i:i + NDJSON_CHUNK_ROWS]
+                )
+                for i in range(0, len(data), NDJSON_CHUNK_ROWS)
+            ),
+            mimetype=NDJSON_MEDIA_TYPE,
+        )
+
+    return jsonify(data=rows_to_json(columns, rows))
+
+
+class ReferenceConnector:
+    """
+    Эталонный коннектор: Flask приложение и фоновые задания на выгрузку в parquet
+    """
+
+    def __init__(self, settings: ReferenceConnectorSettings):
+        self.settings = settings
+        self.jobs: dict[str, ParquetJob] = {}
+        self.jobs_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(settings.export_workers, 1), thread_name_prefix='parquet-export'
+        )
+        self.s3_client = boto3.client(
+            's3',
+            endpoint_url=settings.s3_endpoint_url,
+            aws_access_key_id=settings.s3_username,
+            aws_secret_access_key=settings.s3_password,
+        )
+        self.app = self.create_app()
+
+    def connect(self, data_source: DataSource) -> sqlite3.Connection:
+        return connect_data_source(self.settings.data_dir, data_source)
+
+    def create_app(self) -> Flask:
+        app = Flask(__name__)
+        CORS(app)
+        app.after_request(compress_response)
+
+        @app.errorhandler(ConnectorError)
+        def connector_error(e: ConnectorError):
+            return jsonify(detail=e.detail), e.status_code
+
+        @app.errorhandler(ValidationError)
+        def validation_error(e: ValidationError):
+            return jsonify(detail=f'Некорректный запрос: {e}'), 400
+
+        @app.get('/health')
+        def health():
+            return jsonify(status='ok')
+
+        @app.post('/data-source/ping')
+        def ping():
+            data_source = DataSource.model_validate(self.request_json())
+            with closing(self.connect(data_source)) as connection:
+                execute(connection, 'SELECT 1')
+            return jsonify(status='ok')
+
+        @app.post('/data-source/objects')
+        def objects():
+            body = ObjectsRequest.model_validate(self.request_json())
+            with closing(self.connect(body.data_source)) as connection:
+                found = list_objects(connection)
+
+            if body.query_string:
+                query_string = body.query_string.lower()
+                found = [o for o in found if query_string in o['name'].lower()]
+
+            # постраничное получение списка: offset и limit применяются к плоскому списку
+            found = found[body.offset:]
+            if body.limit is not None:
+                found = found[:body.limit]
+
+            if body.flat:
+                return jsonify(found)
+
+            tree: dict[str, list[str]] = {}
+            for o in found:
+                tree.setdefault(o['schema'], []).append(o['name'])
+            return jsonify(tree)
+
+        @app.post('/data-source/object-meta')
+        def object_meta():
+            body = ObjectRequest.model_validate(self.request_json())
+            with closing(self.connect(body.data_source)) as connection:
+                return jsonify(column_meta_json(object_columns(connection, body.object_name)))
+
+        @app.post('/data-source/object-data')
+        def object_data():
+            body = ObjectRequest.model_validate(self.request_json())
+            schema, name = split_object_name(body.object_name)
+            with closing(self.connect(body.data_source)) as connection:
+                columns = object_columns(connection, body.object_name)
+                rows = execute(
+                    connection,
+                    f'SELECT * FROM {quote_identifier(schema)}.{quote_identifier(name)} LIMIT ?',
+                    [body.limit or self.settings.preview_limit],
+                ).fetchall()
+            return data_response(columns, rows)
+
+        @app.post('/data-source/sql-meta')
+        def sql_meta():
+            body = SqlRequest.model_validate(self.request_json())
+            with closing(self.connect(body.data_source)) as connection:
+                cursor = execute(connection, f'SELECT * FROM ({body.sql_text}) LIMIT 100')
+                columns = infer_columns(cursor, cursor.fetchall())
+            return jsonify(column_meta_json(columns))
+
+        @app.post('/data-source/sql-object-data')
+        def sql_object_data():
+            body = SqlRequest.model_validate(self.request_json())
+            with closing(self.connect(body.data_source)) as connection:
+                cursor = execute(
+                    connection,
+                    f'SELECT * FROM ({body.sql_text}) LIMIT ?',
+                    [body.limit or self.settings.preview_limit],
+                )
+                rows = cursor.fetchall()
+                columns = infer_columns(cursor, rows)
+            return data_response(columns, rows)
+
+        @app.post('/data-source/parquet')
+        def parquet():
+            body = ParquetRequest.model_validate(self.request_json())
+            if not body.folder:
+                raise ConnectorError('Не указана папка выгрузки (folder)')
+
+            # источник и объект проверяются сразу, чтобы ошибки запроса вернулись без задания
+            with closing(self.connect(body.object.data_source)) as connection:
+                build_export_query(connection, body)
+
+            job = ParquetJob(id=uuid.uuid4().hex)
+            with self.jobs_lock:
+                self.jobs[job.id] = job
+            self.executor.submit(self.run_parquet_job, job, body)
+
+            return self.parquet_job_response(job)
+
+        @app.get('/data-source/parquet/jobs/<job_id>')
+        def parquet_job(job_id: str):
+            with self.jobs_lock:
+                job = self.jobs.get(job_id)
+            if job is None:
+                raise ConnectorError(f'Задание на выгрузку {job_id} не найдено', 404)
+            return self.parquet_job_response(job)
+
+        return app
+
+    @staticmethod
+    def request_json() -> dict:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            raise ConnectorError('В теле запроса ожидался JSON-объект')
+        return body
+
+    def parquet_job_response(self, job: ParquetJob):
+        if job.status == 'running':
+            response = jsonify(status=job.status)
+            response.status_code = 202
+            response.headers['Location'] = f'/data-source/parquet/jobs/{job.id}'
+            response.headers['Retry-After'] = f'{self.settings.retry_after:g}'
+            return response
+
+        with self.jobs_lock:
+            self.jobs.pop(job.id, None)
+
+        if job.error is not None:
+            return jsonify(detail=job.error.detail), job.error.status_code
+        return jsonify(status=job.status, **job.result)
+
+    def run_parquet_job(self, job: ParquetJob, parquet_request: ParquetRequest):
+        try:
+            job.result = self.export_parquet(parquet_request)
+            job.status = 'done'
+        except ConnectorError as e:
+            job.error = e
+            job.status = 'failed'
+        except Exception as e:
+            job.error = ConnectorError(f'Ошибка выгрузки в parquet: {e!r}', 500)
+            job.status = 'failed'
+
+    def export_parquet(self, parquet_request: ParquetRequest) -> dict:
+        """
+        Выгружает данные в папку S3 частями по rows_per_file строк
+        """
+        folder_key = parquet_request.folder.removeprefix('s3://').strip('/')
+
+        with closing(self.connect(parquet_request.object.data_source)) as connection:
+            sql, params, columns = build_export_query(connection, parquet_request)
+            cursor = execute(connection, sql, params)
+
+            files = []
+            rows_count = 0
+            while True:
+                rows = cursor.fetchmany(self.settings.rows_per_file)
+                if not rows and files:
+                    break
+                if columns is None:
+                    columns = infer_columns(cursor, rows)
+
+                buffer = io.BytesIO()
+                pyarrow.parquet.write_table(rows_to_arrow(columns, rows), buffer)
+
+                key = f'{folder_key}/part-{len(files):05d}.parquet'
+                self.s3_client.put_object(
+                    Bucket=self.settings.s3_bucket, Key=key, Body=buffer.getvalue()
+                )
+                files.append(key)
+                rows_count += len(rows)
+
+                if len(rows) < self.settings.rows_per_file:
+                    break
+
+        return {'rows': rows_count, 'files': files}
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.s3_client.close()
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """
+    Обработчик запросов werkzeug с переиспользованием соединений HTTP/1.1 (keep-alive).
+
+    Werkzeug закрывает соединение после каждого ответа (Connection: close): после ответа он
+    вычитывает из сокета необработанное тело запроса и при keep-alive прочитал бы следующий
+    запрос. Здесь тело запроса с Content-Length считывается целиком до вызова приложения, а
+    вычитывание идет из уже прочитанного тела, поэтому соединение остается открытым. Запросы
+    с Transfer-Encoding или Expect обрабатываются как в werkzeug, с закрытием соединения.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    keep_alive = False
+
+    def run_wsgi(self):
+        self.keep_alive = 'Transfer-Encoding' not in self.headers and 'Expect' not in self.headers
+        if not self.keep_alive:
+            return super().run_wsgi()
+
+        connection_rfile = self.rfile
+        self.rfile = io.BytesIO(connection_rfile.read(int(self.headers.get('Content-Length') or 0)))
+        try:
+            super().run_wsgi()
+        finally:
+            self.rfile = connection_rfile
+
+    def send_header(self, keyword: str, value: str):
+        if self.keep_alive and keyword.lower() == 'connection' and value.lower() == 'close':
+            return
+        super().send_header(keyword, value)
+
+
+class ReferenceConnectorServer:
+    """
+    Эталонный коннектор, запущенный в фоновом потоке (используется тестером при connector.reference)
+    """
+
+    def __init__(self, connector: ReferenceConnector, host: str, port: int):
+        self.connector = connector
+        self.server = make_server(
+            host, port, connector.app, threaded=True, request_handler=KeepAliveRequestHandler
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.connector.close()
+
+
+# ---------------------------------------------------------------------
+# Демонстрационные данные
+# ---------------------------------------------------------------------
+DEMO_DB = 'db1'
+
+
+def create_demo_data(data_dir: Path, rows: int = 10_000):
+    """
+    Создает демонстрационный источник db1 (схемы public и work), на который рассчитан
+    test_config.example.yml
+    """
+    folder = data_dir / DEMO_DB
+    folder.mkdir(parents=True, exist_ok=True)
+
+    start_date = datetime.date(2024, 1, 1)
+
+    with closing(sqlite3.connect(folder / 'public.sqlite')) as connection:
+        connection.executescript(
+            'DROP TABLE IF EXISTS table1;'
+            'DROP TABLE IF EXISTS table2;'
+            'CREATE TABLE table1 (id INTEGER PRIMARY KEY, name TEXT, amount REAL, '
+            'created DATE, active BOOLEAN);'
+            'CREATE TABLE table2 (id INTEGER PRIMARY KEY, table1_id INTEGER, comment TEXT);'
+        )
+        connection.executemany(
+            'INSERT INTO table1 VALUES (?, ?, ?, ?, ?)',
+            (
+                (
+                    i,
+                    f'name {i % 100}',
+                    round(i * 1.5, 2),
+                    (start_date + datetime.timedelta(days=i % 365)).isoformat(),
+                    i % 2,
+                )
+                for i in range(1, rows + 1)
+            ),
+        )
+        connection.executemany(
+            'INSERT INTO table2 VALUES (?, ?, ?)',
+            ((i, i % rows + 1, f'comment {i}') for i in range(1, rows + 1)),
+        )
+        connection.commit()
+
+    with closing(sqlite3.connect(folder / 'work.sqlite')) as connection:
+        connection.executescript(
+            'DROP TABLE IF EXISTS table4;'
+            'CREATE TABLE table4 (id INTEGER PRIMARY KEY, code TEXT, weight REAL);'
+        )
+        connection.executemany(
+            'INSERT INTO table4 VALUES (?, ?, ?)',
+            ((i, f'code-{i:06d}', i / 7) for i in range(1, rows + 1)),
+        )
+        connection.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Эталонный коннектор AW BI на SQLite')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=9911)
+    parser.add_argument('--data-dir', type=Path, default=Path('reference_data'))
+    parser.add_argument('--s3-endpoint-url', required=True)
+    parser.add_argument('--s3-username', required=True)
+    parser.add_argument('--s3-password', required=True)
+    parser.add_argument('--s3-bucket', required=True)
+    parser.add_argument('--retry-after', type=float, default=DEFAULT_RETRY_AFTER)
+    parser.add_argument('--export-workers', type=int, default=DEFAULT_EXPORT_WORKERS)
+    parser.add_argument('--rows-per-file', type=int, default=DEFAULT_ROWS_PER_FILE)
+    parser.add_argument(
+        '--demo-rows',
+        type=int,
+        default=None,
+        help='создать демонстрационный источник db1 с указанным количеством строк',
+    )
+    args = parser.parse_args()
+
+    if args.demo_rows is not None:
+        create_demo_data(args.data_dir, args.demo_rows)
+
+    connector = ReferenceConnector(
+        ReferenceConnectorSettings(
+            data_dir=args.data_dir,
+            s3_endpoint_url=args.s3_endpoint_url,
+            s3_username=args.s3_username,
+            s3_password=args.s3_password,
+            s3_bucket=args.s3_bucket,
+            retry_after=args.retry_after,
+            export_workers=args.export_workers,
+            rows_per_file=args.rows_per_file,
+        )
+    )
+
+    try:
+        connector.app.run(
+            host=args.host,
+            port=args.port,
+            threaded=True,
+            request_handler=KeepAliveRequestHandler,
+        )
+    finally:
+        connector.close()
+
+
+if __name__ == '__main__':
+    main()
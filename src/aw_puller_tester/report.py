@@ -0,0 +1,121 @@
+import json
+import math
+import resource
+import sys
+from pathlib import Path
+
+import pyarrow
+
+
+# название user property, в котором строки отчета передаются из теста (в том числе из
+# рабочих процессов pytest-xdist) в основной процесс
+REPORT_PROPERTY = 'aw_puller_tester_report'
+
+MEMORY_SECTION = 'Пиковое потребление памяти'
+
+
+class TestReport:
+    """
+    Отчет запуска тестов: именованные разделы со строками-словарями. Отчет выводится
+    в конце запуска pytest
+    """
+
+    __test__ = False
+
+    def __init__(self):
+        self.sections: dict[str, list[dict]] = {}
+
+    def add(self, section: str, row: dict):
+        self.sections.setdefault(section, []).append(row)
+
+    def write_json(self, path: Path):
+        """
+        Сохраняет отчет в JSON файл: {раздел: [строки]}
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.sections, f, ensure_ascii=False, indent=2)
+
+    def format(self) -> list[str]:
+        """
+        Возвращает строки отчета в виде текстовых таблиц
+        """
+        lines = []
+        for section, rows in self.sections.items():
+            lines.append('')
+            lines.append(section)
+            lines.extend(format_table(rows))
+        return lines
+
+
+class TestReportWriter:
+    """
+    Добавляет строки отчета от имени текущего теста
+    """
+
+    __test__ = False
+
+    def __init__(self, user_properties: list):
+        self.user_properties = user_properties
+
+    def add(self, section: str, row: dict):
+        self.user_properties.append((REPORT_PROPERTY, (section, row)))
+
+
+def format_value(value) -> str:
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f'{value:.3f}'
+    return str(value)
+
+
+def format_table(rows: list[dict]) -> list[str]:
+    """
+    Форматирует строки-словари в текстовую таблицу
+    """
+    columns: list[str] = []
+    for row in rows:
+        for column in row:
+            if column not in columns:
+                columns.append(column)
+
+    cells = [[format_value(row.get(column)) for column in columns] for row in rows]
+    widths = [
+        max([len(column)] + [len(row[i]) for row in cells]) for i, column in enumerate(columns)
+    ]
+
+    lines = ['  '.join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines.append('  '.join('-' * width for width in widths))
+    for row in cells:
+        lines.append('  '.join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+    return lines
+
+
+def percentile(values: list[float], p: float) -> float | None:
+    """
+    Возвращает перцентиль p (0-100) по методу ближайшего ранга
+    """
+    if not values:
+        return None
+
+    values = sorted(values)
+    rank = max(math.ceil(p / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def memory_report_row(process: str) -> dict:
+    """
+    Возвращает строку отчета с пиковым потреблением памяти текущим процессом: RSS процесса
+    и память, выделенная pyarrow
+    """
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss в Linux в килобайтах, в macOS в байтах
+    max_rss_bytes = max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+    return {
+        'process': process,
+        'peak rss, MB': max_rss_bytes / 1024 / 1024,
+        'peak arrow, MB': pyarrow.default_memory_pool().max_memory() / 1024 / 1024,
+    }
@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+
+from aw_puller_tester.parquet_export import ParquetExportJob
+from aw_puller_tester.report import percentile
+
+
+SCALING_SECTION = 'Масштабирование выгрузки в parquet'
+
+
+def scaling_levels(max_concurrency: int) -> list[int]:
+    """
+    Возвращает уровни конкурентности 1, 2, 4, 8 ... до max_concurrency включительно
+    """
+    levels = []
+    level = 1
+    while level < max_concurrency:
+        levels.append(level)
+        level *= 2
+    levels.append(max(max_concurrency, 1))
+    return levels
+
+
+@dataclass
+class ScalingLevelResult:
+    """
+    Результат одновременного выполнения concurrency одинаковых выгрузок
+    """
+
+    concurrency: int
+    jobs: list[ParquetExportJob]
+    rows: int
+
+    @property
+    def wall_time(self) -> float:
+        """
+        Время от отправки первого запроса до завершения последней выгрузки (в секундах)
+        без ожидания опроса после готовности выгрузок
+        """
+        return max(job.ready_at for job in self.jobs) - min(
+            job.submitted_at for job in self.jobs
+        )
+
+    @property
+    def rows_per_sec(self) -> float | None:
+        wall_time = self.wall_time
+        return self.rows * len(self.jobs) / wall_time if wall_time > 0 else None
+
+
+def scaling_report_rows(
+    case: str, results: list[ScalingLevelResult], saturation_gain: float
+) -> list[dict]:
+    """
+    Возвращает строки отчета о масштабировании. Уровень насыщения - первый уровень
+    конкурентности, на котором суммарная скорость выгрузки выросла меньше чем на
+    saturation_gain (доля) относительно предыдущего уровня. Время выгрузок считается без
+    ожидания опроса после готовности (overshoot), чтобы паузы опроса не влияли на скорость
+    """
+    rows = []
+    base_rows_per_sec = results[0].rows_per_sec if results else None
+    previous_rows_per_sec = None
+    saturated = False
+
+    for result in results:
+        rows_per_sec = result.rows_per_sec
+        latencies = [job.min_elapsed for job in result.jobs]
+        overshoots = [job.overshoot or 0.0 for job in result.jobs]
+
+        is_saturation = False
+        if (
+            not saturated
+            and previous_rows_per_sec
+            and rows_per_sec is not None
+            and rows_per_sec < previous_rows_per_sec * (1 + saturation_gain)
+        ):
+            saturated = is_saturation = True
+
+        rows.append(
+            {
+                'case': case,
+                'concurrency': result.concurrency,
+                'wall, s': result.wall_time,
+                'rows/sec': rows_per_sec,
+                'speedup': (
+                    rows_per_sec / base_rows_per_sec
+                    if rows_per_sec and base_rows_per_sec
+                    else None
+                ),
+                'p50 job, s': percentile(latencies, 50),
+                'max job, s': max(latencies, default=None),
+                'overshoot max, s': max(overshoots, default=None),
+                'saturation': '*' if is_saturation else '',
+            }
+        )
+        previous_rows_per_sec = rows_per_sec
+
+    return rows
+
@@ -0,0 +1,197 @@
+import os
+
+import pytest
+
+from aw_puller_tester.benchmark import (
+    BENCHMARK_PARQUET_SECTION,
+    find_benchmark_regressions,
+    is_precise_benchmark_row,
+    parquet_benchmark_row,
+    projection_widths,
+)
+from aw_puller_tester.dto import ObjectMeta
+from aw_puller_tester.parquet_export import PollingPolicy
+from aw_puller_tester.performance import check_filter_pushdown, check_projection_pushdown
+from aw_puller_tester.tools import (
+    assert_exported_parquet_meta,
+    assert_parquet_export_succeeded,
+    parquet_object_request,
+    parquet_sql_request,
+    read_parquet_metadata,
+)
+
+
+@pytest.fixture(scope='function')
+def parquet_benchmark(
+    benchmark_settings,
+    benchmark_baseline,
+    parquet_exporter,
+    etl_s3_client,
+    etl_s3_bucket,
+    etl_temp_run_folder,
+    test_report,
+):
+    """
+    Возвращает функцию, которая выполняет выгрузку в parquet benchmark_settings.repeat раз
+    (последовательно, каждый раз в новую папку, в том числе между вызовами), добавляет результаты в отчет, сравнивает
+    их с базовым запуском и возвращает строку результатов. Если add_to_report=False, то
+    выгрузка только замеряется (например, полная выгрузка для сравнения с фильтром).
+    Задания опрашиваются с постоянной короткой паузой benchmark.poll_interval, а с базовым
+    запуском сравниваются только замеры, в которых ожидание опроса мало по сравнению
+    со временем выгрузки
+    """
+    polling = PollingPolicy.fixed(benchmark_settings.poll_interval)
+    calls = 0
+
+    def run(case: str, subject: str, request_json: dict, add_to_report: bool = True) -> dict:
+        nonlocal calls
+        # у каждого вызова своя папка: иначе в метаданные попадут части предыдущих выгрузок
+        call_folder = os.path.join(etl_temp_run_folder, f'call{calls}')
+        calls += 1
+        runs = []
+
+        for i in range(max(benchmark_settings.repeat, 1)):
+            export_path_key = os.path.join(call_folder, f'run{i}', 'data.parquet')
+
+            [job] = parquet_exporter(
+                [{**request_json, 'folder': f's3://{export_path_key}'}], polling=polling
+            )
+            assert_parquet_export_succeeded(job, subject)
+
+            meta = read_parquet_metadata(etl_s3_client, etl_s3_bucket, export_path_key + '/')
+            assert_exported_parquet_meta(meta)
+
+            runs.append((job, meta))
+
+        row = parquet_benchmark_row(case, runs)
+        if not add_to_report:
+            return row
+
+        test_report.add(BENCHMARK_PARQUET_SECTION, row)
+
+        baseline_row = benchmark_baseline.get(case)
+        if (
+            baseline_row is not None
+            and is_precise_benchmark_row(row, benchmark_settings.max_overshoot_ratio)
+            and is_precise_benchmark_row(baseline_row, benchmark_settings.max_overshoot_ratio)
+        ):
+            regressions = find_benchmark_regressions(
+                row, baseline_row, benchmark_settings.max_regression_percent
+            )
+            assert not regressions, (
+                f'Производительность выгрузки {subject} ухудшилась больше чем на '
+                f'{benchmark_settings.max_regression_percent}% относительно базового запуска: '
+                + '; '.join(regressions)
+            )
+
+        return row
+
+    return run
+
+
+def test_benchmark_parquet(available_data_source, object_name, parquet_benchmark):
+    """
+    Бенчмарк выгрузки объекта источника в parquet
+    """
+    data_source = available_data_source.to_data_source()
+
+    parquet_benchmark(
+        case=f'ds{data_source.id}/{object_name}',
+        subject=f'объекта {object_name}',
+        request_json=parquet_object_request(data_source, object_name),
+    )
+
+
+def test_benchmark_parquet_sql(available_data_source, sql_text, parquet_benchmark):
+    """
+    Бенчмарк выгрузки результата SQL запроса в parquet
+    """
+    data_source = available_data_source.to_data_source()
+
+    parquet_benchmark(
+        case=f'ds{data_source.id}/sql: {sql_text}',
+        subject=f'SQL запроса {sql_text}',
+        request_json=parquet_sql_request(data_source, sql_text),
+    )
+
+
+def test_benchmark_parquet_projection(
+    available_data_source,
+    object_name,
+    connector_client,
+    parquet_benchmark,
+    performance_settings,
+    test_report,
+):
+    """
+    Бенчмарк выгрузки объекта в parquet с частью столбцов (fields): 1 столбец, 10%, 50%
+    и все столбцы. Время выгрузки должно уменьшаться вместе с количеством столбцов.
+    """
+    data_source = available_data_source.to_data_source()
+
+    r = connector_client.post(
+        url='data-source/object-meta',
+        json={
+            'data_source': data_source.model_dump(),
+            'object_name': object_name,
+        },
+    )
+
+    assert r.status_code < 400, (
+        f'Не удалось получить метаданные объекта {object_name} источника {data_source.id}'
+    )
+
+    columns = ObjectMeta.model_validate(r.json()).columns
+
+    runs = []
+    for width in projection_widths(len(columns)):
+        fields = [{'name': c.name, 'type': c.simple_type.value} for c in columns[:width]]
+
+        row = parquet_benchmark(
+            case=f'ds{data_source.id}/{object_name} [fields {width}/{len(columns)}]',
+            subject=f'объекта {object_name} ({width} из {len(columns)} столбцов)',
+            request_json=parquet_object_request(data_source, object_name, fields=fields),
+        )
+        runs.append((width, row))
+
+    check_projection_pushdown(
+        f'объекта {object_name}',
+        runs=runs,
+        total_columns=len(columns),
+        settings=performance_settings,
+        test_report=test_report,
+    )
+
+
+def test_benchmark_parquet_filter(
+    available_data_source, object_filter, parquet_benchmark, performance_settings, test_report
+):
+    """
+    Бенчмарк выгрузки объекта в parquet с фильтром. Выгрузка с фильтром сравнивается
+    с полной выгрузкой объекта по времени и размеру с учетом доли отобранных строк.
+    """
+    data_source = available_data_source.to_data_source()
+    object_name = object_filter.object_name
+
+    full_row = parquet_benchmark(
+        case=f'ds{data_source.id}/{object_name}',
+        subject=f'объекта {object_name}',
+        request_json=parquet_object_request(data_source, object_name),
+        add_to_report=False,
+    )
+
+    filtered_row = parquet_benchmark(
+        case=f'ds{data_source.id}/{object_name} [{object_filter.describe()}]',
+        subject=f'объекта {object_name} с фильтром {object_filter.describe()}',
+        request_json=parquet_object_request(
+            data_source, object_name, filters=[object_filter.to_parquet_filter()]
+        ),
+    )
+
+    check_filter_pushdown(
+        f'объекта {object_name} с фильтром {object_filter.describe()}',
+        full_row=full_row,
+        filtered_row=filtered_row,
+        settings=performance_settings,
+        test_report=test_report,
+    )
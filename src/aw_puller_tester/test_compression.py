@@ -0,0 +1,54 @@
+from aw_puller_tester.compression import check_compression, measure_compression
+
+
+def test_objects_compression(
+    available_data_source, connector_client, compression_settings, test_report
+):
+    """
+    Сравнение сжатых и несжатых ответов data-source/objects: размер по сети, время ответа
+    и совпадение распакованного ответа с несжатым
+    """
+    data_source = available_data_source.to_data_source()
+
+    responses = measure_compression(
+        connector_client,
+        url='data-source/objects',
+        request_json={'data_source': data_source.model_dump(), 'flat': True},
+        settings=compression_settings,
+    )
+
+    check_compression('списка объектов', responses, compression_settings, test_report)
+
+
+def test_object_compression(
+    available_data_source, object_name, connector_client, compression_settings, test_report
+):
+    """
+    Сравнение сжатых и несжатых ответов object-meta и object-data объекта
+    """
+    data_source = available_data_source.to_data_source()
+    request_json = {'data_source': data_source.model_dump(), 'object_name': object_name}
+
+    for url in ('data-source/object-meta', 'data-source/object-data'):
+        responses = measure_compression(
+            connector_client, url=url, request_json=request_json, settings=compression_settings
+        )
+        check_compression(
+            f'{url} объекта {object_name}', responses, compression_settings, test_report
+        )
+
+
+def test_sql_compression(
+    available_data_source, sql_text, connector_client, compression_settings, test_report
+):
+    """
+    Сравнение сжатых и несжатых ответов sql-meta и sql-object-data SQL запроса
+    """
+    data_source = available_data_source.to_data_source()
+    request_json = {'data_source': data_source.model_dump(), 'sql_text': sql_text}
+
+    for url in ('data-source/sql-meta', 'data-source/sql-object-data'):
+        responses = measure_compression(
+            connector_client, url=url, request_json=request_json, settings=compression_settings
+        )
+        check_compression(f'{url} SQL запроса', responses, compression_settings, test_report)
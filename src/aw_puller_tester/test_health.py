@@ -1,3 +1,9 @@
+import httpx
+
+from aw_puller_tester.http_client import ConnectionPoolStats, connector_client_options
+from aw_puller_tester.performance import report_performance_issue
+
+
 def test_health(connector_client, etl_s3_client):
     """ 
     Проверка метода /health
@@ -6,4 +12,34 @@ def test_health(connector_client, etl_s3_client):
 
     assert r.status_code < 400, (
         f'Ошибка запроса GET /health: HTTP {r.status_code} {r.text}'
-    )
\ No newline at end of file
+    )
+
+
+def test_connection_reuse(test_config, connector_url, connector_timeout, performance_settings):
+    """
+    Проверка переиспользования соединений (keep-alive): последовательные запросы GET /health
+    одного клиента должны выполняться через уже открытое соединение. Эталонный коннектор
+    обязан поддерживать keep-alive, для внешнего коннектора это проблема производительности
+    """
+    stats = ConnectionPoolStats()
+
+    with httpx.Client(
+        base_url=connector_url,
+        timeout=connector_timeout,
+        event_hooks=stats.event_hooks(),
+        **connector_client_options(test_config.connector),
+    ) as client:
+        for _ in range(5):
+            r = client.get('/health')
+            assert r.status_code < 400, (
+                f'Ошибка запроса GET /health: HTTP {r.status_code} {r.text}'
+            )
+
+    message = (
+        f'Коннектор не переиспользует соединения: {stats.requests} запросов выполнено через '
+        f'{stats.connections} соединений (Connection: {r.headers.get("Connection")})'
+    )
+    if test_config.connector.reference is not None:
+        assert stats.reused_requests > 0, message
+    elif not stats.reused_requests:
+        report_performance_issue(message, performance_settings)
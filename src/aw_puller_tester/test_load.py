@@ -0,0 +1,62 @@
+import asyncio
+
+import httpx
+import pytest
+
+from aw_puller_tester.load import build_load_requests, run_load
+
+
+DEFAULT_LOAD_DURATION = 30
+
+
+def test_load(test_config, connector_url, connector_timeout, test_report):
+    """
+    Нагрузочное тестирование методов коннектора. Выполняется, если в конфигурации задан раздел load
+    """
+    load_settings = test_config.load
+    if load_settings is None:
+        pytest.skip('Нагрузочное тестирование не настроено (раздел load в конфигурации)')
+
+    requests = build_load_requests(
+        test_config.data_sources.available_data_sources(), load_settings.endpoints
+    )
+    if not requests:
+        pytest.skip('Нет запросов для нагрузочного тестирования')
+
+    duration = load_settings.duration
+    if duration is None and load_settings.requests is None:
+        duration = DEFAULT_LOAD_DURATION
+
+    async def load():
+        limits = httpx.Limits(
+            max_connections=load_settings.clients,
+            max_keepalive_connections=load_settings.clients,
+        )
+        async with httpx.AsyncClient(
+            base_url=connector_url,
+            timeout=connector_timeout,
+            limits=limits,
+            http2=test_config.connector.http2,
+        ) as client:
+            return await run_load(
+                client,
+                requests,
+                clients=load_settings.clients,
+                duration=duration,
+                total_requests=load_settings.requests,
+            )
+
+    stats, elapsed = asyncio.run(load())
+
+    for endpoint_stats in stats.values():
+        test_report.add(
+            f'Нагрузка (клиентов: {load_settings.clients}, длительность: {elapsed:.1f} с)',
+            endpoint_stats.to_report_row(elapsed),
+        )
+
+    if load_settings.max_error_rate is not None:
+        for endpoint_stats in stats.values():
+            assert endpoint_stats.error_rate <= load_settings.max_error_rate, (
+                f'Доля ошибок метода {endpoint_stats.endpoint} под нагрузкой '
+                f'{endpoint_stats.error_rate:.1%} превышает {load_settings.max_error_rate:.1%}'
+            )
@@ -1,75 +1,162 @@
 import uuid
 
 import pytest
-from pydantic import ValidationError
 
-from aw_puller_tester.dto import ObjectData
-from aw_puller_tester.tools import assert_error_response
-
-
-def test_object_data(test_config, connector_client):
+from aw_puller_tester.checksum import check_data_matches_export
+from aw_puller_tester.content_negotiation import (
+    check_content_negotiation,
+    measure_object_data_formats,
+)
+from aw_puller_tester.payload_profile import (
+    check_payload_scaling,
+    measure_object_data,
+    median_timing,
+)
+from aw_puller_tester.tools import (
+    assert_error_response,
+    assert_parquet_export_succeeded,
+    request_object_data,
+    parquet_object_request,
+)
+
+
+def test_object_data(available_data_source, object_name, connector_client):
     """
     Проверка получения данных объекта из источника
     """
-    tested = False
-
-    for available_data_source in test_config.data_sources.available_data_sources():
-        for object_name in available_data_source.get_objects():
-            tested = True
-            data_source = available_data_source.to_data_source()
-
-            r = connector_client.post(
-                url='data-source/object-data',
-                json={
-                    'data_source': data_source.model_dump(),
-                    'object_name': object_name,
-                },
-            )
+    data_source = available_data_source.to_data_source()
 
-            assert r.status_code < 400, (
-                f'Ожидался ответ коннектора с ошибочным HTTP статусом. Получено HTTP {r.status_code}: {r.text}.'
-            )
+    table = request_object_data(
+        connector_client,
+        url='data-source/object-data',
+        request_json={
+            'data_source': data_source.model_dump(),
+            'object_name': object_name,
+        },
+    )
 
-            try:
-                response_json = r.json()
-            except Exception:
-                pytest.fail(
-                    f'В ответе коннектора ожидался JSON-объект. Получено: {r.text}'
-                )
+    assert table.num_rows > 0, (
+        f'В ответе коннектора нет данных для объекта {object_name}'
+    )
 
-            try:
-                object_data = ObjectData.model_validate(response_json)
-            except ValidationError as e:
-                pytest.fail(f'Ошибка валидации ответа коннектора: {e}')
 
-            assert len(object_data.data) > 0, (
-                f'В ответе коннектора нет данных для объекта {object_name}'
+def test_object_data_matches_parquet(
+    available_data_source, object_name, connector_client, parquet_export_cache, test_report
+):
+    """
+    Проверяет, что object-data возвращает те же строки, что и полная выгрузка объекта в
+    parquet. Если ответ содержит не все строки, то проверяется, что его значения есть
+    в выгрузке (см. check_data_matches_export)
+    """
+    data_source = available_data_source.to_data_source()
+    subject = f'объекта {object_name}'
+
+    data = request_object_data(
+        connector_client,
+        url='data-source/object-data',
+        request_json={
+            'data_source': data_source.model_dump(),
+            'object_name': object_name,
+        },
+    )
+    if not data.num_rows:
+        pytest.skip(f'Нет данных {subject} для сравнения с выгрузкой в parquet')
+
+    export = parquet_export_cache.export(parquet_object_request(data_source, object_name))
+    assert_parquet_export_succeeded(export.job, subject)
+
+    check_data_matches_export(
+        subject,
+        'object-data',
+        data,
+        export_table=parquet_export_cache.read_table(export),
+        test_report=test_report,
+    )
+
+
+def test_object_data_payload_profile(
+    available_data_source,
+    object_name,
+    connector_client,
+    payload_profile_settings,
+    performance_settings,
+    test_report,
+):
+    """
+    Профиль object-data по размеру ответа: запросы с возрастающим limit, время до первого
+    байта, полное время ответа и время разбора ответа тестером
+    """
+    data_source = available_data_source.to_data_source()
+
+    timings = []
+    for limit in payload_profile_settings.limits:
+        request_json = {
+            'data_source': data_source.model_dump(),
+            'object_name': object_name,
+            'limit': limit,
+        }
+        timings.append(
+            median_timing(
+                [
+                    measure_object_data(connector_client, 'data-source/object-data', request_json)
+                    for _ in range(max(payload_profile_settings.repeat, 1))
+                ]
             )
-
-    if not tested:
-        pytest.skip(
-            'Нет доступных объектов для тестирования'
         )
 
+    check_payload_scaling(
+        f'объекта {object_name}',
+        timings,
+        settings=payload_profile_settings,
+        performance_settings=performance_settings,
+        test_report=test_report,
+    )
+
 
-def test_missing_object_data(test_config, connector_client):
+def test_object_data_formats(
+    available_data_source, object_name, connector_client, content_negotiation_settings, test_report
+):
+    """
+    Сравнение форматов ответа object-data (заголовок Accept): JSON, NDJSON и Arrow IPC
+    stream. Данные в поддерживаемых коннектором форматах должны совпадать с JSON ответом
+    """
+    data_source = available_data_source.to_data_source()
+
+    timings = measure_object_data_formats(
+        connector_client,
+        url='data-source/object-data',
+        request_json={
+            'data_source': data_source.model_dump(),
+            'object_name': object_name,
+        },
+        settings=content_negotiation_settings,
+    )
+
+    check_content_negotiation(
+        f'объекта {object_name}',
+        timings,
+        test_report,
+        limit=content_negotiation_settings.limit,
+    )
+
+
+def test_missing_object_data(available_data_source, connector_client):
     """
     Тест на попытку получения данных для отсутствующего объекта источника
     """
-    for available_data_source in test_config.data_sources.available_data_sources():
-        data_source = available_data_source.to_data_source()
-        # случайная строка, которая не должна встретиться в названиях объектов источника
-        object_name = uuid.uuid4().hex
-
-        r = connector_client.post(
-            'data-source/object-data',
-            json={
-                'data_source': data_source.model_dump(),
-                'object_name': object_name,
-            },
-        )
+    data_source = available_data_source.to_data_source()
+    # случайная строка, которая не должна встретиться в названиях объектов источника
+    object_name = uuid.uuid4().hex
+
+    r = connector_client.post(
+        'data-source/object-data',
+        json={
+            'data_source': data_source.model_dump(),
+            'object_name': object_name,
+        },
+    )
 
-        assert_error_response(r)
+    assert_error_response(r)
 
 
 def test_object_data_invalid_request(test_config, connector_client):
@@ -103,19 +190,18 @@ def test_object_data_invalid_request(test_config, connector_client):
         assert_error_response(r, request_data=bad_request)
 
 
-def test_object_data_unavailable_data_source(test_config, connector_client):
+def test_object_data_unavailable_data_source(unavailable_data_source, connector_client):
     """
     Тест на запрос к коннектору с несуществующим источником данных
     """
-    for unavailable_data_source in test_config.data_sources.unavailable_data_sources():
-        data_source = unavailable_data_source.to_data_source()
-
-        r = connector_client.post(
-            url='data-source/object-data',
-            json={
-                'data_source': data_source.model_dump(),
-                'object_name': uuid.uuid4().hex,
-            },
-        )
+    data_source = unavailable_data_source.to_data_source()
+
+    r = connector_client.post(
+        url='data-source/object-data',
+        json={
+            'data_source': data_source.model_dump(),
+            'object_name': uuid.uuid4().hex,
+        },
+    )
 
-        assert_error_response(r)
+    assert_error_response(r)
@@ -3,497 +3,537 @@ import uuid
 
 import pytest
 
+from aw_puller_tester.checksum import (
+    CONSISTENCY_SECTION,
+    combined_checksum,
+    mismatched_columns,
+    table_checksums,
+)
 from aw_puller_tester.dto import ObjectMeta
+from aw_puller_tester.filters import UnsupportedFilterError, filter_expression
+from aw_puller_tester.performance import (
+    check_limit_pushdown,
+    check_native_types,
+    check_parquet_layout,
+    undetermined_cardinality_columns,
+)
 from aw_puller_tester.tools import (
+    STREAMING_SECTION,
     assert_error_response,
-    read_and_assert_exported_parquet,
+    assert_exported_parquet_meta,
+    assert_parquet_export_succeeded,
+    footer_null_counts,
+    parquet_object_request,
+    parquet_sql_request,
+    read_parquet_sample,
+    read_parquet_table,
     request_parquet_and_wait,
-    delete_s3_folder,
+    verify_parquet_streaming,
 )
 
 
-def test_parquet(
-    test_config, connector_client, etl_s3_client, etl_s3_bucket, etl_temp_run_folder
-):
+def test_parquet(available_data_source, object_name, parquet_export_cache):
     """
     Проверка выгрузки в parquet для объекта источника
     """
-    tested = False
-
-    for available_data_source in test_config.data_sources.available_data_sources():
-        data_source = available_data_source.to_data_source()
-
-        for object_name in available_data_source.get_objects():
-            # очищаем папку запуска
-            delete_s3_folder(etl_s3_client, etl_s3_bucket, etl_temp_run_folder)
-
-            tested = True
-            export_path_key = os.path.join(etl_temp_run_folder, 'data.parquet')
-
-            r = request_parquet_and_wait(
-                client=connector_client,
-                request_json={
-                    'object': {
-                        'name': object_name,
-                        'type': 'table',
-                        'data_source': data_source.model_dump(),
-                    },
-                    'folder': f's3://{export_path_key}',
-                    'filters': [],
-                },
-            )
+    data_source = available_data_source.to_data_source()
 
-            assert r is not None, 'Объект ответа не должен быть пустым'
+    export = parquet_export_cache.export(parquet_object_request(data_source, object_name))
 
-            assert r.status_code < 400, (
-                f'HTTP {r.status_code} при выгрузке данных объекта {object_name}: {r.text}'
-            )
+    assert_parquet_export_succeeded(export.job, f'объекта {object_name}')
 
-            read_and_assert_exported_parquet(
-                s3_client=etl_s3_client,
-                bucket=etl_s3_bucket,
-                exported_parquet_key=export_path_key,
-            )
+    assert_exported_parquet_meta(parquet_export_cache.read_meta(export))
+
+
+def test_parquet_layout(
+    available_data_source,
+    object_name,
+    parquet_export_cache,
+    performance_settings,
+    etl_s3_client,
+    etl_s3_bucket,
+    test_report,
+):
+    """
+    Проверка структуры выгрузки объекта в parquet по футерам файлов: группы строк,
+    сжатие, словарное кодирование и статистики столбцов. Выгрузка целиком не читается:
+    для строковых столбцов без статистики distinct_count считывается только выборка строк
+    """
+    data_source = available_data_source.to_data_source()
+
+    export = parquet_export_cache.export(parquet_object_request(data_source, object_name))
+
+    assert_parquet_export_succeeded(export.job, f'объекта {object_name}')
+
+    meta = parquet_export_cache.read_meta(export)
+
+    sample = None
+    sample_columns = undetermined_cardinality_columns(meta, performance_settings)
+    if sample_columns:
+        sample = read_parquet_sample(
+            etl_s3_client,
+            etl_s3_bucket,
+            export.export_path_key + '/',
+            columns=sample_columns,
+            max_rows=performance_settings.layout.sample_rows,
+        )
+
+    check_parquet_layout(
+        f'объекта {object_name}',
+        meta=meta,
+        settings=performance_settings,
+        test_report=test_report,
+        sample=sample,
+    )
+
+
+def test_parquet_streaming(
+    available_data_source,
+    object_name,
+    parquet_export_cache,
+    streaming_settings,
+    etl_s3_client,
+    etl_s3_bucket,
+    test_report,
+):
+    """
+    Потоковая проверка выгрузки объекта в parquet: выгрузка читается пакетами с ограничением
+    памяти, количество строк, схема и количество NULL сверяются с метаданными футеров.
+    Контрольные суммы столбцов сверяются с повторным потоковым чтением с другим размером
+    пакета: суммы не зависят от границ пакетов, поэтому должны совпасть
+    """
+    data_source = available_data_source.to_data_source()
+
+    export = parquet_export_cache.export(parquet_object_request(data_source, object_name))
 
-    if not tested:
-        pytest.skip('Нет доступных объектов для тестирования')
+    assert_parquet_export_succeeded(export.job, f'объекта {object_name}')
+
+    meta = parquet_export_cache.read_meta(export)
+    max_memory_mb = streaming_settings.max_memory_mb
+    batch_size = streaming_settings.batch_size
+
+    result, reference = [
+        verify_parquet_streaming(
+            etl_s3_client,
+            etl_s3_bucket,
+            export.export_path_key + '/',
+            batch_size=size,
+            max_memory_bytes=max_memory_mb * 1024 * 1024 if max_memory_mb is not None else None,
+        )
+        for size in (batch_size, batch_size // 2 if batch_size > 1 else 2)
+    ]
+
+    test_report.add(
+        STREAMING_SECTION,
+        {
+            'object': object_name,
+            'rows': result.num_rows,
+            'batches': result.batches,
+            'reference batches': reference.batches,
+            'read, MB': result.bytes_read / 1024 / 1024,
+            'peak arrow, MB': result.peak_memory / 1024 / 1024,
+            'checksum': combined_checksum(result.checksums),
+            'reference checksum': combined_checksum(reference.checksums),
+        },
+    )
+
+    assert result.num_rows == meta.num_rows, (
+        f'При потоковом чтении выгрузки объекта {object_name} получено {result.num_rows} строк, '
+        f'в метаданных указано {meta.num_rows}'
+    )
+    assert result.schema is not None and result.schema.equals(meta.schema), (
+        f'Схема потокового чтения выгрузки объекта {object_name} не совпадает с метаданными'
+    )
+
+    for name, null_count in footer_null_counts(meta).items():
+        if null_count is not None:
+            assert result.null_counts[name] == null_count, (
+                f'Количество NULL в столбце {name} выгрузки объекта {object_name} '
+                f'({result.null_counts[name]}) не совпадает со статистикой футеров ({null_count})'
+            )
+
+    mismatched = mismatched_columns(result.checksums, reference.checksums)
+    assert not mismatched, (
+        f'Контрольные суммы потокового чтения выгрузки объекта {object_name} пакетами по '
+        f'{result.batches} и {reference.batches} пакетов не совпадают в столбцах {mismatched}'
+    )
 
 
 def test_parquet_with_fields(
-    test_config, connector_client, etl_s3_client, etl_s3_bucket, etl_temp_run_folder
+    available_data_source, object_name, connector_client, parquet_export_cache
 ):
     """
     Проверка выгрузки паркета по специальному списку полей
     """
-    tested = False
+    data_source = available_data_source.to_data_source()
 
-    for available_data_source in test_config.data_sources.available_data_sources():
-        data_source = available_data_source.to_data_source()
+    # 1. запрашиваем список столбцов объекта
+    r = connector_client.post(
+        url='data-source/object-meta',
+        json={
+            'data_source': data_source.model_dump(),
+            'object_name': object_name,
+        },
+    )
 
-        for object_name in available_data_source.get_objects():
-            # очищаем папку запуска
-            delete_s3_folder(etl_s3_client, etl_s3_bucket, etl_temp_run_folder)
+    assert r.status_code < 400, (
+        f'Не удалось получить метаданные объекта {object_name} источника {data_source.id}'
+    )
 
-            tested = True
+    object_meta = ObjectMeta.model_validate(r.json())
 
-            # 1. запрашиваем список столбцов объекта
-            r = connector_client.post(
-                url='data-source/object-meta',
-                json={
-                    'data_source': data_source.model_dump(),
-                    'object_name': object_name,
-                },
-            )
+    # 2. запрашиваем выгрузку в parquet без указания списка столбцов
+    export = parquet_export_cache.export(parquet_object_request(data_source, object_name))
 
-            assert r.status_code < 400, (
-                f'Не удалось получить метаданные объекта {object_name} источника {data_source.id}'
-            )
+    assert_parquet_export_succeeded(export.job, f'объекта {object_name}')
 
-            object_meta = ObjectMeta.model_validate(r.json())
+    meta_all_columns = parquet_export_cache.read_meta(export)
+    assert_exported_parquet_meta(meta_all_columns)
 
-            # 2. запрашиваем выгрузку в parquet без указания списка столбцов
-            export_path_key = os.path.join(
-                etl_temp_run_folder, 'data_all_columns.parquet'
-            )
+    for column in object_meta.columns:
+        assert column.name in meta_all_columns.schema.names, (
+            f'Столбец {column.name} не найден в выгруженных данных объекта {object_name} '
+            f'источника id={data_source.id}'
+        )
 
-            r = request_parquet_and_wait(
-                client=connector_client,
-                request_json={
-                    'object': {
-                        'name': object_name,
-                        'type': 'table',
-                        'data_source': data_source.model_dump(),
-                    },
-                    'folder': f's3://{export_path_key}',
-                    'filters': [],
-                },
-            )
+    # 3. Запрашиваем выгрузку в parquet только первого столбца
 
-            assert r is not None, 'Объект ответа не должен быть пустым'
+    first_column = object_meta.columns[0]
 
-            assert r.status_code < 400, (
-                f'HTTP {r.status_code} при выгрузке данных объекта {object_name}: {r.text}'
-            )
+    # для тестов выгрузки в parquet берем только одно первое поле
+    parquet_fields = [
+        {'name': first_column.name, 'type': first_column.simple_type.value}
+    ]
 
-            table_all_columns = read_and_assert_exported_parquet(
-                s3_client=etl_s3_client,
-                bucket=etl_s3_bucket,
-                exported_parquet_key=export_path_key,
-            )
+    export = parquet_export_cache.export(
+        parquet_object_request(data_source, object_name, fields=parquet_fields)
+    )
 
-            for column in object_meta.columns:
-                assert column.name in table_all_columns.column_names, (
-                    f'Столбец {column.name} не найден в выгруженных данных объекта {object_name} '
-                    f'источника id={data_source.id}'
-                )
-
-            # 3. Запрашиваем выгрузку в parquet только первого столбца
-
-            first_column = object_meta.columns[0]
-
-            # для тестов выгрузки в parquet берем только одно первое поле
-            parquet_fields = [
-                {'name': first_column.name, 'type': first_column.simple_type}
-            ]
-            export_path_key = os.path.join(etl_temp_run_folder, 'data.parquet')
-
-            r = request_parquet_and_wait(
-                client=connector_client,
-                request_json={
-                    'object': {
-                        'name': object_name,
-                        'type': 'table',
-                        'data_source': data_source.model_dump(),
-                        'fields': parquet_fields,
-                    },
-                    'folder': f's3://{export_path_key}',
-                    'filters': [],
-                },
-            )
+    assert_parquet_export_succeeded(export.job, f'объекта {object_name}')
 
-            assert r is not None, 'Объект ответа не должен быть пустым'
+    meta_one_column = parquet_export_cache.read_meta(export)
+    assert_exported_parquet_meta(meta_one_column)
 
-            assert r.status_code < 400, (
-                f'HTTP {r.status_code} при выгрузке данных объекта {object_name}: {r.text}'
-            )
+    assert meta_one_column.schema.names == [first_column.name], (
+        f'В данных объекта {object_name} источника id={data_source.id} есть лишние столбцы'
+    )
 
-            table_one_column = read_and_assert_exported_parquet(
-                s3_client=etl_s3_client,
-                bucket=etl_s3_bucket,
-                exported_parquet_key=export_path_key,
-            )
 
-            assert table_one_column.column_names == [first_column.name], (
-                f'В данных объекта {object_name} источника id={data_source.id} есть лишние столбцы'
-            )
+def test_parquet_native_types(
+    available_data_source,
+    object_name,
+    connector_client,
+    parquet_export_cache,
+    performance_settings,
+    test_report,
+):
+    """
+    Проверка соответствия типов столбцов выгрузки в parquet типам полей из метаданных
+    объекта (simple_type)
+    """
+    data_source = available_data_source.to_data_source()
+
+    r = connector_client.post(
+        url='data-source/object-meta',
+        json={
+            'data_source': data_source.model_dump(),
+            'object_name': object_name,
+        },
+    )
 
-    if not tested:
-        pytest.skip('Не доступных объектов для тестирования')
+    assert r.status_code < 400, (
+        f'Не удалось получить метаданные объекта {object_name} источника {data_source.id}'
+    )
+
+    object_meta = ObjectMeta.model_validate(r.json())
+
+    export = parquet_export_cache.export(parquet_object_request(data_source, object_name))
+
+    assert_parquet_export_succeeded(export.job, f'объекта {object_name}')
+
+    check_native_types(
+        f'объекта {object_name}',
+        columns=object_meta.columns,
+        meta=parquet_export_cache.read_meta(export),
+        settings=performance_settings,
+        test_report=test_report,
+    )
 
 
 def test_parquet_with_limit(
-    test_config, connector_client, etl_s3_client, etl_s3_bucket, etl_temp_run_folder
+    available_data_source,
+    object_name,
+    parquet_export_cache,
+    timed_parquet_export,
+    performance_settings,
+    test_report,
 ):
     """
-    Проверяет, как выгружаются данные в parquet с limit
+    Проверяет, как выгружаются данные в parquet с limit и что limit передается в источник
     """
-    tested = False
-
-    for available_data_source in test_config.data_sources.available_data_sources():
-        data_source = available_data_source.to_data_source()
-
-        for object_name in available_data_source.get_objects():
-            # очищаем папку запуска
-            delete_s3_folder(etl_s3_client, etl_s3_bucket, etl_temp_run_folder)
-
-            # 1. Сначала делаем запрос за всеми данными
-            export_path_key = os.path.join(etl_temp_run_folder, 'data_all.parquet')
-
-            r = request_parquet_and_wait(
-                client=connector_client,
-                request_json={
-                    'object': {
-                        'name': object_name,
-                        'type': 'table',
-                        'data_source': data_source.model_dump(),
-                    },
-                    'folder': f's3://{export_path_key}',
-                    'filters': [],
-                },
-            )
+    data_source = available_data_source.to_data_source()
 
-            assert r is not None, 'Объект ответа не должен быть пустым'
+    # 1. Сначала делаем запрос за всеми данными
+    export = parquet_export_cache.export(
+        parquet_object_request(data_source, object_name)
+    )
 
-            assert r.status_code < 400, (
-                f'HTTP {r.status_code} при выгрузке данных объекта {object_name}: {r.text}'
-            )
+    assert_parquet_export_succeeded(export.job, f'объекта {object_name}')
 
-            table_all = read_and_assert_exported_parquet(
-                s3_client=etl_s3_client,
-                bucket=etl_s3_bucket,
-                exported_parquet_key=export_path_key,
-            )
+    meta_all = parquet_export_cache.read_meta(export)
+    assert_exported_parquet_meta(meta_all)
 
-            if table_all.num_rows < 2:
-                # для данного объекта запускать LIMIT 1 нет смысла, пропускаем его
-                continue
-
-            tested = True
-            # 2. Делаем запрос с LIMIT 1
-            export_path_key = os.path.join(etl_temp_run_folder, 'data_limit.parquet')
-
-            r = request_parquet_and_wait(
-                client=connector_client,
-                request_json={
-                    'object': {
-                        'name': object_name,
-                        'type': 'table',
-                        'data_source': data_source.model_dump(),
-                    },
-                    'folder': f's3://{export_path_key}',
-                    'limit': 1,
-                },
-            )
+    if meta_all.num_rows < 2:
+        pytest.skip(f'Для объекта {object_name} с одной строкой запускать LIMIT 1 нет смысла')
 
-            assert r is not None, 'Объект ответа не должен быть пустым'
+    # 2. Делаем запрос с LIMIT 1
+    export = parquet_export_cache.export(
+        parquet_object_request(data_source, object_name, limit=1)
+    )
 
-            assert r.status_code < 400, (
-                f'HTTP {r.status_code} при выгрузке данных объекта {object_name}: {r.text}'
-            )
+    assert_parquet_export_succeeded(export.job, f'объекта {object_name}')
 
-            table = read_and_assert_exported_parquet(
-                etl_s3_client, etl_s3_bucket, export_path_key
-            )
+    meta = parquet_export_cache.read_meta(export)
+    assert_exported_parquet_meta(meta)
 
-            assert table.num_rows == 1, f'LIMIT 1 не применился объекта {object_name}'
+    assert meta.num_rows == 1, f'LIMIT 1 не применился объекта {object_name}'
 
-    if not tested:
-        pytest.skip('Нет доступных фильтров для тестирования')
+    # 3. Выгрузка с LIMIT 1 не должна стоить заметную долю полной выгрузки. Время замеряется
+    # отдельными выгрузками с частым опросом, а не по выгрузкам из кэша
+    full_job = timed_parquet_export(parquet_object_request(data_source, object_name))
+    assert_parquet_export_succeeded(full_job, f'объекта {object_name}')
+    limit_job = timed_parquet_export(parquet_object_request(data_source, object_name, limit=1))
+    assert_parquet_export_succeeded(limit_job, f'объекта {object_name}')
 
+    check_limit_pushdown(
+        f'объекта {object_name}',
+        full_job=full_job,
+        full_meta=meta_all,
+        limit_job=limit_job,
+        limit_meta=meta,
+        settings=performance_settings,
+        test_report=test_report,
+    )
 
-def test_parquet_with_filters(
-    test_config, connector_client, etl_s3_client, etl_s3_bucket, etl_temp_run_folder
-):
+
+def test_parquet_with_filters(available_data_source, object_filter, parquet_export_cache):
     """
     Проверка выгрузки данных в parquet с дополнительными условиями
     """
-    tested = False
-
-    for available_data_source in test_config.data_sources.available_data_sources():
-        data_source = available_data_source.to_data_source()
-
-        for filter in available_data_source.get_filters():
-            # очищаем папку запуска
-            delete_s3_folder(etl_s3_client, etl_s3_bucket, etl_temp_run_folder)
-
-            tested = True
-
-            # 1. сначала сделаем запрос за всеми данными
-            export_path_key = os.path.join(etl_temp_run_folder, 'data_all.parquet')
-
-            r = request_parquet_and_wait(
-                client=connector_client,
-                request_json={
-                    'object': {
-                        'name': filter.object_name,
-                        'type': 'table',
-                        'data_source': data_source.model_dump(),
-                    },
-                    'folder': f's3://{export_path_key}',
-                    'filters': [],
-                },
-            )
+    data_source = available_data_source.to_data_source()
 
-            assert r is not None, 'Объект ответа не должен быть пустым'
+    subject = f'объекта {object_filter.object_name} для источника id={data_source.id}'
 
-            assert r.status_code < 400, (
-                f'HTTP {r.status_code} при выгрузке данных объекта {filter.object_name} для источника id={data_source.id}: {r.text}'
-            )
-
-            table_all = read_and_assert_exported_parquet(
-                etl_s3_client, etl_s3_bucket, export_path_key
-            )
+    # 1. сначала сделаем запрос за всеми данными
+    export = parquet_export_cache.export(
+        parquet_object_request(data_source, object_filter.object_name)
+    )
 
-            # 2. Делаем запрос из-под фильтра
-            export_path_key = os.path.join(etl_temp_run_folder, 'data_filtered.parquet')
-            r = request_parquet_and_wait(
-                client=connector_client,
-                request_json={
-                    'object': {
-                        'name': filter.object_name,
-                        'type': 'table',
-                        'data_source': data_source.model_dump(),
-                    },
-                    'folder': f's3://{export_path_key}',
-                    'filters': [
-                        {
-                            'field_name': filter.field_name,
-                            'operator': filter.operator,
-                            'value': filter.value,
-                        }
-                    ],
-                },
-            )
+    assert_parquet_export_succeeded(export.job, subject)
 
-            assert r is not None, 'Объект ответа не должен быть пустым'
+    meta_all = parquet_export_cache.read_meta(export)
+    assert_exported_parquet_meta(meta_all)
 
-            assert r.status_code < 400, (
-                f'HTTP {r.status_code} при выгрузке данных объекта {filter.object_name} для источника id={data_source.id}: {r.text}'
-            )
+    # 2. Делаем запрос из-под фильтра
+    export = parquet_export_cache.export(
+        parquet_object_request(
+            data_source, object_filter.object_name, filters=[object_filter.to_parquet_filter()]
+        )
+    )
 
-            table_filter = read_and_assert_exported_parquet(
-                etl_s3_client, etl_s3_bucket, export_path_key
-            )
+    assert_parquet_export_succeeded(export.job, subject)
 
-            # Под фильтром должно получиться меньше записей
-            assert table_filter.num_rows < table_all.num_rows, (
-                f'Фильтр {filter} не применился для источника id={data_source.id}'
-            )
+    meta_filter = parquet_export_cache.read_meta(export)
+    assert_exported_parquet_meta(meta_filter)
 
-    if not tested:
-        pytest.skip('Нет доступных фильтров для тестирования')
+    # Под фильтром должно получиться меньше записей
+    assert meta_filter.num_rows < meta_all.num_rows, (
+        f'Фильтр {object_filter} не применился для источника id={data_source.id}'
+    )
 
 
-def test_parquet_sql(
-    test_config, connector_client, etl_s3_client, etl_s3_bucket, etl_temp_run_folder
+def test_parquet_filter_correctness(available_data_source, object_filter, parquet_export_cache):
+    """
+    Проверяет, что выгрузка с фильтром совпадает с полной выгрузкой, отфильтрованной
+    локально тем же условием (pyarrow.compute)
+    """
+    data_source = available_data_source.to_data_source()
+
+    subject = f'объекта {object_filter.object_name} для источника id={data_source.id}'
+
+    export_all, export_filter = parquet_export_cache.export_many(
+        [
+            parquet_object_request(data_source, object_filter.object_name),
+            parquet_object_request(
+                data_source, object_filter.object_name, filters=[object_filter.to_parquet_filter()]
+            ),
+        ]
+    )
+
+    assert_parquet_export_succeeded(export_all.job, subject)
+    assert_parquet_export_succeeded(export_filter.job, subject)
+
+    table_all = parquet_export_cache.read_table(export_all)
+
+    try:
+        expression = filter_expression(object_filter, table_all.schema)
+    except UnsupportedFilterError as e:
+        pytest.skip(str(e))
+
+    expected = table_all.filter(expression)
+    actual = parquet_export_cache.read_table(export_filter)
+
+    assert actual.schema.equals(expected.schema), (
+        f'Схема выгрузки {subject} с фильтром {object_filter.describe()} отличается от схемы '
+        f'полной выгрузки: {actual.schema} != {expected.schema}'
+    )
+
+    mismatched = mismatched_columns(table_checksums(actual), table_checksums(expected))
+    assert actual.num_rows == expected.num_rows and not mismatched, (
+        f'Выгрузка {subject} с фильтром {object_filter.describe()} содержит {actual.num_rows} строк, '
+        f'а локальный фильтр полной выгрузки отбирает {expected.num_rows} строк '
+        f'(отличаются значения столбцов {mismatched})'
+    )
+
+
+def test_parquet_determinism(
+    available_data_source,
+    object_name,
+    parquet_export_cache,
+    parquet_exporter,
+    etl_s3_client,
+    etl_s3_bucket,
+    etl_temp_run_folder,
+    test_report,
 ):
+    """
+    Проверяет, что повторная выгрузка объекта в parquet возвращает те же данные (с точностью
+    до порядка строк). Данные сравниваются по контрольным суммам столбцов
+    """
+    data_source = available_data_source.to_data_source()
+    subject = f'объекта {object_name}'
+    request_json = parquet_object_request(data_source, object_name)
+
+    export = parquet_export_cache.export(request_json)
+    assert_parquet_export_succeeded(export.job, subject)
+    first = parquet_export_cache.read_table(export)
+
+    export_path_key = os.path.join(etl_temp_run_folder, 'data.parquet')
+    [job] = parquet_exporter([{**request_json, 'folder': f's3://{export_path_key}'}])
+    assert_parquet_export_succeeded(job, subject)
+    second = read_parquet_table(etl_s3_client, etl_s3_bucket, export_path_key + '/')
+
+    mismatched = mismatched_columns(table_checksums(second), table_checksums(first))
+
+    test_report.add(
+        CONSISTENCY_SECTION,
+        {
+            'export': subject,
+            'compared with': 'повторная выгрузка',
+            'rows': first.num_rows,
+            'other rows': second.num_rows,
+            'mismatched columns': ', '.join(mismatched),
+        },
+    )
+
+    assert second.num_rows == first.num_rows and not mismatched, (
+        f'Повторная выгрузка {subject} содержит {second.num_rows} строк вместо {first.num_rows} '
+        f'(отличаются значения столбцов {mismatched})'
+    )
+
+
+def test_parquet_sql(available_data_source, sql_text, parquet_export_cache):
     """
     Проверка выгрузки в parquet для SQL-запроса
     """
-    tested = False
-
-    for available_data_source in test_config.data_sources.available_data_sources():
-        data_source = available_data_source.to_data_source()
-
-        for sql_text in available_data_source.get_sql():
-            # очищаем папку запуска
-            delete_s3_folder(etl_s3_client, etl_s3_bucket, etl_temp_run_folder)
-
-            tested = True
-
-            export_path_key = os.path.join(etl_temp_run_folder, 'data.parquet')
-
-            r = request_parquet_and_wait(
-                client=connector_client,
-                request_json={
-                    'object': {
-                        'name': 'jsql',
-                        'type': 'sql',
-                        'query_text': sql_text,
-                        'data_source': data_source.model_dump(),
-                    },
-                    'folder': f's3://{export_path_key}',
-                    'filters': [],
-                },
-            )
+    data_source = available_data_source.to_data_source()
 
-            assert r is not None, 'Объект ответа не должен быть пустым'
+    export = parquet_export_cache.export(parquet_sql_request(data_source, sql_text))
 
-            assert r.status_code < 400, (
-                f'HTTP {r.status_code} при выгрузке данных для SQL запроса {sql_text}: {r.text}'
-            )
+    assert_parquet_export_succeeded(export.job, f'для SQL запроса {sql_text}')
 
-            read_and_assert_exported_parquet(
-                etl_s3_client, etl_s3_bucket, export_path_key
-            )
-
-    if not tested:
-        pytest.skip('Нет доступных SQL запросов для тестирования')
+    assert_exported_parquet_meta(parquet_export_cache.read_meta(export))
 
 
 def test_parquet_sql_with_limit(
-    test_config, connector_client, etl_s3_client, etl_s3_bucket, etl_temp_run_folder
+    available_data_source,
+    sql_text,
+    parquet_export_cache,
+    timed_parquet_export,
+    performance_settings,
+    test_report,
 ):
     """
-    Проверяет как выполняется выгрузка в parquet с указанием limit
+    Проверяет как выполняется выгрузка в parquet с указанием limit и что limit
+    передается в источник
     """
-    tested = False
-    for available_data_source in test_config.data_sources.available_data_sources():
-        data_source = available_data_source.to_data_source()
-
-        for sql_text in available_data_source.get_sql():
-            # очищаем папку запуска
-            delete_s3_folder(etl_s3_client, etl_s3_bucket, etl_temp_run_folder)
-
-            tested = True
-
-            # 1. Сначала делаем запрос за всеми данными
-            export_path_key = os.path.join(etl_temp_run_folder, 'data_all.parquet')
-
-            r = request_parquet_and_wait(
-                client=connector_client,
-                request_json={
-                    'object': {
-                        'name': 'jsql',
-                        'type': 'sql',
-                        'query_text': sql_text,
-                        'data_source': data_source.model_dump(),
-                    },
-                    'folder': f's3://{export_path_key}',
-                    'filters': [],
-                },
-            )
+    data_source = available_data_source.to_data_source()
 
-            assert r is not None, 'Объект ответа не должен быть пустым'
+    # 1. Сначала делаем запрос за всеми данными
+    export = parquet_export_cache.export(parquet_sql_request(data_source, sql_text))
 
-            assert r.status_code < 400, (
-                f'HTTP {r.status_code} при выгрузке данных SQL запроса {sql_text}: {r.text}'
-            )
+    assert_parquet_export_succeeded(export.job, f'SQL запроса {sql_text}')
 
-            table_all = read_and_assert_exported_parquet(
-                s3_client=etl_s3_client,
-                bucket=etl_s3_bucket,
-                exported_parquet_key=export_path_key,
-            )
+    meta_all = parquet_export_cache.read_meta(export)
+    assert_exported_parquet_meta(meta_all)
 
-            if table_all.num_rows < 2:
-                # для данного объекта запускать LIMIT 1 нет смысла, пропускаем его
-                continue
-
-            tested = True
-            # 2. Делаем запрос с LIMIT 1
-            export_path_key = os.path.join(etl_temp_run_folder, 'data_limit.parquet')
-
-            r = request_parquet_and_wait(
-                client=connector_client,
-                request_json={
-                    'object': {
-                        'name': 'jsql',
-                        'type': 'sql',
-                        'query_text': sql_text,
-                        'data_source': data_source.model_dump(),
-                    },
-                    'folder': f's3://{export_path_key}',
-                    'limit': 1,
-                },
-            )
+    if meta_all.num_rows < 2:
+        pytest.skip(f'Для SQL запроса {sql_text} с одной строкой запускать LIMIT 1 нет смысла')
 
-            assert r is not None, 'Объект ответа не должен быть пустым'
+    # 2. Делаем запрос с LIMIT 1
+    export = parquet_export_cache.export(parquet_sql_request(data_source, sql_text, limit=1))
 
-            assert r.status_code < 400, (
-                f'HTTP {r.status_code} при выгрузке данных SQL запроса {sql_text}: {r.text}'
-            )
+    assert_parquet_export_succeeded(export.job, f'SQL запроса {sql_text}')
 
-            table = read_and_assert_exported_parquet(
-                etl_s3_client, etl_s3_bucket, export_path_key
-            )
+    meta = parquet_export_cache.read_meta(export)
+    assert_exported_parquet_meta(meta)
 
-            assert table.num_rows == 1, (
-                f'LIMIT 1 не применился для SQL запроса {sql_text}'
-            )
+    assert meta.num_rows == 1, (
+        f'LIMIT 1 не применился для SQL запроса {sql_text}'
+    )
+
+    # 3. Выгрузка с LIMIT 1 не должна стоить заметную долю полной выгрузки. Время замеряется
+    # отдельными выгрузками с частым опросом, а не по выгрузкам из кэша
+    full_job = timed_parquet_export(parquet_sql_request(data_source, sql_text))
+    assert_parquet_export_succeeded(full_job, f'SQL запроса {sql_text}')
+    limit_job = timed_parquet_export(parquet_sql_request(data_source, sql_text, limit=1))
+    assert_parquet_export_succeeded(limit_job, f'SQL запроса {sql_text}')
 
-    if not tested:
-        pytest.skip('Нет доступных SQL запросов для тестирования')
+    check_limit_pushdown(
+        f'SQL запроса {sql_text}',
+        full_job=full_job,
+        full_meta=meta_all,
+        limit_job=limit_job,
+        limit_meta=meta,
+        settings=performance_settings,
+        test_report=test_report,
+    )
 
 
 def test_missing_object_parquet(
-    test_config, connector_client, etl_s3_client, etl_s3_bucket, etl_temp_run_folder
+    available_data_source, connector_client, etl_temp_run_folder, parquet_polling
 ):
     """ """
-
-    for available_data_source in test_config.data_sources.available_data_sources():
-        # очищаем папку запуска
-        delete_s3_folder(etl_s3_client, etl_s3_bucket, etl_temp_run_folder)
-
-        data_source = available_data_source.to_data_source()
-        # случайная строка, которая не должна встретиться в названиях объектов источника
-        object_name = uuid.uuid4().hex
-
-        folder = os.path.join(etl_temp_run_folder, 'data.parquet')
-
-        r = request_parquet_and_wait(
-            client=connector_client,
-            request_json={
-                'object': {
-                    'name': object_name,
-                    'data_source': data_source.model_dump(),
-                },
-                'folder': f's3://{folder}',
-                'filters': [],
+    data_source = available_data_source.to_data_source()
+    # случайная строка, которая не должна встретиться в названиях объектов источника
+    object_name = uuid.uuid4().hex
+
+    folder = os.path.join(etl_temp_run_folder, 'data.parquet')
+
+    r = request_parquet_and_wait(
+        client=connector_client,
+        request_json={
+            'object': {
+                'name': object_name,
+                'data_source': data_source.model_dump(),
             },
-        )
+            'folder': f's3://{folder}',
+            'filters': [],
+        },
+        polling=parquet_polling,
+    )
 
-        assert_error_response(r)
+    assert_error_response(r)
 
 
 def test_parquet_invalid_request(test_config, connector_client):
@@ -512,26 +552,25 @@ def test_parquet_invalid_request(test_config, connector_client):
 
 
 def test_parquet_unavailable_data_source(
-    test_config, connector_client, etl_temp_run_folder
+    unavailable_data_source, connector_client, etl_temp_run_folder
 ):
     """
     Тест на запрос к коннектору с несуществующим источником данных
     """
-    for unavailable_data_source in test_config.data_sources.unavailable_data_sources():
-        data_source = unavailable_data_source.to_data_source()
-
-        folder = os.path.join(etl_temp_run_folder, 'data.parquet')
-
-        r = connector_client.post(
-            url='data-source/parquet',
-            json={
-                'object': {
-                    'name': uuid.uuid4().hex,
-                    'data_source': data_source.model_dump(),
-                },
-                'folder': f's3://{folder}',
-                'filters': [],
+    data_source = unavailable_data_source.to_data_source()
+
+    folder = os.path.join(etl_temp_run_folder, 'data.parquet')
+
+    r = connector_client.post(
+        url='data-source/parquet',
+        json={
+            'object': {
+                'name': uuid.uuid4().hex,
+                'data_source': data_source.model_dump(),
             },
-        )
+            'folder': f's3://{folder}',
+            'filters': [],
+        },
+    )
 
-        assert_error_response(r)
+    assert_error_response(r)
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from aw_puller_tester.checksum import mismatched_columns, table_checksums
+from aw_puller_tester.parquet_export import PollingPolicy
+from aw_puller_tester.scaling import (
+    SCALING_SECTION,
+    ScalingLevelResult,
+    scaling_levels,
+    scaling_report_rows,
+)
+from aw_puller_tester.tools import (
+    assert_parquet_export_succeeded,
+    parquet_object_request,
+    read_parquet_table,
+)
+
+
+def test_parquet_scaling(
+    available_data_source,
+    object_name,
+    test_config,
+    parquet_exporter,
+    etl_s3_client,
+    etl_s3_bucket,
+    etl_temp_run_folder,
+    test_report,
+):
+    """
+    Выполняет одну и ту же выгрузку объекта в parquet одновременно 1, 2, 4 ... N раз
+    (каждую в свою папку) и строит зависимость суммарной скорости выгрузки от конкурентности.
+    Результаты всех одновременных выгрузок должны совпадать. Задания опрашиваются с постоянной
+    короткой паузой scaling.poll_interval
+    """
+    scaling_settings = test_config.scaling
+    if scaling_settings is None:
+        pytest.skip('Проверка масштабирования не настроена (раздел scaling в конфигурации)')
+
+    data_source = available_data_source.to_data_source()
+    subject = f'объекта {object_name}'
+    request_json = parquet_object_request(data_source, object_name)
+
+    polling = PollingPolicy.fixed(scaling_settings.poll_interval)
+    reference_rows = None
+    reference_checksums = None
+    results = []
+
+    for concurrency in scaling_levels(scaling_settings.max_concurrency):
+        export_path_keys = [
+            os.path.join(etl_temp_run_folder, f'c{concurrency}', f'job{i}', 'data.parquet')
+            for i in range(concurrency)
+        ]
+
+        jobs = parquet_exporter(
+            [{**request_json, 'folder': f's3://{key}'} for key in export_path_keys],
+            max_concurrency=concurrency,
+            polling=polling,
+        )
+
+        for job in jobs:
+            assert_parquet_export_succeeded(job, subject)
+
+        for export_path_key in export_path_keys:
+            table = read_parquet_table(etl_s3_client, etl_s3_bucket, export_path_key + '/')
+            checksums = table_checksums(table)
+            if reference_checksums is None:
+                reference_rows, reference_checksums = table.num_rows, checksums
+
+            mismatched = mismatched_columns(checksums, reference_checksums)
+            assert table.num_rows == reference_rows and not mismatched, (
+                f'Результат выгрузки {subject} при {concurrency} одновременных выгрузках '
+                f'отличается от результата одиночной выгрузки: {table.num_rows} строк вместо '
+                f'{reference_rows}, отличаются столбцы {mismatched}'
+            )
+
+        results.append(
+            ScalingLevelResult(concurrency=concurrency, jobs=jobs, rows=reference_rows)
+        )
+
+    for row in scaling_report_rows(
+        f'ds{data_source.id}/{object_name}', results, scaling_settings.saturation_gain
+    ):
+        test_report.add(SCALING_SECTION, row)
@@ -2,54 +2,140 @@ import uuid
 
 import pytest
 import httpx
-from pydantic import ValidationError
 
-from aw_puller_tester.dto import ObjectData
-from aw_puller_tester.tools import assert_error_response
+from aw_puller_tester.checksum import check_data_matches_export
+from aw_puller_tester.content_negotiation import (
+    check_content_negotiation,
+    measure_object_data_formats,
+)
+from aw_puller_tester.payload_profile import (
+    check_payload_scaling,
+    measure_object_data,
+    median_timing,
+)
+from aw_puller_tester.tools import (
+    assert_error_response,
+    assert_parquet_export_succeeded,
+    parquet_sql_request,
+    request_object_data,
+)
 
 
-def test_sql_data(test_config, connector_client):
+def test_sql_data(available_data_source, sql_text, connector_client):
     """
     Проверка получения данных объекта из источника
     """
-    tested = False
+    data_source = available_data_source.to_data_source()
 
-    for available_data_source in test_config.data_sources.available_data_sources():
-        data_source = available_data_source.to_data_source()
+    table = request_object_data(
+        connector_client,
+        url='data-source/sql-object-data',
+        request_json={
+            'data_source': data_source.model_dump(),
+            'sql_text': sql_text,
+        },
+    )
 
-        for sql_text in available_data_source.get_sql():
-            tested = True
-            
+    assert table.num_rows > 0, (
+        f'В ответе коннектора нет данных для sql-запроса {sql_text}'
+    )
 
-            r = connector_client.post(
-                url='data-source/sql-object-data',
-                json={
-                    'data_source': data_source.model_dump(),
-                    'sql_text': sql_text,
-                },
-            )
 
-            assert r.status_code < 400, (
-                f'Ожидался ответ коннектора с ошибочным HTTP статусом. Получено HTTP {r.status_code}: {r.text}.'
-            )
+def test_sql_data_matches_parquet(
+    available_data_source, sql_text, connector_client, parquet_export_cache, test_report
+):
+    """
+    Проверяет, что sql-object-data возвращает те же строки, что и полная выгрузка SQL запроса в
+    parquet. Если ответ содержит не все строки, то проверяется, что его значения есть
+    в выгрузке (см. check_data_matches_export)
+    """
+    data_source = available_data_source.to_data_source()
+    subject = f'SQL запроса {sql_text}'
 
-            try:
-                response_json = r.json()
-            except Exception:
-                pytest.fail(
-                    f'В ответе коннектора ожидался JSON-объект. Получено: {r.text}'
-                )
+    data = request_object_data(
+        connector_client,
+        url='data-source/sql-object-data',
+        request_json={
+            'data_source': data_source.model_dump(),
+            'sql_text': sql_text,
+        },
+    )
+    if not data.num_rows:
+        pytest.skip(f'Нет данных {subject} для сравнения с выгрузкой в parquet')
 
-            try:
-                object_data = ObjectData.model_validate(response_json)
-            except ValidationError as e:
-                pytest.fail(f'Ошибка валидации ответа коннектора: {e}')
+    export = parquet_export_cache.export(parquet_sql_request(data_source, sql_text))
+    assert_parquet_export_succeeded(export.job, subject)
 
-            assert len(object_data.data) > 0, (
-                f'В ответе коннектора нет данных для sql-запроса {sql_text}'
+    check_data_matches_export(
+        subject,
+        'sql-object-data',
+        data,
+        export_table=parquet_export_cache.read_table(export),
+        test_report=test_report,
+    )
+
+
+def test_sql_data_payload_profile(
+    available_data_source,
+    sql_text,
+    connector_client,
+    payload_profile_settings,
+    performance_settings,
+    test_report,
+):
+    """
+    Профиль sql-object-data по размеру ответа: запросы с возрастающим limit, время до первого
+    байта, полное время ответа и время разбора ответа тестером
+    """
+    data_source = available_data_source.to_data_source()
+
+    timings = []
+    for limit in payload_profile_settings.limits:
+        request_json = {
+            'data_source': data_source.model_dump(),
+            'sql_text': sql_text,
+            'limit': limit,
+        }
+        timings.append(
+            median_timing(
+                [
+                    measure_object_data(connector_client, 'data-source/sql-object-data', request_json)
+                    for _ in range(max(payload_profile_settings.repeat, 1))
+                ]
             )
+        )
+
+    check_payload_scaling(
+        f'SQL запроса {sql_text}',
+        timings,
+        settings=payload_profile_settings,
+        performance_settings=performance_settings,
+        test_report=test_report,
+    )
+
+
+def test_sql_data_formats(
+    available_data_source, sql_text, connector_client, content_negotiation_settings, test_report
+):
+    """
+    Сравнение форматов ответа sql-object-data (заголовок Accept): JSON, NDJSON и Arrow IPC
+    stream. Данные в поддерживаемых коннектором форматах должны совпадать с JSON ответом
+    """
+    data_source = available_data_source.to_data_source()
+
+    timings = measure_object_data_formats(
+        connector_client,
+        url='data-source/sql-object-data',
+        request_json={
+            'data_source': data_source.model_dump(),
+            'sql_text': sql_text,
+        },
+        settings=content_negotiation_settings,
+    )
 
-    if not tested:
-        pytest.skip(
-            'Нет доступных SQL запросов для тестирования'
-        )
\ No newline at end of file
+    check_content_negotiation(
+        f'SQL запроса {sql_text}',
+        timings,
+        test_report,
+        limit=content_negotiation_settings.limit,
+    )
@@ -1,7 +1,10 @@
+import io
 import os
 import json
 import time
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import pytest
@@ -11,6 +14,15 @@ import pyarrow.parquet
 from botocore.client import BaseClient
 from botocore.exceptions import ClientError
 
+from aw_puller_tester.checksum import TableChecksum
+from aw_puller_tester.dto import DataSource
+from aw_puller_tester.object_data import (
+    DEFAULT_OBJECT_DATA_BATCH_SIZE,
+    ObjectDataParseError,
+    read_object_data,
+)
+from aw_puller_tester.parquet_export import ParquetExportJob, PollingPolicy
+
 
 def assert_error_response(r: httpx.Response | None, request_data: dict | None = None):
     """
@@ -42,14 +54,17 @@ def assert_error_response(r: httpx.Response | None, request_data: dict | None =
 
 
 def request_parquet_and_wait(
-    client: httpx.Client, request_json: dict
+    client: httpx.Client, request_json: dict, polling: PollingPolicy | None = None
 ) -> httpx.Response | None:
     """
     Вспомогательная функция, которая запрашивает выгрузку в паркет и ожидает завершения.
+    Паузы между опросами выбираются стратегией polling (не больше Retry-After).
     """
+    polling = polling or PollingPolicy()
     wait = True
     check_location = None
-    check_retry_after = 5  # количество секунд, через которое нужно повторить запрос
+    check_retry_after = None  # количество секунд, через которое нужно повторить запрос
+    polls = 0
     r = None
 
     while wait:
@@ -57,8 +72,9 @@ def request_parquet_and_wait(
             # первый запрос
             r = client.post(url='data-source/parquet', json=request_json)
         else:
-            time.sleep(check_retry_after)  # ждем перед следующим запросом
+            time.sleep(polling.delay(polls, check_retry_after))  # ждем перед следующим запросом
             r = client.get(url=check_location)
+            polls += 1
 
         if r.status_code == 202:
             # сервер ответил, что надо продолжать ждать
@@ -82,50 +98,225 @@ def request_parquet_and_wait(
     return r
 
 
-def read_parquet_table(s3_client: BaseClient, bucket: str, key: str) -> pyarrow.Table:
+def request_object_data(
+    client: httpx.Client,
+    url: str,
+    request_json: dict,
+    batch_size: int = DEFAULT_OBJECT_DATA_BATCH_SIZE,
+) -> pyarrow.Table:
     """
-    Считывает данные из parquet-файла по указанному ключу в S3 хранилище
+    Запрашивает данные object-data или sql-object-data и разбирает ответ по мере получения
+    (без построения python объектов для всего ответа). Возвращает данные в виде pyarrow таблицы
+    """
+    with client.stream('POST', url, json=request_json) as r:
+        if r.status_code >= 400:
+            r.read()
+            pytest.fail(
+                f'Ожидался успешный ответ коннектора. Получено HTTP {r.status_code}: {r.text}.'
+            )
+
+        try:
+            return read_object_data(r.iter_bytes(), batch_size)
+        except ObjectDataParseError as e:
+            pytest.fail(f'Ошибка валидации ответа коннектора: {e}')
+
+
+def parquet_object_request(
+    data_source: DataSource,
+    object_name: str,
+    fields: list[dict] | None = None,
+    filters: list[dict] | None = None,
+    limit: int | None = None,
+) -> dict:
+    """
+    Возвращает тело запроса на выгрузку объекта источника в parquet (без папки выгрузки)
+    """
+    request_json = {
+        'object': {
+            'name': object_name,
+            'type': 'table',
+            'data_source': data_source.model_dump(),
+        },
+        'filters': filters or [],
+    }
+    if fields is not None:
+        request_json['object']['fields'] = fields
+    if limit is not None:
+        request_json['limit'] = limit
+
+    return request_json
+
+
+def parquet_sql_request(
+    data_source: DataSource,
+    sql_text: str,
+    filters: list[dict] | None = None,
+    limit: int | None = None,
+) -> dict:
+    """
+    Возвращает тело запроса на выгрузку результата SQL запроса в parquet (без папки выгрузки)
+    """
+    request_json = {
+        'object': {
+            'name': 'jsql',
+            'type': 'sql',
+            'query_text': sql_text,
+            'data_source': data_source.model_dump(),
+        },
+        'filters': filters or [],
+    }
+    if limit is not None:
+        request_json['limit'] = limit
+
+    return request_json
+
+
+def assert_parquet_export_succeeded(job: ParquetExportJob, subject: str):
+    """
+    Проверяет, что коннектор успешно завершил выгрузку в parquet.
+    subject - описание выгружаемых данных для сообщения об ошибке (например, "объекта public.table1")
+    """
+    assert job.error is None, job.error
+
+    r = job.response
+
+    assert r is not None, 'Объект ответа не должен быть пустым'
+
+    assert r.status_code < 400, (
+        f'HTTP {r.status_code} при выгрузке данных {subject}: {r.text}'
+    )
+
+
+S3_READ_CHUNK_SIZE = 1024 * 1024
+DEFAULT_S3_DOWNLOAD_WORKERS = 16
+DEFAULT_STREAMING_BATCH_SIZE = 65536
+
+STREAMING_SECTION = 'Потоковая проверка выгрузок'
+
+
+def list_parquet_parts(s3_client: BaseClient, bucket: str, key: str) -> list[dict]:
+    """
+    Возвращает описания (Key, Size) parquet-файлов по указанному ключу в S3 хранилище.
+    Если ключ указывает на папку, то возвращаются все части из этой папки в порядке
+    их названий. Служебные файлы (начинающиеся с "_" или ".") пропускаются.
     """
     key = key.strip()
-    filename = Path(key).name
-    
+
     is_folder = key.endswith('/')
     if not is_folder:
         try:
-            s3_client.head_object(Bucket=bucket, Key=key)
+            head = s3_client.head_object(Bucket=bucket, Key=key)
         except ClientError as e:
             if e.response['Error']['Code'] == '404':
                 is_folder = True
             else:
                 raise
+        else:
+            return [{'Key': key, 'Size': head['ContentLength']}]
+
+    folder_key = f'{key}/' if key[-1:] != '/' else key
+
+    paginator = s3_client.get_paginator('list_objects')
+    page_iterator = paginator.paginate(
+        Bucket=bucket, Prefix=folder_key, Delimiter='/', PaginationConfig={'PageSize': 100}
+    )
+
+    parts = []
+    for page in page_iterator:
+        for o in (page.get('Contents') or []):
+            partname = Path(o['Key']).name
+            if not partname or partname.startswith(('_', '.')):
+                continue
+            parts.append({'Key': o['Key'], 'Size': o['Size']})
 
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir = Path(tempdir)
-        
-        if is_folder:
-            folder_key = f'{key}/' if key[-1:] != '/' else key
+    return sorted(parts, key=lambda o: o['Key'])
 
-            paginator = s3_client.get_paginator('list_objects')
-            page_iterator = paginator.paginate(
-                Bucket=bucket, Prefix=folder_key, Delimiter='/', PaginationConfig={'PageSize': 100}
+
+def read_s3_object_buffer(s3_client: BaseClient, bucket: str, key: str) -> pyarrow.Buffer:
+    """
+    Считывает объект из S3 хранилища в буфер pyarrow без промежуточных файлов.
+    Данные читаются из ответа S3 частями сразу в заранее выделенный буфер нужного размера.
+    """
+    obj = s3_client.get_object(Bucket=bucket, Key=key)
+    size = obj['ContentLength']
+
+    buffer = pyarrow.allocate_buffer(size)
+    view = memoryview(buffer).cast('B')
+    position = 0
+
+    for chunk in obj['Body'].iter_chunks(S3_READ_CHUNK_SIZE):
+        view[position:position + len(chunk)] = chunk
+        position += len(chunk)
+
+    assert position == size, (
+        f'Из S3 получено {position} байт вместо {size} для объекта {key}'
+    )
+
+    return buffer
+
+
+def read_parquet_table(
+    s3_client: BaseClient,
+    bucket: str,
+    key: str,
+    in_memory: bool = True,
+    max_workers: int | None = None,
+) -> pyarrow.Table:
+    """
+    Считывает данные из parquet-файла по указанному ключу в S3 хранилище.
+
+    Если in_memory=True, то части parquet-файла читаются из S3 сразу в буферы pyarrow,
+    локальный диск не используется. Иначе части сначала скачиваются во временную папку.
+
+    Части скачиваются параллельно в max_workers потоков (по умолчанию - по размеру пула
+    соединений S3 клиента). Порядок частей в итоговой таблице совпадает с порядком их названий.
+    """
+    key = key.strip()
+    filename = Path(key).name
+
+    parts = list_parquet_parts(s3_client, bucket, key)
+
+    if max_workers is None:
+        max_workers = s3_client.meta.config.max_pool_connections
+
+    with ThreadPoolExecutor(max_workers=max(min(max_workers, len(parts)), 1)) as executor:
+        if in_memory:
+            buffers = executor.map(
+                lambda part: read_s3_object_buffer(s3_client, bucket, part['Key']), parts
             )
+            tables = [
+                pyarrow.parquet.read_table(pyarrow.BufferReader(buffer))
+                for buffer in buffers
+            ]
+            if not tables:
+                raise FileNotFoundError(f'В S3 нет parquet-файлов по ключу {key}')
+
+            return pyarrow.concat_tables(tables, promote_options='default')
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            tempdir = Path(tempdir)
 
             os.makedirs(tempdir / filename)
-            for page in page_iterator:
-                for o in (page.get('Contents') or []):
-                    partname = Path(o['Key']).name
-                    obj = s3_client.get_object(Bucket=bucket, Key=o['Key'])
-                    with open(tempdir / filename / partname, 'wb') as f:
-                        f.write(obj['Body'].read())
-        else:
-            with open(tempdir / filename, 'wb') as f:
-                obj = s3_client.get_object(Bucket=bucket, Key=key)
-                f.write(obj['Body'].read())
 
-        return pyarrow.parquet.read_table(tempdir / filename)
+            def download_part(part: dict):
+                partname = Path(part['Key']).name
+                obj = s3_client.get_object(Bucket=bucket, Key=part['Key'])
+                with open(tempdir / filename / partname, 'wb') as f:
+                    for chunk in obj['Body'].iter_chunks(S3_READ_CHUNK_SIZE):
+                        f.write(chunk)
+
+            list(executor.map(download_part, parts))
+
+            return pyarrow.parquet.read_table(tempdir / filename)
     
 
-def read_and_assert_exported_parquet(s3_client: BaseClient, bucket: str, exported_parquet_key: str) -> pyarrow.Table:
+def read_and_assert_exported_parquet(
+    s3_client: BaseClient,
+    bucket: str,
+    exported_parquet_key: str,
+    in_memory: bool = True,
+    max_workers: int | None = None,
+) -> pyarrow.Table:
     """ 
     Проверяет выгруженный коннектором parquet файл и возвращает его данные в виде pyarrow таблицы
     """
@@ -141,13 +332,338 @@ def read_and_assert_exported_parquet(s3_client: BaseClient, bucket: str, exporte
     )
 
     # 2. Читаем данные
-    table = read_parquet_table(s3_client, bucket, exported_parquet_key)
+    table = read_parquet_table(
+        s3_client, bucket, exported_parquet_key, in_memory=in_memory, max_workers=max_workers
+    )
 
     assert table.num_rows > 0, f'В таблице {exported_parquet_key} нет строк'
 
     return table
 
 
+class S3RangeFile(io.RawIOBase):
+    """
+    Файловый объект только для чтения поверх объекта S3. Каждое чтение выполняется
+    отдельным ranged GET запросом, поэтому pyarrow скачивает только нужные ему байты
+    (например, только футер parquet файла).
+    """
+
+    def __init__(self, s3_client: BaseClient, bucket: str, key: str, size: int):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self.position = 0
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        elif whence == io.SEEK_END:
+            self.position = self.size + offset
+        else:
+            raise ValueError(f'Неизвестный режим seek: {whence}')
+        return self.position
+
+    def read(self, size: int = -1) -> bytes:
+        end = self.size if size is None or size < 0 else min(self.position + size, self.size)
+        if end <= self.position:
+            return b''
+
+        obj = self.s3_client.get_object(
+            Bucket=self.bucket, Key=self.key, Range=f'bytes={self.position}-{end - 1}'
+        )
+        data = obj['Body'].read()
+
+        self.position += len(data)
+        self.bytes_read += len(data)
+        return data
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+@dataclass
+class ParquetPartMeta:
+    """
+    Метаданные (футер) одной части выгруженного parquet файла
+    """
+
+    key: str
+    size: int
+    metadata: pyarrow.parquet.FileMetaData
+
+
+@dataclass
+class ParquetExportMeta:
+    """
+    Метаданные всех частей выгруженного parquet файла
+    """
+
+    key: str
+    parts: list[ParquetPartMeta]
+
+    @property
+    def num_rows(self) -> int:
+        return sum(part.metadata.num_rows for part in self.parts)
+
+    @property
+    def schema(self) -> pyarrow.Schema:
+        return pyarrow.unify_schemas(
+            [part.metadata.schema.to_arrow_schema() for part in self.parts]
+        )
+
+    @property
+    def compressed_bytes(self) -> int:
+        """
+        Размер выгрузки в S3
+        """
+        return sum(part.size for part in self.parts)
+
+    @property
+    def uncompressed_bytes(self) -> int:
+        """
+        Размер данных выгрузки без сжатия
+        """
+        return sum(
+            part.metadata.row_group(i).total_byte_size
+            for part in self.parts
+            for i in range(part.metadata.num_row_groups)
+        )
+
+
+def read_parquet_metadata(
+    s3_client: BaseClient, bucket: str, key: str, max_workers: int | None = None
+) -> ParquetExportMeta:
+    """
+    Считывает из S3 только футеры частей parquet файла (ranged GET запросами) без загрузки
+    самих данных
+    """
+    parts = list_parquet_parts(s3_client, bucket, key)
+
+    if max_workers is None:
+        max_workers = s3_client.meta.config.max_pool_connections
+
+    def read_part_meta(part: dict) -> ParquetPartMeta:
+        with S3RangeFile(s3_client, bucket, part['Key'], part['Size']) as f:
+            return ParquetPartMeta(
+                key=part['Key'],
+                size=part['Size'],
+                metadata=pyarrow.parquet.read_metadata(f),
+            )
+
+    with ThreadPoolExecutor(max_workers=max(min(max_workers, len(parts)), 1)) as executor:
+        return ParquetExportMeta(key=key, parts=list(executor.map(read_part_meta, parts)))
+
+
+def footer_null_counts(export_meta: ParquetExportMeta) -> dict[str, int | None]:
+    """
+    Возвращает количество NULL по столбцам верхнего уровня из статистики футеров.
+    Если у какой-либо группы строк нет статистики столбца, то для столбца возвращается None
+    """
+    null_counts: dict[str, int | None] = {}
+
+    for part in export_meta.parts:
+        metadata = part.metadata
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            for j in range(row_group.num_columns):
+                column = row_group.column(j)
+                if '.' in column.path_in_schema:
+                    continue
+
+                name = column.path_in_schema
+                statistics = column.statistics
+                if statistics is None or not statistics.has_null_count:
+                    null_counts[name] = None
+                elif null_counts.get(name, 0) is not None:
+                    null_counts[name] = null_counts.get(name, 0) + statistics.null_count
+
+    return null_counts
+
+
+def footer_column_sizes(export_meta: ParquetExportMeta) -> dict[str, tuple[int, int]]:
+    """
+    Возвращает размер столбцов верхнего уровня по футерам: сумму размеров column chunk
+    без сжатия и со сжатием по всем группам строк
+    """
+    sizes: dict[str, tuple[int, int]] = {}
+
+    for part in export_meta.parts:
+        metadata = part.metadata
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            for j in range(row_group.num_columns):
+                column = row_group.column(j)
+                name = column.path_in_schema.split('.')[0]
+                uncompressed, compressed = sizes.get(name, (0, 0))
+                sizes[name] = (
+                    uncompressed + column.total_uncompressed_size,
+                    compressed + column.total_compressed_size,
+                )
+
+    return sizes
+
+
+@dataclass
+class StreamingVerification:
+    """
+    Результат потоковой проверки выгрузки
+    """
+
+    key: str
+    schema: pyarrow.Schema | None = None
+    num_rows: int = 0
+    batches: int = 0
+    bytes_read: int = 0
+    peak_memory: int = 0
+    null_counts: dict[str, int] = field(default_factory=dict)
+    checksums: dict[str, str] = field(default_factory=dict)
+
+
+def verify_parquet_streaming(
+    s3_client: BaseClient,
+    bucket: str,
+    key: str,
+    batch_size: int = DEFAULT_STREAMING_BATCH_SIZE,
+    max_memory_bytes: int | None = None,
+) -> StreamingVerification:
+    """
+    Читает выгрузку из S3 пакетами по batch_size строк (ParquetFile.iter_batches поверх
+    ranged GET запросов), не собирая ее целиком в памяти. По пакетам считаются строки,
+    NULL и контрольные суммы столбцов, проверяется совпадение схем частей.
+
+    peak_memory - наибольший прирост памяти pyarrow во время чтения. Если он превышает
+    max_memory_bytes, то проверка прерывается с ошибкой.
+    """
+    result = StreamingVerification(key=key)
+    checksum = None
+    memory_baseline = pyarrow.total_allocated_bytes()
+
+    for part in list_parquet_parts(s3_client, bucket, key):
+        with S3RangeFile(s3_client, bucket, part['Key'], part['Size']) as f:
+            parquet_file = pyarrow.parquet.ParquetFile(
+                f, buffer_size=S3_READ_CHUNK_SIZE, pre_buffer=False
+            )
+            schema = parquet_file.schema_arrow
+
+            if result.schema is None:
+                result.schema = schema
+                result.null_counts = {name: 0 for name in schema.names}
+                checksum = TableChecksum(schema)
+            else:
+                assert schema.equals(result.schema), (
+                    f'Схема части {part["Key"]} отличается от схемы первой части выгрузки'
+                )
+
+            for batch in parquet_file.iter_batches(batch_size=batch_size):
+                checksum.update(batch)
+                for name in schema.names:
+                    result.null_counts[name] += batch.column(name).null_count
+
+                result.num_rows += batch.num_rows
+                result.batches += 1
+                result.peak_memory = max(
+                    result.peak_memory, pyarrow.total_allocated_bytes() - memory_baseline
+                )
+
+                assert max_memory_bytes is None or result.peak_memory <= max_memory_bytes, (
+                    f'При потоковом чтении выгрузки {key} потребление памяти pyarrow '
+                    f'({result.peak_memory} байт) превысило ограничение {max_memory_bytes} байт. '
+                    'Уменьшите размер пакета или групп строк в выгрузке'
+                )
+
+            result.bytes_read += f.bytes_read
+
+    if checksum is not None:
+        result.checksums = checksum.hexdigests()
+
+    return result
+
+
+def read_parquet_sample(
+    s3_client: BaseClient,
+    bucket: str,
+    key: str,
+    columns: list[str],
+    max_rows: int,
+    batch_size: int = DEFAULT_STREAMING_BATCH_SIZE,
+) -> pyarrow.Table:
+    """
+    Читает из S3 первые max_rows строк выгрузки только для столбцов columns
+    (ParquetFile.iter_batches поверх ranged GET запросов), не загружая выгрузку целиком
+    """
+    batches = []
+    num_rows = 0
+
+    for part in list_parquet_parts(s3_client, bucket, key):
+        if num_rows >= max_rows:
+            break
+
+        with S3RangeFile(s3_client, bucket, part['Key'], part['Size']) as f:
+            parquet_file = pyarrow.parquet.ParquetFile(
+                f, buffer_size=S3_READ_CHUNK_SIZE, pre_buffer=False
+            )
+            for batch in parquet_file.iter_batches(
+                batch_size=min(batch_size, max_rows), columns=columns
+            ):
+                batch = batch.slice(0, max_rows - num_rows)
+                batches.append(batch)
+                num_rows += batch.num_rows
+                if num_rows >= max_rows:
+                    break
+
+    if not batches:
+        return pyarrow.table({name: pyarrow.array([], pyarrow.string()) for name in columns})
+    return pyarrow.Table.from_batches(batches)
+
+
+def read_and_assert_exported_parquet_meta(
+    s3_client: BaseClient, bucket: str, exported_parquet_key: str
+) -> ParquetExportMeta:
+    """
+    Проверяет выгруженный коннектором parquet файл только по его метаданным (количество строк,
+    схема частей) и возвращает эти метаданные
+    """
+    exported_parquet_key = exported_parquet_key.strip().rstrip('/') + '/'
+
+    export_meta = read_parquet_metadata(s3_client, bucket, exported_parquet_key)
+
+    assert_exported_parquet_meta(export_meta)
+
+    return export_meta
+
+
+def assert_exported_parquet_meta(export_meta: ParquetExportMeta):
+    """
+    Проверяет метаданные выгруженного коннектором parquet файла
+    """
+    exported_parquet_key = export_meta.key
+
+    assert len(export_meta.parts) > 0, f'В S3 нет файлов в папке {exported_parquet_key}'
+
+    first_schema = export_meta.parts[0].metadata.schema
+    for part in export_meta.parts[1:]:
+        assert part.metadata.schema.equals(first_schema), (
+            f'Схема части {part.key} отличается от схемы части {export_meta.parts[0].key}'
+        )
+
+    assert export_meta.num_rows > 0, f'В таблице {exported_parquet_key} нет строк'
+
+
 def delete_s3_folder(s3_client: BaseClient, bucket: str, folder_key: str):
     """ 
     Удаляет папку в S3